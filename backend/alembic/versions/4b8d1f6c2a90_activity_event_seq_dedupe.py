@@ -0,0 +1,46 @@
+"""activity_event_seq_dedupe
+
+Revision ID: 4b8d1f6c2a90
+Revises: 7c2e9a41b5d3
+Create Date: 2026-10-19 13:05:21.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8d1f6c2a90'
+down_revision: Union[str, Sequence[str], None] = '7c2e9a41b5d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('activity_events', sa.Column('worker_id', sa.UUID(), nullable=True))
+    op.add_column('activity_events', sa.Column('gateway_id', sa.String(length=64), nullable=True))
+    op.add_column('activity_events', sa.Column('seq', sa.BigInteger(), nullable=True))
+    op.create_foreign_key(
+        'activity_events_worker_id_fkey', 'activity_events', 'workers',
+        ['worker_id'], ['id'], ondelete='CASCADE',
+    )
+    # Built without blocking event inserts on the largest table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_activity_events_worker_gateway_seq', 'activity_events',
+            ['worker_id', 'gateway_id', 'seq'], unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_activity_events_worker_gateway_seq', table_name='activity_events', postgresql_concurrently=True)
+    op.drop_constraint('activity_events_worker_id_fkey', 'activity_events', type_='foreignkey')
+    op.drop_column('activity_events', 'seq')
+    op.drop_column('activity_events', 'gateway_id')
+    op.drop_column('activity_events', 'worker_id')
@@ -0,0 +1,36 @@
+"""event_snapshots
+
+Revision ID: 9f4b2d7e6a13
+Revises: e3a7c91d5f20
+Create Date: 2026-10-19 16:02:11.930417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f4b2d7e6a13'
+down_revision: Union[str, Sequence[str], None] = 'e3a7c91d5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('event_snapshots',
+        sa.Column('event_id', sa.UUID(), nullable=False),
+        sa.Column('rows', sa.SmallInteger(), nullable=False),
+        sa.Column('cols', sa.SmallInteger(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['activity_events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('event_snapshots')
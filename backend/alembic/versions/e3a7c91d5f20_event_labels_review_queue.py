@@ -0,0 +1,51 @@
+"""event_labels_review_queue
+
+Revision ID: e3a7c91d5f20
+Revises: 4b8d1f6c2a90
+Create Date: 2026-10-19 15:20:37.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c91d5f20'
+down_revision: Union[str, Sequence[str], None] = '4b8d1f6c2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable / constant-default columns: catalog-only changes, no table rewrite
+    op.add_column('activity_events', sa.Column('confidence', sa.REAL(), nullable=True))
+    op.add_column('activity_events', sa.Column('labeled', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+    op.create_table('event_labels',
+        sa.Column('event_id', sa.UUID(), nullable=False),
+        sa.Column('human_label', postgresql.ENUM(name='activitylabel', create_type=False), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['activity_events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+
+    # Built without blocking event inserts on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_activity_events_review_queue', 'activity_events', ['ts', 'id'], unique=False,
+            postgresql_where=sa.text('confidence < 0.7 AND NOT labeled'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activity_events_review_queue', table_name='activity_events')
+    op.drop_table('event_labels')
+    op.drop_column('activity_events', 'labeled')
+    op.drop_column('activity_events', 'confidence')
@@ -23,7 +23,7 @@ from app.schemas.auth import (
     TokenResponse,
     UserResponse,
 )
-from app.redis_client import redis_client
+from app.services.auth_cache import auth_cache
 
 router = APIRouter(prefix="/api", tags=["auth"])
 ph = PasswordHasher()
@@ -87,8 +87,11 @@ async def change_password(
     """Change password for authenticated user."""
     if not _verify_password(data.current_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
-    user.hashed_password = _hash_password(data.new_password)
+    # `user` may be a cached snapshot; update the row through this session
+    db_user = await db.get(User, user.id)
+    db_user.hashed_password = _hash_password(data.new_password)
     await db.commit()
+    await auth_cache.invalidate_user(user.id)
     return {"message": "Password updated successfully"}
 
 
@@ -115,8 +118,7 @@ async def logout(request: Request, user: User = Depends(get_current_user)):
             # Calculate TTL for the key in Redis (time until token naturally expires)
             now = int(datetime.now(timezone.utc).timestamp())
             ttl = max(0, exp - now)
-            if ttl > 0:
-                await redis_client.setex(f"blacklist:{jti}", ttl, "blacklisted")
+            await auth_cache.revoke(jti, ttl)
     except JWTError:
         pass # If token is invalid anyway, no need to blacklist
         
@@ -1,18 +1,20 @@
 """
 Industrial Wearable AI — System Config API
 Manage global configurable thresholds (Admin only).
+GET /api/config/edge serves classifier/risk thresholds to edge gateways (API key, ETag).
 """
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from pydantic import BaseModel
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import require_role
+from app.dependencies import require_role, verify_edge_api_key
 from app.models import SystemConfig, User
 from app.services.audit import log_action
+from app.services.config_cache import config_cache
 
 # require admin role for full config access
 router = APIRouter(prefix="/api/config", tags=["config"])
@@ -60,8 +62,22 @@ async def set_config(
         
     await db.commit()
     await db.refresh(config)
+    await config_cache.notify_changed()
     
     # Audit log
     await log_action(db, "update_config", f"config:{item.key}", f"Set value to {item.value}", user)
     
     return config
+
+
+@router.get("/edge", dependencies=[Depends(verify_edge_api_key)])
+async def get_edge_config(response: Response, if_none_match: str | None = Header(None)):
+    """
+    Thresholds used by edge classifier/risk rules (keys prefixed classifier_, risk_, anomaly_).
+    Served from the in-memory config cache; returns 304 when the gateway's ETag is current.
+    """
+    etag = config_cache.edge_etag
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {"values": config_cache.edge_values}
@@ -1,17 +1,21 @@
 """
 Industrial Wearable AI — Events API
-POST /api/events — accept EventBatch, resolve/create worker & session, insert events.
+POST /api/events — accept EventBatch, resolve/create worker & sessions, insert events (idempotent by seq).
 """
+import uuid
 from datetime import datetime, timezone
+from typing import List
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import verify_edge_api_key
 from app.models import ActivityEvent, ActivityLabel, Session, Worker
-from app.schemas import EventBatch
+from app.schemas import ActivityEventIn, EventBatch
+from app.services.alert_engine import alert_engine
 from app.services.event_service import update_session_aggregate
 from app.services.websocket_hub import ws_hub
 
@@ -31,12 +35,79 @@ def _label_from_str(s: str) -> ActivityLabel:
         return ActivityLabel.IDLE  # fallback
 
 
-@router.post("/events", dependencies=[Depends(verify_edge_api_key)])
-async def post_events(batch: EventBatch, db: AsyncSession = Depends(get_db)):
+# Rows per INSERT statement (up to 11 bind params each; asyncpg caps a statement at 32767)
+INSERT_CHUNK_ROWS = 2000
+
+
+async def _assign_sessions(db: AsyncSession, worker_id, events: List[ActivityEventIn]) -> List[Session]:
+    """
+    Pick a session for each event (events sorted by ts) by event time, not arrival time:
+    1. a session whose [started_at, ended_at] covers the event;
+    2. otherwise the open session, if the event is after the last closed session
+       (created if missing, started_at moved back for late-arriving replays);
+    3. otherwise (gap between closed sessions) one closed session spanning those events.
+    """
+    first, last = _ts_to_datetime(events[0].ts), _ts_to_datetime(events[-1].ts)
+    stmt = (
+        select(Session)
+        .where(Session.worker_id == worker_id)
+        .where(or_(
+            Session.ended_at.is_(None),
+            and_(Session.started_at <= last, Session.ended_at >= first),
+        ))
+        .order_by(Session.started_at)
+    )
+    sessions = list((await db.execute(stmt)).scalars().all())
+    closed = [s for s in sessions if s.ended_at is not None]
+    open_session = next((s for s in reversed(sessions) if s.ended_at is None), None)
+    last_closed_end = await db.scalar(
+        select(func.max(Session.ended_at))
+        .where(Session.worker_id == worker_id)
+        .where(Session.ended_at.is_not(None))
+    )
+
+    assigned: List[Session] = []
+    gap_session: Session | None = None
+    for ev in events:
+        ts = _ts_to_datetime(ev.ts)
+        session = next((s for s in closed if s.started_at <= ts <= s.ended_at), None)
+        if session is None and (last_closed_end is None or ts >= last_closed_end):
+            if open_session is None:
+                open_session = Session(worker_id=worker_id, started_at=ts)
+                db.add(open_session)
+            elif ts < open_session.started_at:
+                open_session.started_at = ts
+            session = open_session
+        if session is None:
+            if gap_session is None:
+                gap_session = Session(worker_id=worker_id, started_at=ts, ended_at=ts)
+                db.add(gap_session)
+            gap_session.ended_at = max(gap_session.ended_at, ts)
+            session = gap_session
+        assigned.append(session)
+    await db.flush()
+    return assigned
+
+
+@router.post("/events")
+async def post_events(
+    batch: EventBatch,
+    gateway_id: str = Depends(verify_edge_api_key),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Accept EventBatch from edge. Resolve or create Worker (by name=worker_id for MVP).
-    Resolve or create active Session. Insert events. Update aggregates.
+    Assign each event to a session by its own ts. Insert events. Update aggregates.
+
+    Events carrying `seq` are idempotent: (worker, gateway, seq) is unique, so
+    replayed or duplicated events are skipped and batches may arrive in any order.
+    Batches for the same worker are serialized (transaction-scoped advisory lock).
     """
+    # One transaction per worker at a time: worker get-or-create and the open-session
+    # lookup/creation below are read-then-write, and live batches can race replayed ones.
+    # Held until commit; different workers don't wait on each other.
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(batch.worker_id))))
+
     # Resolve or create Worker (MVP: worker_id becomes name)
     stmt = select(Worker).where(Worker.name == batch.worker_id)
     result = await db.execute(stmt)
@@ -46,42 +117,52 @@ async def post_events(batch: EventBatch, db: AsyncSession = Depends(get_db)):
         db.add(worker)
         await db.flush()
 
-    # Resolve or create active Session (no ended_at)
-    stmt = (
-        select(Session)
-        .where(Session.worker_id == worker.id)
-        .where(Session.ended_at.is_(None))
-        .order_by(Session.started_at.desc())
-        .limit(1)
-    )
-    result = await db.execute(stmt)
-    session = result.scalar_one_or_none()
-    if not session:
-        # Create new session — started_at = first event ts
-        first_ts = batch.events[0].ts
-        session = Session(
-            worker_id=worker.id,
-            started_at=_ts_to_datetime(first_ts),
-        )
-        db.add(session)
-        await db.flush()
+    events = sorted(batch.events, key=lambda ev: ev.ts)
+    sessions = await _assign_sessions(db, worker.id, events)
 
-    # Insert events
-    for ev in batch.events:
-        activity = ActivityEvent(
-            session_id=session.id,
-            ts=_ts_to_datetime(ev.ts),
-            label=_label_from_str(ev.label),
-            risk_ergo=ev.risk_ergo,
-            risk_fatigue=ev.risk_fatigue,
+    # Insert events; ON CONFLICT DO NOTHING drops (worker, gateway, seq) duplicates
+    rows = {}
+    seen_seq = set()
+    for ev, session in zip(events, sessions):
+        if ev.seq is not None:
+            if ev.seq in seen_seq:
+                continue
+            seen_seq.add(ev.seq)
+        rows[uuid.uuid4()] = (ev, session, {
+            "session_id": session.id,
+            "worker_id": worker.id,
+            "gateway_id": gateway_id if ev.seq is not None else None,
+            "seq": ev.seq,
+            "ts": _ts_to_datetime(ev.ts),
+            "label": _label_from_str(ev.label),
+            "risk_ergo": ev.risk_ergo,
+            "risk_fatigue": ev.risk_fatigue,
+            "confidence": ev.confidence,
+        })
+    ids = list(rows)
+    inserted_ids = set()
+    for i in range(0, len(ids), INSERT_CHUNK_ROWS):
+        chunk = ids[i : i + INSERT_CHUNK_ROWS]
+        stmt = (
+            pg_insert(ActivityEvent)
+            .values([{"id": event_id, **rows[event_id][2]} for event_id in chunk])
+            .on_conflict_do_nothing(index_elements=["worker_id", "gateway_id", "seq"])
+            .returning(ActivityEvent.id)
         )
-        db.add(activity)
+        inserted_ids.update((await db.execute(stmt)).scalars().all())
 
-    await db.flush()
-    await update_session_aggregate(db, session.id)
+    new = [(rows[event_id][0], rows[event_id][1]) for event_id in ids if event_id in inserted_ids]
+    if not new:
+        return {"status": "ok", "count": 0, "duplicates": len(events)}
+
+    for session_id in {session.id for _, session in new}:
+        await update_session_aggregate(db, session_id)
+
+    # Hand risk flags to the streaming alert engine (enqueue only; evaluated off the request path)
+    alert_engine.submit(batch.worker_id, [(ev.ts, ev.risk_ergo, ev.risk_fatigue) for ev, _ in new])
 
     # Broadcast live state to WebSocket clients (per TECHNICAL_STACK_SPEC §4.3)
-    last_ev = batch.events[-1]
+    last_ev = new[-1][0]
     await ws_hub.broadcast({
         "worker_id": batch.worker_id,
         "name": worker.name,
@@ -91,4 +172,4 @@ async def post_events(batch: EventBatch, db: AsyncSession = Depends(get_db)):
         "updated_at": last_ev.ts,
     })
 
-    return {"status": "ok", "count": len(batch.events)}
+    return {"status": "ok", "count": len(new), "duplicates": len(events) - len(new)}
@@ -2,27 +2,36 @@
 Industrial Wearable AI — Labels API (Active Learning)
 POST /api/labels     — submit a human label for a low-confidence event
 GET  /api/labels/queue — get events pending human review
+GET  /api/labels/submitted — human labels with their events (for retraining)
+
+The queue is low-confidence (< REVIEW_CONFIDENCE) unlabeled events, newest first, read
+from the partial index ix_activity_events_review_queue with keyset pagination on
+(ts, id): each page is an index range scan of `limit` rows, independent of table
+size and of how deep the reviewer has paged.
 """
-from datetime import datetime, timezone
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select, func
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import ActivityEvent, Session, Worker
+from app.models import ActivityEvent, ActivityLabel, EventLabel, Session, Worker
 
 router = APIRouter(prefix="/api/labels", tags=["labels"])
 
-# In-memory store for labels (in production, use a DB table)
-_label_store: list[dict] = []
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
 
 
 class LabelSubmission(BaseModel):
     """Human-provided label for a low-confidence event."""
-    event_id: str = Field(..., description="Activity event ID")
-    human_label: str = Field(..., description="Corrected label: sewing|idle|adjusting|break|error")
+    event_id: uuid.UUID = Field(..., description="Activity event ID")
+    human_label: ActivityLabel = Field(..., description="Corrected label: sewing|idle|adjusting|break|error")
     notes: str = ""
 
 
@@ -35,60 +44,109 @@ class LabelQueueItem(BaseModel):
     confidence: float
 
 
+class LabelQueuePage(BaseModel):
+    items: list[LabelQueueItem]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` for the next (older) page; null at the end")
+
+
+def _encode_cursor(ts: datetime, event_id: uuid.UUID) -> str:
+    return f"{(ts - _EPOCH) // _MICROSECOND}_{event_id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        us, event_id = cursor.split("_", 1)
+        return _EPOCH + int(us) * _MICROSECOND, uuid.UUID(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.post("")
-async def submit_label(label: LabelSubmission):
-    """Submit a human-corrected label for an event."""
-    _label_store.append({
-        "event_id": label.event_id,
-        "human_label": label.human_label,
-        "notes": label.notes,
-        "submitted_at": datetime.now(timezone.utc).isoformat(),
-    })
-    return {"status": "ok", "total_labels": len(_label_store)}
-
-
-@router.get("/queue")
+async def submit_label(label: LabelSubmission, db: AsyncSession = Depends(get_db)):
+    """Submit (or replace) the human label for an event; removes it from the review queue."""
+    marked = await db.execute(
+        update(ActivityEvent).where(ActivityEvent.id == label.event_id).values(labeled=True)
+    )
+    if marked.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Event not found")
+    stmt = pg_insert(EventLabel).values(
+        event_id=label.event_id,
+        human_label=label.human_label,
+        notes=label.notes or None,
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[EventLabel.event_id],
+        set_={"human_label": stmt.excluded.human_label, "notes": stmt.excluded.notes, "created_at": func.now()},
+    ))
+    total = await db.scalar(select(func.count()).select_from(EventLabel))
+    return {"status": "ok", "total_labels": total}
+
+
+@router.get("/queue", response_model=LabelQueuePage)
 async def get_label_queue(
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
 ):
-    """
-    Get recent events for human labeling.
-    In production, these would be filtered by confidence < 0.7.
-    For now, returns the most recent events as candidates.
-    """
+    """Low-confidence events without a human label, newest first."""
     stmt = (
         select(
             ActivityEvent.id,
             ActivityEvent.label,
             ActivityEvent.ts,
+            ActivityEvent.confidence,
             Worker.name.label("worker_name"),
         )
         .join(Session, Session.id == ActivityEvent.session_id)
         .join(Worker, Worker.id == Session.worker_id)
-        .order_by(ActivityEvent.ts.desc())
+        .where(ActivityEvent.in_review_queue())
+        .order_by(ActivityEvent.ts.desc(), ActivityEvent.id.desc())
         .limit(limit)
     )
-    result = await db.execute(stmt)
-    rows = result.all()
+    if cursor:
+        stmt = stmt.where(tuple_(ActivityEvent.ts, ActivityEvent.id) < tuple_(*_decode_cursor(cursor)))
+    rows = (await db.execute(stmt)).all()
 
-    # Filter out already-labeled events
-    labeled_ids = {item["event_id"] for item in _label_store}
-
-    return [
+    items = [
         LabelQueueItem(
             event_id=str(row.id),
             worker_name=row.worker_name,
-            timestamp=row.ts.isoformat() if row.ts else "",
+            timestamp=row.ts.isoformat(),
             predicted_label=row.label.value if hasattr(row.label, "value") else str(row.label),
-            confidence=0.65,  # Placeholder — real confidence would be stored with the event
+            confidence=row.confidence,
         )
         for row in rows
-        if str(row.id) not in labeled_ids
     ]
+    next_cursor = _encode_cursor(rows[-1].ts, rows[-1].id) if len(rows) == limit else None
+    return LabelQueuePage(items=items, next_cursor=next_cursor)
 
 
 @router.get("/submitted")
-async def get_submitted_labels():
+async def get_submitted_labels(db: AsyncSession = Depends(get_db)):
     """Get all human-submitted labels (for retraining)."""
-    return _label_store
+    stmt = (
+        select(
+            EventLabel.event_id,
+            EventLabel.human_label,
+            EventLabel.notes,
+            EventLabel.created_at,
+            ActivityEvent.ts,
+            ActivityEvent.label,
+            ActivityEvent.confidence,
+        )
+        .join(ActivityEvent, ActivityEvent.id == EventLabel.event_id)
+        .order_by(EventLabel.created_at)
+    )
+    rows = (await db.execute(stmt)).all()
+    return [
+        {
+            "event_id": str(row.event_id),
+            "human_label": row.human_label.value,
+            "notes": row.notes or "",
+            "submitted_at": row.created_at.isoformat(),
+            "event_ts": row.ts.isoformat(),
+            "predicted_label": row.label.value,
+            "confidence": row.confidence,
+        }
+        for row in rows
+    ]
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
 from app.dependencies import verify_edge_api_key
+from app.services.alert_engine import alert_engine
 from app.services.websocket_hub import ws_hub
 
 router = APIRouter(prefix="/api/live", tags=["live"])
@@ -29,6 +30,7 @@ async def post_sensor(snapshot: SensorSnapshot):
     Accept sensor snapshot from edge (temp, accel_mag). Broadcast to WebSocket clients
     so the dashboard can show live temp and movement per worker.
     """
+    alert_engine.sensor(snapshot.worker_id, snapshot.ts)
     msg = {
         "type": "sensor",
         "worker_id": snapshot.worker_id,
@@ -55,6 +57,7 @@ async def post_device_status(status: DeviceStatus):
     Broadcast so dashboard can show "No MPU connected" without showing fake data.
     When MPU not connected, also broadcast a minimal worker state so the worker appears on the dashboard.
     """
+    alert_engine.device_status(status.worker_id, status.mpu_connected)
     await ws_hub.broadcast({
         "type": "device_status",
         "worker_id": status.worker_id,
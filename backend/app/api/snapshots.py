@@ -0,0 +1,103 @@
+"""
+Industrial Wearable AI — Snapshots API (Active Learning)
+POST /api/snapshots?worker_id=W01 — raw IMU windows of low-confidence events from the edge
+
+Binary body (little-endian, see edge/src/snapshot_uploader.py):
+
+    "IWS1" | uint32 count | uint16 rows | uint16 cols
+    count × int64 seq
+    count × rows × cols float16
+
+Each window is matched to its event by the replay dedupe key (worker, gateway, seq) and
+stored as-is in event_snapshots. Seqs whose event hasn't been ingested yet are returned
+as `pending` so the gateway retries them.
+"""
+import struct
+from typing import Dict, List, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import verify_edge_api_key
+from app.models import ActivityEvent, EventSnapshot, Worker
+
+router = APIRouter(prefix="/api/snapshots", tags=["snapshots"])
+
+MAGIC = b"IWS1"
+_HEADER = struct.Struct("<4sIHH")
+MAX_SNAPSHOTS_PER_POST = 1000
+MAX_WINDOW_VALUES = 2000  # rows × cols (a 3 s window at 25 Hz is 450)
+MAX_BODY_BYTES = _HEADER.size + MAX_SNAPSHOTS_PER_POST * (8 + 2 * MAX_WINDOW_VALUES)
+
+
+def decode_snapshots(body: bytes) -> Tuple[int, int, Dict[int, bytes]]:
+    """Parse the wire format → (rows, cols, seq → float16 bytes). Raises ValueError."""
+    if len(body) < _HEADER.size:
+        raise ValueError("truncated header")
+    magic, count, rows, cols = _HEADER.unpack_from(body)
+    if magic != MAGIC:
+        raise ValueError("not a snapshot batch")
+    if count > MAX_SNAPSHOTS_PER_POST or not 0 < rows * cols <= MAX_WINDOW_VALUES:
+        raise ValueError("batch or window too large")
+    size = rows * cols * 2
+    if len(body) != _HEADER.size + count * (8 + size):
+        raise ValueError("length does not match header")
+    seqs = struct.unpack_from(f"<{count}q", body, _HEADER.size)
+    start = _HEADER.size + 8 * count
+    return rows, cols, {seq: body[start + i * size : start + (i + 1) * size] for i, seq in enumerate(seqs)}
+
+
+async def _read_body(request: Request) -> bytes:
+    """Request body, refused (413) past MAX_BODY_BYTES before it is buffered."""
+    length = request.headers.get("content-length")
+    if length is not None:
+        if not length.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+        if int(length) > MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Snapshot batch too large")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Snapshot batch too large")
+    return bytes(body)
+
+
+@router.post("")
+async def post_snapshots(
+    request: Request,
+    worker_id: str = Query(..., description="Worker identifier (e.g. W01)"),
+    gateway_id: str = Depends(verify_edge_api_key),
+    db: AsyncSession = Depends(get_db),
+):
+    """Store raw windows for this gateway's events; returns seqs not yet matched."""
+    try:
+        rows, cols, windows = decode_snapshots(await _read_body(request))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid snapshot batch: {e}")
+    if not windows:
+        return {"status": "ok", "stored": 0, "pending": []}
+
+    worker = await db.scalar(select(Worker.id).where(Worker.name == worker_id))
+    if worker is None:
+        return {"status": "ok", "stored": 0, "pending": sorted(windows)}
+
+    # (worker_id, gateway_id, seq) lookups hit uq_activity_events_worker_gateway_seq
+    stmt = (
+        select(ActivityEvent.id, ActivityEvent.seq)
+        .where(ActivityEvent.worker_id == worker)
+        .where(ActivityEvent.gateway_id == gateway_id)
+        .where(ActivityEvent.seq.in_(list(windows)))
+    )
+    found = (await db.execute(stmt)).all()
+    values: List[dict] = [
+        {"event_id": row.id, "rows": rows, "cols": cols, "data": windows[row.seq]}
+        for row in found
+    ]
+    if values:
+        await db.execute(pg_insert(EventSnapshot).values(values).on_conflict_do_nothing(index_elements=["event_id"]))
+    matched = {row.seq for row in found}
+    return {"status": "ok", "stored": len(values), "pending": sorted(set(windows) - matched)}
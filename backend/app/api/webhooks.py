@@ -0,0 +1,88 @@
+"""
+Industrial Wearable AI — Webhooks API
+GET/POST /api/webhooks, DELETE /api/webhooks/{id}, GET /api/webhooks/metrics (Admin only).
+"""
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import require_role
+from app.models import User, WebhookSubscription
+from app.services.audit import log_action
+from app.services.webhooks import register_webhook_subscription, webhook_dispatcher
+
+router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
+
+
+class WebhookCreate(BaseModel):
+    url: str = Field(..., pattern=r"^https?://", max_length=2048)
+    events: List[str] = Field(..., min_length=1, description='e.g. ["fatigue_alert", "anomaly"] or ["*"]')
+
+
+class WebhookOut(BaseModel):
+    id: UUID
+    url: str
+    events: List[str]
+    active: bool
+    created_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("", response_model=List[WebhookOut])
+async def list_webhooks(
+    user: User = Depends(require_role("super_admin", "factory_admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """List registered webhook subscriptions."""
+    result = await db.execute(select(WebhookSubscription).order_by(WebhookSubscription.created_at))
+    return result.scalars().all()
+
+
+@router.post("", response_model=WebhookOut)
+async def create_webhook(
+    item: WebhookCreate,
+    user: User = Depends(require_role("super_admin", "factory_admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Register a partner URL for the given event types."""
+    sub = await register_webhook_subscription(db, item.url, item.events)
+    await log_action(db, "create_webhook", f"webhook:{sub.id}", f"{item.url} {item.events}", user)
+    return sub
+
+
+@router.delete("/{webhook_id}")
+async def delete_webhook(
+    webhook_id: UUID,
+    user: User = Depends(require_role("super_admin", "factory_admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Remove a subscription (pending retries are dropped with it)."""
+    sub = await db.get(WebhookSubscription, webhook_id)
+    if not sub:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    await db.delete(sub)
+    await db.commit()
+    await webhook_dispatcher.reload_subscriptions()
+    await log_action(db, "delete_webhook", f"webhook:{webhook_id}", sub.url, user)
+    return {"status": "ok"}
+
+
+@router.get("/metrics")
+async def webhook_metrics(
+    user: User = Depends(require_role("super_admin", "factory_admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delivery counters and latency histogram for this process, plus the shared retry backlog."""
+    return {
+        **webhook_dispatcher.metrics.snapshot(),
+        "queue_depth": webhook_dispatcher.queue_depth,
+        "retry_backlog": await webhook_dispatcher.retry_backlog(db),
+    }
@@ -1,18 +1,23 @@
 """
 Industrial Wearable AI — Database Connection & Session
 Async SQLAlchemy engine, session factory, and get_db dependency.
+Sync session factory for Celery tasks (created lazily).
 """
 from typing import AsyncGenerator
 
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session as OrmSession, sessionmaker
 
-from app.config import DATABASE_URL
+from app.config import DATABASE_URL, SYNC_DATABASE_URL
 from app.models import Base
+from app.services.metrics import instrument_engine
 
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
 )
+instrument_engine(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -22,6 +27,22 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Celery workers are sync; the engine is only built on first use so the API process never opens it.
+_sync_session_factory: sessionmaker | None = None
+
+
+def get_sync_session() -> OrmSession:
+    """Return a new sync Session (psycopg2). Caller is responsible for closing it."""
+    global _sync_session_factory
+    if _sync_session_factory is None:
+        sync_engine = create_engine(SYNC_DATABASE_URL, echo=False, pool_pre_ping=True)
+        _sync_session_factory = sessionmaker(
+            sync_engine,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+    return _sync_session_factory()
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency: yield session, commit on success, rollback on error, close on exit."""
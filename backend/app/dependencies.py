@@ -1,9 +1,9 @@
 """
 Industrial Wearable AI — FastAPI Dependencies
 """
+import math
 from uuid import UUID
 
-import os
 from fastapi import Depends, HTTPException, Header
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
@@ -13,7 +13,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import ALGORITHM, SECRET_KEY
 from app.database import get_db
 from app.models import User
-from app.redis_client import redis_client
+from app.services.auth_cache import auth_cache
+from app.services.ingest_limiter import ingest_limiter
 
 security = HTTPBearer(auto_error=False)
 
@@ -22,7 +23,10 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    """Extract JWT from Authorization header and return User. Raises 401 if invalid."""
+    """
+    Extract JWT from Authorization header and return User. Raises 401 if invalid.
+    Blacklist and user lookups are served from auth_cache; the DB is hit on a cache miss only.
+    """
     if not credentials:
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = credentials.credentials
@@ -34,9 +38,9 @@ async def get_current_user(
         if not sub:
             raise HTTPException(status_code=401, detail="Invalid token")
             
-        # Check if token is blacklisted in Redis
+        # Check if token is blacklisted (local copy of the Redis blacklist)
         if jti:
-            is_blacklisted = await redis_client.exists(f"blacklist:{jti}")
+            is_blacklisted = await auth_cache.is_revoked(jti)
             if is_blacklisted:
                 raise HTTPException(status_code=401, detail="Token has been logged out")
                 
@@ -44,11 +48,16 @@ async def get_current_user(
     except (JWTError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    user = auth_cache.get_user(user_id)
+    if user is not None:
+        return user
+
     stmt = select(User).where(User.id == user_id)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    auth_cache.put_user(user)
     return user
 
 
@@ -81,10 +90,21 @@ def require_role(*allowed_roles: str):
 
     return _check_role
 
-EDGE_API_KEY = os.getenv("EDGE_API_KEY", "dev-edge-key-123")
 
-def verify_edge_api_key(x_api_key: str = Header(None)):
-    """Authenticate Edge Gateway requests using a static API key."""
-    if not x_api_key or x_api_key != EDGE_API_KEY:
+async def verify_edge_api_key(x_api_key: str = Header(None)) -> str:
+    """
+    Authenticate an Edge Gateway by API key and charge its ingest token bucket.
+    Returns the gateway id. Edge routes are exempt from the per-IP SlowAPI limit.
+    """
+    gateway = ingest_limiter.authenticate(x_api_key)
+    if gateway is None:
         raise HTTPException(status_code=401, detail="Invalid or missing Edge API Key")
+    allowed, retry_after = await ingest_limiter.acquire(gateway)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Ingest rate limit exceeded for gateway {gateway.gateway_id}",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+    return gateway.gateway_id
 
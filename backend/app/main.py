@@ -1,19 +1,26 @@
 """
 Industrial Wearable AI — FastAPI Application Entry Point
 """
+import hmac
 import logging
-import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, WebSocket
+from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
-from app.api import activity, analytics, auth, config, events, export, labels, live, notifications, sessions, workers, reports, privacy, compliance, nl_query
+from app.api import activity, analytics, auth, config, events, export, labels, live, notifications, sessions, workers, reports, privacy, compliance, nl_query, webhooks, snapshots
 from app.config import CORS_ORIGINS
 from app.database import get_db
+from app.services.alert_engine import alert_engine
+from app.services.auth_cache import auth_cache
+from app.services.config_cache import config_cache
+from app.services.metrics import METRICS_TOKEN, RequestMetricsMiddleware, metrics
+from app.services.webhooks import webhook_dispatcher
 from app.services.websocket_hub import ws_hub
 
 # Structured logging
@@ -23,10 +30,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services that live alongside the API."""
+    await config_cache.start()
+    await auth_cache.start()
+    await webhook_dispatcher.start()
+    await alert_engine.start()
+    yield
+    await alert_engine.stop()
+    await webhook_dispatcher.stop()
+    await auth_cache.stop()
+    await config_cache.stop()
+
+
 app = FastAPI(
     title="Industrial Wearable AI API",
     description="Backend API for wearable activity monitoring",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Setup SlowAPI Limiter
@@ -35,6 +58,11 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
+# Edge gateways post on behalf of many workers from one IP; they are throttled per
+# API key by verify_edge_api_key (services/ingest_limiter) instead.
+for _edge_endpoint in (events.post_events, snapshots.post_snapshots, live.post_sensor, live.post_device_status, config.get_edge_config):
+    limiter.exempt(_edge_endpoint)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -43,14 +71,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log request path and status."""
-    start = time.time()
-    response = await call_next(request)
-    duration_ms = (time.time() - start) * 1000
-    logger.info("%s %s %s %.1fms", request.method, request.url.path, response.status_code, duration_ms)
-    return response
+# Outermost: times everything below it and logs a sample of requests (REQUEST_LOG_SAMPLE_RATE)
+app.add_middleware(RequestMetricsMiddleware)
 
 
 # Include routers
@@ -61,6 +83,7 @@ app.include_router(events.router)
 app.include_router(export.router)
 app.include_router(labels.router)
 app.include_router(live.router)
+app.include_router(snapshots.router)
 app.include_router(notifications.router)
 app.include_router(workers.router)
 app.include_router(sessions.router)
@@ -69,6 +92,7 @@ app.include_router(reports.router)
 app.include_router(privacy.router)
 app.include_router(compliance.router)
 app.include_router(nl_query.router)
+app.include_router(webhooks.router)
 
 
 @app.get("/")
@@ -90,6 +114,19 @@ async def db_check():
         return {"status": "ok", "database": "connected"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Prometheus scrape endpoint. Bearer METRICS_TOKEN required when set."""
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, METRICS_TOKEN):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+limiter.exempt(prometheus_metrics)
+
+
 @app.websocket("/ws/live")
 async def websocket_live(websocket: WebSocket):
     """WebSocket endpoint for live state broadcast to dashboard."""
@@ -6,12 +6,15 @@ from app.models.worker import Worker
 from app.models.device import Device
 from app.models.session import Session
 from app.models.activity_event import ActivityEvent, ActivityLabel
+from app.models.event_label import EventLabel
+from app.models.event_snapshot import EventSnapshot
 from app.models.session_aggregate import SessionAggregate
 from app.models.user import User
 from app.models.notification import Notification
 from app.models.system_config import SystemConfig
 from app.models.audit_log import AuditLog
 from app.models.consent import ConsentRecord
+from app.models.webhook import WebhookDelivery, WebhookSubscription
 
 __all__ = [
     "Base",
@@ -20,11 +23,15 @@ __all__ = [
     "Device",
     "Session",
     "ActivityEvent",
+    "EventLabel",
+    "EventSnapshot",
     "SessionAggregate",
     "User",
     "Notification",
     "SystemConfig",
     "AuditLog",
     "ConsentRecord",
+    "WebhookSubscription",
+    "WebhookDelivery",
 ]
 
@@ -4,9 +4,9 @@ Industrial Wearable AI — Activity Event Model
 import enum
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, func
+from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Index, REAL, String, and_, func, literal_column, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,6 +26,11 @@ class ActivityLabel(str, enum.Enum):
     BREAK = "break"
 
 
+# Events the classifier was less sure of than this go to the human review queue (active learning).
+# Part of the partial index definition: changing it needs a migration that rebuilds the index.
+REVIEW_CONFIDENCE = 0.7
+
+
 class ActivityEvent(Base):
     __tablename__ = "activity_events"
 
@@ -49,11 +54,38 @@ class ActivityEvent(Base):
     )
     risk_ergo: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     risk_fatigue: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Classifier confidence from the edge (NULL for gateways that don't send it: never queued)
+    confidence: Mapped[Optional[float]] = mapped_column(REAL, nullable=True)
+    # Set when a human label exists in event_labels; takes the event out of the review queue
+    labeled: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("false"), nullable=False)
+
+    # Replay dedupe key: (worker, gateway, per-worker seq assigned on the edge).
+    # Events from gateways that don't send seq keep NULLs and are never deduplicated.
+    worker_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("workers.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    gateway_id: Mapped[str] = mapped_column(String(64), nullable=True)
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=True)
 
     __table_args__ = (
         Index("ix_activity_events_session_id_ts", "session_id", "ts"),
+        Index("uq_activity_events_worker_gateway_seq", "worker_id", "gateway_id", "seq", unique=True),
+        # Review queue: only low-confidence unlabeled events are indexed, so it stays small
+        # however many events the table holds; ordered for keyset pagination on (ts, id)
+        Index(
+            "ix_activity_events_review_queue", "ts", "id",
+            postgresql_where=text(f"confidence < {REVIEW_CONFIDENCE} AND NOT labeled"),
+        ),
     )
 
+    @classmethod
+    def in_review_queue(cls):
+        """The partial index predicate. The threshold is inlined as a literal: with a bound parameter
+        the planner can't prove a generic (prepared) plan matches the index predicate."""
+        return and_(cls.confidence < literal_column(repr(REVIEW_CONFIDENCE)), ~cls.labeled)
+
     # Relationships
     session: Mapped["Session"] = relationship(
         "Session",
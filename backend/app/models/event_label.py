@@ -0,0 +1,34 @@
+"""
+Industrial Wearable AI — Event Label Model
+Human labels for activity events (active learning review queue, retraining).
+"""
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.activity_event import ActivityLabel
+from app.models.base import Base
+
+
+class EventLabel(Base):
+    """One human label per event; relabeling replaces it."""
+
+    __tablename__ = "event_labels"
+
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("activity_events.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    human_label: Mapped[ActivityLabel] = mapped_column(
+        Enum(ActivityLabel),
+        nullable=False,
+    )
+    notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False,
+    )
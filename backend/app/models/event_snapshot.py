@@ -0,0 +1,30 @@
+"""
+Industrial Wearable AI — Event Snapshot Model
+Raw IMU window behind a low-confidence event, uploaded by the edge for retraining.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, LargeBinary, SmallInteger, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class EventSnapshot(Base):
+    """rows × cols little-endian float16, row-major, columns ax ay az gx gy gz."""
+
+    __tablename__ = "event_snapshots"
+
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("activity_events.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rows: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    cols: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False,
+    )
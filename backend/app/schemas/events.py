@@ -13,6 +13,8 @@ class ActivityEventIn(BaseModel):
     label: str = Field(..., description="sewing|idle|adjusting|error|break")
     risk_ergo: bool = False
     risk_fatigue: bool = False
+    confidence: Optional[float] = Field(None, ge=0, le=1, description="Classifier confidence; below 0.7 the event is queued for human review")
+    seq: Optional[int] = Field(None, ge=0, description="Per-worker monotonic sequence from the gateway (replay dedupe)")
 
 
 class EventBatch(BaseModel):
@@ -0,0 +1,304 @@
+"""
+Industrial Wearable AI — Streaming Alert Engine
+Turns ingested risk flags into Notification rows, Slack messages and webhooks.
+
+POST /api/events hands each batch to alert_engine.submit(), which only enqueues.
+A background consumer evaluates the rules against per-worker sliding-window state
+(deques of flag timestamps, run-start markers), so each event costs O(1) amortized
+and never touches the DB. Fired alerts are deduplicated per (worker, rule) and
+batch-inserted every FLUSH_INTERVAL_SEC.
+
+Liveness: `last_seen` only moves when a worker's device time moves forward (a newer
+event ts, or a sensor snapshot with a newer ts), so an edge reposting a stale sample
+for a dead wearable doesn't keep it "online"; a device-status of mpu_connected=False
+starts the offline clock instead of counting as a heartbeat.
+
+Ordering: replayed or late batches may interleave with live ones (offline buffer
+replay). The fatigue window is kept sorted and evicted against the worker's newest
+evaluated ts, events older than that minus the window are ignored, and ergo runs only
+follow in-order events, so replayed history is not alerted on as if it were live.
+
+Rules come from SystemConfig (keys in RULE_CONFIG_KEYS) via config_cache and are
+swapped in whenever the config changes; missing keys fall back to the AlertRules
+defaults.
+"""
+import asyncio
+import logging
+import time
+from bisect import insort
+from collections import deque
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.integrations.slack import SLACK_WEBHOOK_URL, send_slack_alert
+from app.models import Notification
+from app.services.config_cache import config_cache
+from app.services.webhooks import dispatch_webhook
+
+logger = logging.getLogger(__name__)
+
+QUEUE_MAXSIZE = 10_000
+FLUSH_INTERVAL_SEC = 1.0
+OFFLINE_SWEEP_SEC = 30.0
+
+RULE_FATIGUE = "fatigue_alert"
+RULE_ERGO = "ergo_alert"
+RULE_OFFLINE = "device_offline"
+
+
+@dataclass
+class AlertRules:
+    """Thresholds for the streaming rules (minutes unless noted)."""
+
+    fatigue_flag_count: int = 3       # N fatigue flags ...
+    fatigue_window_min: float = 10.0  # ... within M minutes
+    ergo_continuous_min: float = 5.0  # ergo risk flagged continuously this long
+    device_offline_min: float = 5.0   # no data from a worker for this long (0 disables)
+    suppress_min: float = 15.0        # do not repeat the same alert for a worker within this window
+
+
+# SystemConfig key → AlertRules attribute
+RULE_CONFIG_KEYS = {f"alert_{f.name}": f.name for f in fields(AlertRules)}
+
+
+def rules_from_config() -> AlertRules:
+    """Build AlertRules from config_cache's typed getters; missing or malformed entries keep the defaults."""
+    defaults = AlertRules()
+    rules = {}
+    for key, attr in RULE_CONFIG_KEYS.items():
+        default = getattr(defaults, attr)
+        get = config_cache.get_int if isinstance(default, int) else config_cache.get_float
+        rules[attr] = get(key, default)
+    return AlertRules(**rules)
+
+
+@dataclass
+class _WorkerState:
+    fatigue_ts: deque = field(default_factory=deque)  # event ts (ms) of recent fatigue flags, sorted
+    ergo_run_start: Optional[int] = None               # ts of first ergo flag in the current run
+    newest_ts: int = 0                                 # newest event ts (ms) evaluated
+    sensor_ts: int = 0                                 # newest sensor snapshot ts (ms)
+    last_seen: float = 0.0                             # wall clock (s) when device time last moved forward
+    offline_alerted: bool = False
+    last_fired: Dict[str, float] = field(default_factory=dict)  # rule → wall clock (s)
+
+
+class AlertEngine:
+    """In-process rule evaluator. One instance per API process (see alert_engine)."""
+
+    def __init__(self):
+        self.rules = AlertRules()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: Dict[str, _WorkerState] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._tasks: List[asyncio.Task] = []
+        self._background: set[asyncio.Task] = set()
+        self._subscribed = False
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+        if not self._subscribed:
+            config_cache.on_change(self._apply_rules)
+            self._subscribed = True
+        self._tasks = [
+            asyncio.create_task(self._consume_loop()),
+            asyncio.create_task(self._flush_loop()),
+            asyncio.create_task(self._offline_loop()),
+        ]
+        logger.info("Alert engine started: %s", self.rules)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._evaluate(*self._queue.get_nowait())
+        await self._flush()
+        self._queue = None
+
+    def _apply_rules(self, values: Dict[str, str]) -> None:
+        # Called after config_cache has swapped in `values`, so its getters already see them
+        self.rules = rules_from_config()
+
+    # ── Ingest side (hot path) ────────────────────────────────────────────
+
+    def submit(self, worker_id: str, events: List[Tuple[int, bool, bool]]) -> None:
+        """Queue (ts_ms, risk_ergo, risk_fatigue) tuples for a worker. Never blocks."""
+        if not self.running:
+            return
+        try:
+            self._queue.put_nowait((worker_id, events))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def sensor(self, worker_id: str, ts: int) -> None:
+        """Live sensor snapshot; a heartbeat only if its ts moved forward (not a reposted stale sample)."""
+        if not self.running:
+            return
+        state = self._state(worker_id)
+        if ts > state.sensor_ts:
+            state.sensor_ts = ts
+            self._seen(state)
+
+    def device_status(self, worker_id: str, mpu_connected: bool) -> None:
+        """MPU disconnected: start the offline clock if it isn't already running. Never a heartbeat."""
+        if self.running and not mpu_connected:
+            state = self._state(worker_id)
+            if not state.last_seen:
+                state.last_seen = time.time()
+
+    # ── Evaluation ────────────────────────────────────────────────────────
+
+    def _state(self, worker_id: str) -> _WorkerState:
+        state = self._workers.get(worker_id)
+        if state is None:
+            state = self._workers[worker_id] = _WorkerState()
+        return state
+
+    @staticmethod
+    def _seen(state: _WorkerState) -> None:
+        state.last_seen = time.time()
+        state.offline_alerted = False
+
+    def _evaluate(self, worker_id: str, events: List[Tuple[int, bool, bool]]) -> None:
+        rules = self.rules
+        state = self._state(worker_id)
+        fatigue_window_ms = rules.fatigue_window_min * 60_000
+        ergo_run_ms = rules.ergo_continuous_min * 60_000
+
+        for ts, risk_ergo, risk_fatigue in events:
+            in_order = ts >= state.newest_ts
+            if ts > state.newest_ts:
+                state.newest_ts = ts
+                self._seen(state)
+            newest = state.newest_ts
+
+            if risk_fatigue and newest - ts <= fatigue_window_ms:
+                window = state.fatigue_ts
+                insort(window, ts)
+                while window and newest - window[0] > fatigue_window_ms:
+                    window.popleft()
+                if len(window) >= rules.fatigue_flag_count:
+                    self._fire(
+                        worker_id, state, RULE_FATIGUE, newest,
+                        title=f"Fatigue risk: {worker_id}",
+                        body=f"{len(window)} fatigue flags in the last {rules.fatigue_window_min:g} min.",
+                        score=min(100.0, 100.0 * len(window) / max(rules.fatigue_flag_count, 1)),
+                    )
+                    window.clear()
+
+            if not in_order:
+                continue
+            if risk_ergo:
+                if state.ergo_run_start is None:
+                    state.ergo_run_start = ts
+                elif ts - state.ergo_run_start >= ergo_run_ms:
+                    minutes = (ts - state.ergo_run_start) / 60_000
+                    self._fire(
+                        worker_id, state, RULE_ERGO, ts,
+                        title=f"Ergonomic risk: {worker_id}",
+                        body=f"Ergonomic risk flagged continuously for {minutes:.0f} min.",
+                        score=min(100.0, 100.0 * minutes / max(rules.ergo_continuous_min, 1e-6)),
+                    )
+                    state.ergo_run_start = ts
+            else:
+                state.ergo_run_start = None
+
+    def _sweep_offline(self) -> None:
+        """Runs on a timer, not per event: O(workers) every OFFLINE_SWEEP_SEC."""
+        now = time.time()
+        limit_sec = self.rules.device_offline_min * 60
+        if limit_sec <= 0:
+            return
+        for worker_id, state in self._workers.items():
+            if state.offline_alerted or not state.last_seen or now - state.last_seen < limit_sec:
+                continue
+            state.offline_alerted = True
+            self._fire(
+                worker_id, state, RULE_OFFLINE, int(now * 1000),
+                title=f"Device offline: {worker_id}",
+                body=f"No data received for {(now - state.last_seen) / 60:.0f} min.",
+                score=100.0,
+            )
+
+    def _fire(self, worker_id: str, state: _WorkerState, rule: str, ts: int, title: str, body: str, score: float) -> None:
+        now = time.time()
+        last = state.last_fired.get(rule)
+        if last is not None and now - last < self.rules.suppress_min * 60:
+            return
+        state.last_fired[rule] = now
+        self._pending.append({
+            "rule": rule,
+            "worker_id": worker_id,
+            "ts": ts,
+            "title": title,
+            "body": body,
+            "score": round(score, 1),
+        })
+
+    # ── Background loops ──────────────────────────────────────────────────
+
+    async def _consume_loop(self) -> None:
+        while True:
+            worker_id, events = await self._queue.get()
+            try:
+                self._evaluate(worker_id, events)
+            except Exception as e:
+                logger.error(f"Alert evaluation failed for {worker_id}: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SEC)
+            await self._flush()
+
+    async def _offline_loop(self) -> None:
+        while True:
+            await asyncio.sleep(OFFLINE_SWEEP_SEC)
+            self._sweep_offline()
+
+    async def _flush(self) -> None:
+        """Batch-insert pending alerts as broadcast notifications, then fan out to Slack/webhooks."""
+        if not self._pending:
+            return
+        alerts, self._pending = self._pending, []
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(Notification), [
+                    {"type": "alert", "title": a["title"], "body": a["body"], "read": False, "user_id": None}
+                    for a in alerts
+                ])
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to store {len(alerts)} alert notifications: {e}")
+
+        for a in alerts:
+            when = datetime.fromtimestamp(a["ts"] / 1000.0, tz=timezone.utc).isoformat()
+            await dispatch_webhook(a["rule"], {
+                "worker_id": a["worker_id"], "ts": a["ts"], "message": a["body"], "score": a["score"],
+            })
+            if SLACK_WEBHOOK_URL:
+                risk_type = {RULE_ERGO: "Ergonomic", RULE_FATIGUE: "Fatigue"}.get(a["rule"], "Device Offline")
+                task = asyncio.create_task(send_slack_alert(a["worker_id"], risk_type, a["score"], when))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+
+
+# Singleton instance
+alert_engine = AlertEngine()
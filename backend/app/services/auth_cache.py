@@ -0,0 +1,174 @@
+"""
+Industrial Wearable AI — Auth Cache
+Keeps get_current_user off the network in the common case.
+
+- Users: short-TTL in-process cache keyed by id. Entries are detached snapshots,
+  dropped on password/role change here and in other processes via AUTH_CHANNEL.
+- Revoked JTIs: local dict jti → expiry, seeded from the Redis blacklist keys and
+  kept in sync over AUTH_CHANNEL. While the subscription is down the local copy
+  may be stale, so is_revoked() falls back to a Redis EXISTS until it resyncs.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.models import User
+from app.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+AUTH_CHANNEL = "auth:invalidate"
+BLACKLIST_PREFIX = "blacklist:"
+USER_CACHE_TTL_SEC = float(os.getenv("AUTH_USER_CACHE_TTL_SEC", "30"))
+USER_CACHE_MAX = 10_000
+PURGE_INTERVAL_SEC = 60.0
+RESUBSCRIBE_DELAY_SEC = 5.0
+
+
+def _snapshot(user: User) -> User:
+    """Session-independent copy, safe to share between requests."""
+    return User(
+        id=user.id,
+        username=user.username,
+        hashed_password=user.hashed_password,
+        role=user.role,
+        created_at=user.created_at,
+    )
+
+
+class AuthCache:
+    """User + revoked-token cache. One instance per process (see auth_cache)."""
+
+    def __init__(self):
+        self._users: Dict[UUID, Tuple[float, User]] = {}
+        self._revoked: Dict[str, float] = {}  # jti → unix expiry
+        self._synced = False
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def synced(self) -> bool:
+        return self._synced
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._listen_loop()),
+            asyncio.create_task(self._purge_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._synced = False
+
+    # ── Users ─────────────────────────────────────────────────────────────
+
+    def get_user(self, user_id: UUID) -> Optional[User]:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._users.pop(user_id, None)
+            return None
+        return user
+
+    def put_user(self, user: User) -> None:
+        if len(self._users) >= USER_CACHE_MAX:
+            self._users.clear()
+        self._users[user.id] = (time.monotonic() + USER_CACHE_TTL_SEC, _snapshot(user))
+
+    async def invalidate_user(self, user_id: UUID) -> None:
+        """Drop a user everywhere. Call after changing password or role."""
+        self._users.pop(user_id, None)
+        await self._publish({"user_id": str(user_id)})
+
+    # ── Revoked tokens ────────────────────────────────────────────────────
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self._synced:
+            expires_at = self._revoked.get(jti)
+            return expires_at is not None and expires_at > time.time()
+        return bool(await redis_client.exists(f"{BLACKLIST_PREFIX}{jti}"))
+
+    async def revoke(self, jti: str, ttl: int) -> None:
+        """Blacklist a token until it would have expired anyway."""
+        if ttl <= 0:
+            return
+        await redis_client.setex(f"{BLACKLIST_PREFIX}{jti}", ttl, "blacklisted")
+        expires_at = time.time() + ttl
+        self._revoked[jti] = expires_at
+        await self._publish({"jti": jti, "exp": expires_at})
+
+    async def _seed_revoked(self) -> None:
+        now = time.time()
+        keys = [key async for key in redis_client.scan_iter(match=f"{BLACKLIST_PREFIX}*", count=1000)]
+        if not keys:
+            return
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.ttl(key)
+            ttls = await pipe.execute()
+        for key, ttl in zip(keys, ttls):
+            if ttl and ttl > 0:
+                self._revoked[key[len(BLACKLIST_PREFIX):]] = now + ttl
+
+    # ── Pub/sub ───────────────────────────────────────────────────────────
+
+    async def _publish(self, message: dict) -> None:
+        try:
+            await redis_client.publish(AUTH_CHANNEL, json.dumps(message))
+        except Exception as e:
+            logger.warning(f"Auth invalidation not published: {e}")
+
+    def _apply(self, raw: str) -> None:
+        message = json.loads(raw)
+        if "jti" in message:
+            self._revoked[message["jti"]] = float(message["exp"])
+        if "user_id" in message:
+            self._users.pop(UUID(message["user_id"]), None)
+
+    async def _listen_loop(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(AUTH_CHANNEL)
+                # Seed after subscribing so nothing published in between is missed
+                await self._seed_revoked()
+                self._synced = True
+                logger.info("Auth cache synced (%d revoked tokens)", len(self._revoked))
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        try:
+                            self._apply(message["data"])
+                        except (ValueError, KeyError, TypeError) as e:
+                            logger.warning(f"Bad auth invalidation message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Auth subscription lost; falling back to Redis lookups: {e}")
+            finally:
+                self._synced = False
+                self._users.clear()  # may have missed invalidations while disconnected
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SEC)
+
+    async def _purge_loop(self) -> None:
+        while True:
+            await asyncio.sleep(PURGE_INTERVAL_SEC)
+            now = time.time()
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+
+
+# Singleton instance
+auth_cache = AuthCache()
@@ -0,0 +1,172 @@
+"""
+Industrial Wearable AI — Cached System Configuration
+Serves SystemConfig values from memory; the DB is read once at startup and on change.
+
+POST /api/config calls config_cache.notify_changed(), which reloads this process
+and publishes on CONFIG_CHANNEL so every other API process reloads too. A slow
+periodic reload covers missed messages (e.g. while Redis was down).
+
+Typed getters (get_int/get_float) parse once per value and memoise, so hot paths can
+read thresholds without touching the DB or re-parsing strings (alert_engine rules).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import SystemConfig
+from app.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANNEL = "system_config:changed"
+FALLBACK_REFRESH_SEC = 300.0
+RESUBSCRIBE_DELAY_SEC = 5.0
+
+# Keys with these prefixes are served to edge gateways via GET /api/config/edge
+EDGE_KEY_PREFIXES = ("classifier_", "risk_", "anomaly_")
+
+def _digest(values: Dict[str, str]) -> str:
+    return '"' + hashlib.sha1(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:16] + '"'
+
+
+class ConfigCache:
+    """In-memory snapshot of system_config. One instance per process (see config_cache)."""
+
+    def __init__(self):
+        self._values: Dict[str, str] = {}
+        self._typed: Dict[Tuple[str, type], Any] = {}
+        self._etag = ""
+        self._edge_values: Dict[str, str] = {}
+        self._edge_etag = _digest({})
+        self._listeners: List[Callable[[Dict[str, str]], None]] = []
+        self._tasks: List[asyncio.Task] = []
+        self.loaded = False
+
+    @property
+    def etag(self) -> str:
+        return self._etag
+
+    @property
+    def edge_etag(self) -> str:
+        """ETag of the edge subset only, so unrelated config writes don't refetch on gateways."""
+        return self._edge_etag
+
+    @property
+    def edge_values(self) -> Dict[str, str]:
+        return dict(self._edge_values)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await self.reload()
+        self._tasks = [
+            asyncio.create_task(self._listen_loop()),
+            asyncio.create_task(self._refresh_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def reload(self) -> None:
+        """Replace the snapshot from the DB and notify listeners if anything changed."""
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(SystemConfig.key, SystemConfig.value))
+                values = {k: v for k, v in result.all()}
+        except Exception as e:
+            logger.error(f"Failed to load system config; keeping current values: {e}")
+            return
+        self.loaded = True
+        if values == self._values and self._etag:
+            return
+        self._values = values
+        self._typed = {}
+        self._etag = _digest(values)
+        self._edge_values = {k: v for k, v in values.items() if k.startswith(EDGE_KEY_PREFIXES)}
+        self._edge_etag = _digest(self._edge_values)
+        for listener in self._listeners:
+            try:
+                listener(values)
+            except Exception as e:
+                logger.error(f"Config listener {listener!r} failed: {e}")
+
+    async def notify_changed(self) -> None:
+        """Reload locally, then tell the other processes. Called after a config write commits."""
+        await self.reload()
+        try:
+            await redis_client.publish(CONFIG_CHANNEL, self._etag)
+        except Exception as e:
+            logger.warning(f"Config change not published (other processes catch up on refresh): {e}")
+
+    def on_change(self, listener: Callable[[Dict[str, str]], None]) -> None:
+        """Register a callback receiving the full key/value map after every change."""
+        self._listeners.append(listener)
+        if self.loaded:
+            listener(self._values)
+
+    # ── Reads (no I/O) ────────────────────────────────────────────────────
+
+    def values(self) -> Dict[str, str]:
+        return dict(self._values)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self._values.get(key, default)
+
+    def _typed_get(self, key: str, cast: Callable[[str], Any], kind: type, default: Any) -> Any:
+        cache_key = (key, kind)
+        if cache_key in self._typed:
+            return self._typed[cache_key]
+        raw = self._values.get(key)
+        if raw is None:
+            return default
+        try:
+            value = cast(raw)
+        except (TypeError, ValueError):
+            logger.warning("Invalid %s config %s=%r; using default", kind.__name__, key, raw)
+            value = default
+        self._typed[cache_key] = value
+        return value
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        return self._typed_get(key, lambda raw: int(float(raw)), int, default)
+
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        return self._typed_get(key, float, float, default)
+
+    # ── Background loops ──────────────────────────────────────────────────
+
+    async def _listen_loop(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(CONFIG_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message" and message.get("data") != self._etag:
+                        await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Config subscription lost; retrying: {e}")
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+            await asyncio.sleep(RESUBSCRIBE_DELAY_SEC)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(FALLBACK_REFRESH_SEC)
+            await self.reload()
+
+
+# Singleton instance
+config_cache = ConfigCache()
@@ -1,34 +1,67 @@
 import logging
+import os
 import smtplib
+from email.mime.application import MIMEApplication
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# In a real environment, you'd use SendGrid/AWS SES or configured SMTP
+# Here we default to a local catcher for development
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")  # Assuming highly local config or disabled
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))  # Common mailhog testing port
+SMTP_FROM = os.getenv("SMTP_FROM", "alerts@wearable-ai.local")
+
+
+def _send(msg: MIMEMultipart, recipient: str) -> None:
+    """Deliver a prepared message; log and swallow SMTP failures."""
+    try:
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+            # server.login() and TLS skipped for local test environment
+            server.sendmail(msg["From"], [recipient], msg.as_string())
+            logger.info(f"Dispatched email to {recipient}")
+    except ConnectionRefusedError:
+        logger.debug(f"Email skipped: No SMTP server listening on {SMTP_HOST}:{SMTP_PORT}")
+    except Exception as e:
+        logger.error(f"Failed to send email to {recipient}: {e}")
+
+
 def send_email_alert(recipient: str, subject: str, body_html: str):
     """SMTP service implementation for dispatching HTML emails."""
-    # In a real environment, you'd use SendGrid/AWS SES or configured SMTP
-    # Here we mock it for development
-    
-    mock_smtp_host = "localhost" # Assuming highly local config or disabled
-    mock_smtp_port = 1025 # Common mailhog testing port
-    
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
-    msg["From"] = "alerts@wearable-ai.local"
+    msg["From"] = SMTP_FROM
     msg["To"] = recipient
 
     # Compile the HTML template
     html_part = MIMEText(body_html, "html")
     msg.attach(html_part)
 
-    try:
-        # Non-blocking async smtp should ideally be used (aiosmtplib), but synchronous serves the MVP
-        with smtplib.SMTP(mock_smtp_host, mock_smtp_port) as server:
-            # server.login() and TLS skipped for local test environment
-            server.sendmail(msg["From"], [recipient], msg.as_string())
-            logger.info(f"Dispatched email alert to {recipient}")
-    except ConnectionRefusedError:
-        logger.debug(f"Email skipped: No SMTP server listening on {mock_smtp_host}:{mock_smtp_port}")
-    except Exception as e:
-        logger.error(f"Failed to send email to {recipient}: {e}")
+    # Non-blocking async smtp should ideally be used (aiosmtplib), but synchronous serves the MVP
+    _send(msg, recipient)
+
+
+def send_email_sync(
+    to_address: str,
+    subject: str,
+    body: str,
+    attachments: List[Tuple[str, bytes, str]] | None = None,
+):
+    """
+    Send a plain-text email with optional attachments (used by Celery report tasks).
+    attachments: [(filename, content, mime_subtype)], e.g. ("summary.pdf", pdf_bytes, "pdf").
+    """
+    msg = MIMEMultipart()
+    msg["Subject"] = subject
+    msg["From"] = SMTP_FROM
+    msg["To"] = to_address
+    msg.attach(MIMEText(body, "plain"))
+
+    for filename, content, subtype in attachments or []:
+        part = MIMEApplication(content, _subtype=subtype)
+        part.add_header("Content-Disposition", "attachment", filename=filename)
+        msg.attach(part)
+
+    _send(msg, to_address)
@@ -0,0 +1,151 @@
+"""
+Industrial Wearable AI — Edge Ingest Rate Limiter
+Token bucket per gateway (API key), stored in Redis and updated by one Lua script,
+so every API worker process draws from the same bucket.
+
+Gateways come from EDGE_GATEWAYS ("gateway_id:api_key[:rate_per_sec[:burst]]",
+comma-separated). The legacy single EDGE_API_KEY is still accepted as gateway
+"default"; the dev key is only accepted while EDGE_GATEWAYS is empty, so it stops
+working once per-gateway keys are configured. If Redis is unreachable each process falls back to a local bucket
+(limits then apply per process rather than globally).
+"""
+import hmac
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# A gateway with 50 workers sends ~20 event batches, sensor and status posts per
+# second; the defaults leave headroom for offline-buffer replays.
+DEFAULT_RATE_PER_SEC = float(os.getenv("EDGE_RATE_PER_SEC", "100"))
+DEFAULT_BURST = float(os.getenv("EDGE_BURST", "500"))
+BUCKET_PREFIX = "ingest_bucket:"
+DEV_API_KEY = "dev-edge-key-123"
+
+# KEYS[1] bucket hash; ARGV rate/sec, burst, cost. Time comes from the Redis server
+# so clock skew between API hosts cannot mint tokens.
+# Returns {allowed (0/1), milliseconds until enough tokens}.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+
+local allowed = 0
+local wait_ms = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    wait_ms = math.ceil((cost - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return {allowed, wait_ms}
+"""
+
+
+@dataclass(frozen=True)
+class EdgeGateway:
+    gateway_id: str
+    api_key: str
+    rate_per_sec: float = DEFAULT_RATE_PER_SEC
+    burst: float = DEFAULT_BURST
+
+
+def parse_gateways(raw: str, legacy_key: Optional[str] = None) -> List[EdgeGateway]:
+    """Parse EDGE_GATEWAYS; malformed entries are logged and skipped."""
+    gateways = []
+    for entry in (e.strip() for e in raw.split(",")):
+        if not entry:
+            continue
+        parts = entry.split(":")
+        try:
+            if len(parts) < 2 or not parts[0] or not parts[1]:
+                raise ValueError("expected gateway_id:api_key")
+            rate = float(parts[2]) if len(parts) > 2 and parts[2] else DEFAULT_RATE_PER_SEC
+            burst = float(parts[3]) if len(parts) > 3 and parts[3] else max(DEFAULT_BURST, rate)
+            if rate <= 0 or burst <= 0:
+                raise ValueError("rate and burst must be positive")
+            gateways.append(EdgeGateway(parts[0], parts[1], rate, burst))
+        except ValueError as e:
+            logger.error("Ignoring EDGE_GATEWAYS entry %r: %s", parts[0], e)
+    if legacy_key and not any(g.api_key == legacy_key for g in gateways):
+        gateways.append(EdgeGateway("default", legacy_key))
+    return gateways
+
+
+class IngestLimiter:
+    """Gateway lookup + shared token buckets. One instance per process (see ingest_limiter)."""
+
+    def __init__(self, gateways: List[EdgeGateway]):
+        self.gateways = gateways
+        self._script = redis_client.register_script(TOKEN_BUCKET_LUA)
+        self._local: Dict[str, Tuple[float, float]] = {}  # gateway_id → (tokens, monotonic ts)
+        self._redis_ok = True
+        self.throttled: Dict[str, int] = {}
+
+    def authenticate(self, api_key: Optional[str]) -> Optional[EdgeGateway]:
+        """Constant-time compare against every configured key."""
+        if not api_key:
+            return None
+        found = None
+        for gw in self.gateways:
+            if hmac.compare_digest(gw.api_key.encode(), api_key.encode()):
+                found = gw
+        return found
+
+    async def acquire(self, gw: EdgeGateway, cost: int = 1) -> Tuple[bool, float]:
+        """Take `cost` tokens. Returns (allowed, retry_after_sec)."""
+        try:
+            allowed, wait_ms = await self._script(
+                keys=[f"{BUCKET_PREFIX}{gw.gateway_id}"],
+                args=[gw.rate_per_sec, gw.burst, cost],
+            )
+            allowed, retry_after = bool(allowed), int(wait_ms) / 1000.0
+            self._redis_ok = True
+        except Exception as e:
+            if self._redis_ok:
+                logger.warning(f"Ingest limiter using local buckets (Redis unavailable): {e}")
+                self._redis_ok = False
+            allowed, retry_after = self._acquire_local(gw, cost)
+        if not allowed:
+            self.throttled[gw.gateway_id] = self.throttled.get(gw.gateway_id, 0) + 1
+        return allowed, retry_after
+
+    def _acquire_local(self, gw: EdgeGateway, cost: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._local.get(gw.gateway_id, (gw.burst, now))
+        tokens = min(gw.burst, tokens + (now - ts) * gw.rate_per_sec)
+        if tokens >= cost:
+            self._local[gw.gateway_id] = (tokens - cost, now)
+            return True, 0.0
+        self._local[gw.gateway_id] = (tokens, now)
+        return False, (cost - tokens) / gw.rate_per_sec
+
+
+def gateways_from_env() -> List[EdgeGateway]:
+    """EDGE_GATEWAYS plus an explicitly set EDGE_API_KEY; DEV_API_KEY only when EDGE_GATEWAYS is empty."""
+    raw = os.getenv("EDGE_GATEWAYS", "")
+    legacy_key = os.getenv("EDGE_API_KEY")
+    if not raw.strip():
+        legacy_key = legacy_key or DEV_API_KEY
+    elif legacy_key == DEV_API_KEY:
+        logger.warning("EDGE_GATEWAYS is set; ignoring the dev EDGE_API_KEY")
+        legacy_key = None
+    return parse_gateways(raw, legacy_key)
+
+
+# Singleton instance
+ingest_limiter = IngestLimiter(gateways_from_env())
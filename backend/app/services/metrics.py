@@ -0,0 +1,307 @@
+"""
+Industrial Wearable AI — API Metrics
+Prometheus text-format metrics for one API process, served at GET /metrics:
+
+- HTTP: per-route latency histograms (route template, not raw path) and an
+  in-flight gauge, recorded by RequestMetricsMiddleware (pure ASGI, so no
+  per-request task or body wrapping). Request logging is sampled.
+- DB: per-statement timing from SQLAlchemy cursor events, a slow-query log and
+  sampled EXPLAIN of slow SELECTs (run off the request path), pool gauges.
+- WebSocket clients / broadcast latency and background queue depths.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Fraction of ordinary requests logged; errors (5xx) and slow requests are always logged
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+EXPLAIN_COOLDOWN_SEC = 600.0  # per statement text
+STATEMENT_LOG_CHARS = 500
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _labels(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{self._labels(key)} {_fmt(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        """Mirror a total kept elsewhere (used by scrape-time collectors)."""
+        self._values[labelvalues] = value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        state = self._values.get(labelvalues)
+        if state is None:
+            state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, n) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    """All API metrics for this process. Collectors refresh gauges owned by other services on scrape."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+        self.http_seconds = self._add(Histogram(
+            "api_http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")))
+        self.http_in_flight = self._add(Gauge(
+            "api_http_requests_in_flight", "Requests currently being served"))
+        self.db_seconds = self._add(Histogram(
+            "api_db_statement_duration_seconds", "SQL statement latency by operation", ("operation",)))
+        self.db_slow = self._add(Counter(
+            "api_db_slow_statements_total", "Statements slower than SLOW_QUERY_MS", ("operation",)))
+        self.db_errors = self._add(Counter(
+            "api_db_statement_errors_total", "Statements that raised", ("operation",)))
+        self.db_pool_checked_out = self._add(Gauge(
+            "api_db_pool_checked_out", "Connections currently checked out of the pool"))
+        self.db_pool_size = self._add(Gauge(
+            "api_db_pool_size", "Configured pool size"))
+        self.db_pool_overflow = self._add(Gauge(
+            "api_db_pool_overflow", "Connections open beyond pool_size"))
+        self.ws_clients = self._add(Gauge(
+            "api_ws_clients", "Connected /ws/live clients"))
+        self.ws_broadcast_seconds = self._add(Histogram(
+            "api_ws_broadcast_duration_seconds", "Time to fan one message out to all clients"))
+        self.ws_messages = self._add(Counter(
+            "api_ws_messages_total", "Messages broadcast"))
+        self.queue_depth = self._add(Gauge(
+            "api_background_queue_depth", "Items waiting in in-process background queues", ("queue",)))
+        self.queue_dropped = self._add(Counter(
+            "api_background_queue_dropped_total", "Items dropped because a background queue was full", ("queue",)))
+        self.ingest_throttled = self._add(Counter(
+            "api_ingest_throttled_total", "Edge requests rejected by the gateway token bucket", ("gateway",)))
+
+    def _add(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────
+
+class RequestMetricsMiddleware:
+    """Per-route latency + in-flight gauge + sampled request log (replaces per-request logging)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        metrics.http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            metrics.http_in_flight.inc(amount=-1)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"  # raw paths would explode cardinality
+            metrics.http_seconds.observe(duration, scope["method"], route_path, str(status))
+            duration_ms = duration * 1000
+            if status >= 500 or duration_ms >= SLOW_REQUEST_MS or random.random() < REQUEST_LOG_SAMPLE_RATE:
+                logger.info("%s %s %s %.1fms", scope["method"], scope["path"], status, duration_ms)
+
+
+# ── Database ──────────────────────────────────────────────────────────────
+
+_explained: Dict[str, float] = {}
+_explain_tasks: set = set()
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach timing hooks to the engine (called once, in app.database)."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start"].pop()
+        op = _operation(statement)
+        metrics.db_seconds.observe(duration, op)
+        if duration * 1000 >= SLOW_QUERY_MS:
+            _slow_query(engine, statement, parameters, executemany, op, duration)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        metrics.db_errors.inc(_operation(context.statement or ""))
+
+    def _collect_pool():
+        pool = sync_engine.pool
+        if hasattr(pool, "checkedout"):
+            metrics.db_pool_checked_out.set(pool.checkedout())
+            metrics.db_pool_size.set(pool.size())
+            metrics.db_pool_overflow.set(max(0, pool.overflow()))
+
+    metrics.add_collector(_collect_pool)
+
+
+def _slow_query(engine: AsyncEngine, statement: str, parameters, executemany: bool, op: str, duration: float) -> None:
+    metrics.db_slow.inc(op)
+    logger.warning(
+        f"Slow query {duration * 1000:.0f}ms ({op}): {' '.join(statement.split())[:STATEMENT_LOG_CHARS]}"
+    )
+    # EXPLAIN (never ANALYZE, so nothing is re-executed) a sample of slow reads, once per statement per cooldown
+    if op not in ("SELECT", "WITH") or executemany or random.random() >= SLOW_QUERY_EXPLAIN_RATE:
+        return
+    now = time.monotonic()
+    if now - _explained.get(statement, -EXPLAIN_COOLDOWN_SEC) < EXPLAIN_COOLDOWN_SEC:
+        return
+    _explained[statement] = now
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # sync engine use (Celery): no loop to run the EXPLAIN on
+    task = loop.create_task(_explain(engine, statement, tuple(parameters or ())))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+async def _explain(engine: AsyncEngine, statement: str, parameters: tuple) -> None:
+    try:
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            rows = await raw.driver_connection.fetch(f"EXPLAIN {statement}", *parameters)
+        plan = "\n".join(f"    {row[0]}" for row in rows)
+        logger.warning(f"EXPLAIN for slow query {' '.join(statement.split())[:120]}...:\n{plan}")
+    except Exception as e:
+        logger.info(f"EXPLAIN of slow query skipped: {e}")
+
+
+# ── Background services ───────────────────────────────────────────────────
+
+def collect_services() -> None:
+    """Mirror WebSocket, queue and limiter state owned by other services."""
+    from app.services.alert_engine import alert_engine
+    from app.services.ingest_limiter import ingest_limiter
+    from app.services.webhooks import webhook_dispatcher
+    from app.services.websocket_hub import ws_hub
+
+    metrics.ws_clients.set(ws_hub.client_count)
+    metrics.queue_depth.set(alert_engine.queue_depth, "alert_engine")
+    metrics.queue_dropped.set(alert_engine.dropped, "alert_engine")
+    metrics.queue_depth.set(webhook_dispatcher.queue_depth, "webhooks")
+    metrics.queue_dropped.set(webhook_dispatcher.metrics.dropped, "webhooks")
+    for gateway_id, count in ingest_limiter.throttled.items():
+        metrics.ingest_throttled.set(count, gateway_id)
+
+
+metrics.add_collector(collect_services)
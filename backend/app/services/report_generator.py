@@ -1,7 +1,8 @@
 """
 Industrial Wearable AI — PDF Report Generator
-Generates formatted shift reports using ReportLab.
+Generates formatted shift reports using ReportLab, plus CSV exports of period summaries.
 """
+import csv
 import io
 import time
 from datetime import datetime
@@ -133,3 +134,129 @@ def generate_shift_report_pdf(
     pdf_bytes = buffer.getvalue()
     buffer.close()
     return pdf_bytes
+
+
+SUMMARY_CSV_COLUMNS = [
+    "Station", "Worker", "Sessions", "Hours Worked", "Active %", "Idle %",
+    "Adjusting %", "Error %", "Alert Count", "Productivity Score",
+]
+
+# Keep the PDF readable on large floors; the CSV attachment carries every worker.
+SUMMARY_PDF_WORKER_ROWS = 10
+
+
+def _summary_table(rows: List[List[Any]], col_widths: List[int]) -> Table:
+    """Table styled like the risk event log in the shift report."""
+    table = Table(rows, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    return table
+
+
+def generate_period_summary_pdf(title: str, summary: Dict[str, Any]) -> bytes:
+    """
+    Generates a PDF for a period summary from shift_summary.compute_period_summary.
+    Returns the PDF as a byte string.
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=40,
+        leftMargin=40,
+        topMargin=40,
+        bottomMargin=40
+    )
+
+    styles = getSampleStyleSheet()
+    title_style = styles['Heading1']
+    title_style.alignment = 1 # Center
+    subtitle_style = styles['Heading3']
+    normal_style = styles['Normal']
+
+    elements = []
+    elements.append(Paragraph("Industrial Wearable AI", title_style))
+    elements.append(Paragraph(title, title_style))
+    elements.append(Spacer(1, 20))
+
+    since, until, totals = summary["since"], summary["until"], summary["totals"]
+    header_data = [
+        ["Period:", f"{since.strftime('%Y-%m-%d %H:%M')} – {until.strftime('%Y-%m-%d %H:%M')} UTC"],
+        ["Workers:", str(totals["worker_count"])],
+        ["Hours Worked:", f"{totals['hours_worked']:.1f}"],
+        ["Productivity Score:", f"{totals['productivity_score']:.1f}%"],
+        ["Total Alerts:", str(totals["alert_count"])],
+    ]
+    header_table = Table(header_data, colWidths=[150, 300])
+    header_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('BACKGROUND', (0, 0), (-1, -1), colors.whitesmoke),
+        ('BOX', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('INNERGRID', (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    elements.append(header_table)
+    elements.append(Spacer(1, 20))
+
+    elements.append(Paragraph("Stations", subtitle_style))
+    if not summary["stations"]:
+        elements.append(Paragraph("No sessions recorded in this period.", normal_style))
+    else:
+        station_rows = [["Station", "Workers", "Hours", "Active %", "Alerts", "Score"]]
+        for st in summary["stations"]:
+            station_rows.append([
+                st["station"], st["worker_count"], f"{st['hours_worked']:.1f}",
+                f"{st['active_pct']:.1f}", st["alert_count"], f"{st['productivity_score']:.1f}",
+            ])
+        elements.append(_summary_table(station_rows, [130, 60, 70, 70, 70, 70]))
+    elements.append(Spacer(1, 20))
+
+    workers = summary["workers"]
+    if workers:
+        worker_header = ["Worker", "Station", "Hours", "Active %", "Alerts", "Score"]
+
+        def _worker_rows(entries):
+            return [worker_header] + [
+                [w["worker"], w["station"], f"{w['hours_worked']:.1f}", f"{w['active_pct']:.1f}",
+                 w["alert_count"], f"{w['productivity_score']:.1f}"]
+                for w in entries
+            ]
+
+        n = SUMMARY_PDF_WORKER_ROWS
+        elements.append(Paragraph(f"Top {min(n, len(workers))} Workers", subtitle_style))
+        elements.append(_summary_table(_worker_rows(workers[:n]), [100, 100, 70, 70, 70, 70]))
+        if len(workers) > n:
+            elements.append(Spacer(1, 20))
+            elements.append(Paragraph(f"Bottom {min(n, len(workers) - n)} Workers", subtitle_style))
+            elements.append(_summary_table(_worker_rows(workers[max(n, len(workers) - n):]), [100, 100, 70, 70, 70, 70]))
+            elements.append(Spacer(1, 10))
+            elements.append(Paragraph("Full per-worker breakdown is in the attached CSV.", normal_style))
+
+    doc.build(elements)
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def generate_period_summary_csv(summary: Dict[str, Any]) -> bytes:
+    """Per-worker rows of a period summary as UTF-8 CSV bytes."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(SUMMARY_CSV_COLUMNS)
+    for w in summary["workers"]:
+        writer.writerow([
+            w["station"], w["worker"], w["session_count"], w["hours_worked"],
+            w["active_pct"], w["idle_pct"], w["adjusting_pct"], w["error_pct"],
+            w["alert_count"], w["productivity_score"],
+        ])
+    return output.getvalue().encode("utf-8")
@@ -0,0 +1,113 @@
+"""
+Industrial Wearable AI — Shift Summary Service
+Set-based rollups over session_aggregates for the scheduled daily/weekly reports.
+Uses a sync Session so Celery workers can call it without an event loop.
+
+One GROUP BY ROLLUP(role, worker) query returns per-worker rows, per-station
+subtotals and the grand total in a single pass. Workers have no dedicated station
+column yet, so the worker role is used as the station.
+"""
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session as OrmSession
+
+from app.models import Session, SessionAggregate, Worker
+from app.services.productivity import compute_productivity_score
+
+UNASSIGNED_STATION = "Unassigned"
+
+# GROUPING(role, name) bitmask → rollup level
+_LEVEL_WORKER = 0
+_LEVEL_STATION = 1
+_LEVEL_TOTAL = 3
+
+
+def _row_to_entry(row) -> Dict[str, Any]:
+    """Convert one rollup row into a summary entry with a productivity score."""
+    duration_min = float(row.duration_min or 0)
+    alerts = int(row.alert_count or 0)
+    active = float(row.active_pct or 0)
+    idle = float(row.idle_pct or 0)
+    adjusting = float(row.adjusting_pct or 0)
+    error = float(row.error_pct or 0)
+    return {
+        "station": row.station or UNASSIGNED_STATION,
+        "worker": row.worker,
+        "worker_count": int(row.worker_count or 0),
+        "session_count": int(row.session_count or 0),
+        "hours_worked": round(duration_min / 60.0, 1),
+        "active_pct": round(active, 1),
+        "idle_pct": round(idle, 1),
+        "adjusting_pct": round(adjusting, 1),
+        "error_pct": round(error, 1),
+        "alert_count": alerts,
+        "productivity_score": compute_productivity_score(
+            active, idle, adjusting, error, alerts,
+            session_duration_minutes=max(duration_min, 1.0),
+        ),
+    }
+
+
+def compute_period_summary(db: OrmSession, since: datetime, until: datetime) -> Dict[str, Any]:
+    """
+    Summarise all sessions started in [since, until).
+    Returns {"since", "until", "totals", "stations", "workers"}; stations and workers
+    are sorted by productivity score, best first.
+    """
+    end_ts = func.coalesce(Session.ended_at, until)
+    duration_min = func.extract("epoch", end_ts - Session.started_at) / 60.0
+
+    stmt = (
+        select(
+            Worker.role.label("station"),
+            Worker.name.label("worker"),
+            func.grouping(Worker.role, Worker.name).label("level"),
+            func.count(func.distinct(Worker.id)).label("worker_count"),
+            func.count(Session.id).label("session_count"),
+            func.sum(duration_min).label("duration_min"),
+            func.avg(SessionAggregate.active_pct).label("active_pct"),
+            func.avg(SessionAggregate.idle_pct).label("idle_pct"),
+            func.avg(SessionAggregate.adjusting_pct).label("adjusting_pct"),
+            func.avg(SessionAggregate.error_pct).label("error_pct"),
+            func.sum(SessionAggregate.alert_count).label("alert_count"),
+        )
+        .select_from(SessionAggregate)
+        .join(Session, Session.id == SessionAggregate.session_id)
+        .join(Worker, Worker.id == Session.worker_id)
+        .where(Session.started_at >= since)
+        .where(Session.started_at < until)
+        .group_by(func.rollup(Worker.role, Worker.name))
+    )
+    rows = db.execute(stmt).all()
+
+    totals: Dict[str, Any] | None = None
+    stations: List[Dict[str, Any]] = []
+    workers: List[Dict[str, Any]] = []
+    for row in rows:
+        entry = _row_to_entry(row)
+        if row.level == _LEVEL_TOTAL:
+            totals = entry
+        elif row.level == _LEVEL_STATION:
+            stations.append(entry)
+        elif row.level == _LEVEL_WORKER:
+            workers.append(entry)
+
+    stations.sort(key=lambda e: e["productivity_score"], reverse=True)
+    workers.sort(key=lambda e: e["productivity_score"], reverse=True)
+
+    if totals is None:
+        totals = {
+            "worker_count": 0, "session_count": 0, "hours_worked": 0.0,
+            "active_pct": 0.0, "idle_pct": 0.0, "adjusting_pct": 0.0, "error_pct": 0.0,
+            "alert_count": 0, "productivity_score": 0.0,
+        }
+
+    return {
+        "since": since,
+        "until": until,
+        "totals": totals,
+        "stations": stations,
+        "workers": workers,
+    }
@@ -1,34 +1,317 @@
-from typing import Dict, Any, List
-import httpx
+"""
+Industrial Wearable AI — Webhook Dispatcher
+Delivers platform events (alerts, anomalies, session_end) to partner URLs.
+
+dispatch_webhook() only enqueues, so a slow partner never delays ingestion.
+A background loop groups queued events per subscriber over a short window and
+POSTs each batch through one pooled httpx client with bounded concurrency.
+Failed batches go to webhook_deliveries and are retried with exponential backoff.
+"""
+import asyncio
 import logging
-from app.models.activity_event import ActivityEvent
-from pydantic import BaseModel
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import httpx
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models import WebhookDelivery, WebhookSubscription
 
 logger = logging.getLogger(__name__)
 
-class WebhookSubscription(BaseModel):
-    url: str
-    events: List[str] # e.g. ["anomaly", "fatigue_alert", "session_end"]
+BATCH_WINDOW_SEC = float(os.getenv("WEBHOOK_BATCH_WINDOW_SEC", "0.5"))
+MAX_BATCH_EVENTS = int(os.getenv("WEBHOOK_MAX_BATCH_EVENTS", "100"))
+MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "20"))
+QUEUE_MAXSIZE = 10_000
+REQUEST_TIMEOUT_SEC = 5.0
 
-# In-memory mock for registered webhooks (would be DB in prod)
-REGISTERED_WEBHOOKS: List[WebhookSubscription] = []
+RETRY_POLL_SEC = 5.0
+RETRY_BATCH_LIMIT = 50
+RETRY_BASE_SEC = 5.0
+RETRY_MAX_SEC = 3600.0
+MAX_ATTEMPTS = 8  # ~1h of cumulative backoff before a delivery is marked dead
+CLAIM_LEASE_SEC = 120.0  # a claimed retry batch is due again after this if its process died mid-POST
+SUBSCRIPTION_REFRESH_SEC = 30.0  # picks up registrations made by other worker processes
 
-async def dispatch_webhook(event_type: str, payload: Dict[str, Any]):
-    """Dispatches a generic JSON POST to securely registered webhook URLs listening to this event type."""
-    async with httpx.AsyncClient() as client:
-        for sub in REGISTERED_WEBHOOKS:
-            if event_type in sub.events or "*" in sub.events:
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff: 5s, 10s, 20s, ... capped at RETRY_MAX_SEC."""
+    return min(RETRY_MAX_SEC, RETRY_BASE_SEC * (2 ** max(0, attempts - 1)))
+
+
+class DeliveryMetrics:
+    """Delivery counters and a fixed-bucket latency histogram (milliseconds)."""
+
+    BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(self.BUCKETS_MS) + 1)  # last bucket = +Inf
+        self.latency_sum_ms = 0.0
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.dead = 0
+        self.dropped = 0
+
+    def observe(self, latency_ms: float, ok: bool) -> None:
+        for i, bound in enumerate(self.BUCKETS_MS):
+            if latency_ms <= bound:
+                self.bucket_counts[i] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+        self.latency_sum_ms += latency_ms
+        if ok:
+            self.delivered += 1
+        else:
+            self.failed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        total = sum(self.bucket_counts)
+        buckets, cumulative = {}, 0
+        for bound, count in zip(list(self.BUCKETS_MS) + ["+Inf"], self.bucket_counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "dropped": self.dropped,
+            "latency_ms_avg": round(self.latency_sum_ms / total, 1) if total else None,
+            "latency_ms_buckets": buckets,
+        }
+
+
+class WebhookDispatcher:
+    """Queue + background delivery loops. One instance per process (see webhook_dispatcher)."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._subscriptions: List[WebhookSubscription] = []
+        self._tasks: List[asyncio.Task] = []
+        self._inflight: set[asyncio.Task] = set()
+        self.metrics = DeliveryMetrics()
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        """Create the pooled client and start the batch and retry loops."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        self._client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT_SEC,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY),
+        )
+        await self.reload_subscriptions()
+        self._tasks = [
+            asyncio.create_task(self._batch_loop()),
+            asyncio.create_task(self._retry_loop()),
+        ]
+        logger.info("Webhook dispatcher started (%d subscriptions)", len(self._subscriptions))
+
+    async def stop(self) -> None:
+        """Cancel loops, wait for in-flight deliveries, close the client."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._client:
+            await self._client.aclose()
+        self._tasks = []
+        self._queue = None
+        self._client = None
+
+    async def reload_subscriptions(self) -> None:
+        """Refresh the in-memory subscriber list from the DB."""
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(WebhookSubscription).where(WebhookSubscription.active == True)
+                )
+                self._subscriptions = list(result.scalars().all())
+        except Exception as e:
+            logger.error(f"Failed to load webhook subscriptions: {e}")
+
+    def _matching(self, event_type: str) -> List[WebhookSubscription]:
+        return [s for s in self._subscriptions if event_type in s.events or "*" in s.events]
+
+    def enqueue(self, event_type: str, payload: Dict[str, Any]) -> None:
+        """Non-blocking: queue an event for batched delivery. Drops (and counts) when the queue is full."""
+        if not self.running or not self._matching(event_type):
+            return
+        item = {"event": event_type, "data": payload, "ts": int(time.time() * 1000)}
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.metrics.dropped += 1
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            batches: Dict[UUID, List[dict]] = defaultdict(list)
+            subs_by_id: Dict[UUID, WebhookSubscription] = {}
+            deadline = loop.time() + BATCH_WINDOW_SEC
+            while True:
+                for sub in self._matching(item["event"]):
+                    batches[sub.id].append(item)
+                    subs_by_id[sub.id] = sub
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
                 try:
-                    # Execute async POST request
-                    response = await client.post(sub.url, json={
-                        "event": event_type,
-                        "data": payload
-                    }, timeout=5.0)
-                    if response.status_code >= 400:
-                        logger.warning(f"Webhook {sub.url} failed with status {response.status_code}")
-                except Exception as e:
-                    logger.error(f"Error dispatching webhook to {sub.url}: {e}")
-
-async def register_webhook_subscription(url: str, events: List[str]):
-    REGISTERED_WEBHOOKS.append(WebhookSubscription(url=url, events=events))
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            for sub_id, events in batches.items():
+                for i in range(0, len(events), MAX_BATCH_EVENTS):
+                    chunk = {"events": events[i : i + MAX_BATCH_EVENTS]}
+                    task = asyncio.create_task(self._deliver_new(subs_by_id[sub_id], chunk))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+
+    async def _post(self, url: str, payload: dict) -> Optional[str]:
+        """POST one batch; return None on success, else an error string."""
+        async with self._semaphore:
+            start = time.perf_counter()
+            error = None
+            try:
+                response = await self._client.post(url, json=payload)
+                if response.status_code >= 400:
+                    error = f"HTTP {response.status_code}"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            self.metrics.observe((time.perf_counter() - start) * 1000, error is None)
+            return error
+
+    async def _deliver_new(self, sub: WebhookSubscription, payload: dict) -> None:
+        error = await self._post(sub.url, payload)
+        if error is None:
+            return
+        logger.warning(f"Webhook {sub.url} failed ({error}); queued for retry")
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(WebhookDelivery(
+                    subscription_id=sub.id,
+                    payload=payload,
+                    attempts=1,
+                    next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=retry_delay(1)),
+                    last_error=error[:1000],
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist webhook retry for {sub.url}: {e}")
+
+    async def _retry_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_refresh = loop.time() + SUBSCRIPTION_REFRESH_SEC
+        while True:
+            await asyncio.sleep(RETRY_POLL_SEC)
+            if loop.time() >= next_refresh:
+                await self.reload_subscriptions()
+                next_refresh = loop.time() + SUBSCRIPTION_REFRESH_SEC
+            try:
+                await self._retry_due()
+            except Exception as e:
+                logger.error(f"Webhook retry pass failed: {e}")
+
+    async def _retry_due(self) -> None:
+        """
+        Retry due deliveries in three steps, so no row lock or pooled connection is held
+        while partners respond:
+        1. claim: lock due rows (SKIP LOCKED lets several worker processes share the
+           queue), push next_attempt_at out by CLAIM_LEASE_SEC, commit;
+        2. POST with no transaction open;
+        3. record results in a short transaction, only for rows still under our claim
+           (a process that dies mid-retry leaves them due again once the lease expires).
+        """
+        now = datetime.now(timezone.utc)
+        lease_until = now + timedelta(seconds=CLAIM_LEASE_SEC)
+        async with AsyncSessionLocal() as db:
+            stmt = (
+                select(WebhookDelivery, WebhookSubscription.url)
+                .join(WebhookSubscription, WebhookSubscription.id == WebhookDelivery.subscription_id)
+                .where(WebhookDelivery.status == "pending")
+                .where(WebhookDelivery.next_attempt_at <= now)
+                .order_by(WebhookDelivery.next_attempt_at)
+                .limit(RETRY_BATCH_LIMIT)
+                .with_for_update(skip_locked=True, of=WebhookDelivery)
+            )
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                return
+            claimed = [(d.id, url, d.payload, d.attempts) for d, url in rows]
+            for delivery, _ in rows:
+                delivery.next_attempt_at = lease_until
+            await db.commit()
+
+        errors = await asyncio.gather(*(self._post(url, payload) for _, url, payload, _ in claimed))
+
+        still_claimed = WebhookDelivery.next_attempt_at == lease_until
+        done = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            delivered = [delivery_id for (delivery_id, *_), error in zip(claimed, errors) if error is None]
+            if delivered:
+                await db.execute(delete(WebhookDelivery).where(WebhookDelivery.id.in_(delivered)).where(still_claimed))
+            for (delivery_id, url, _, attempts), error in zip(claimed, errors):
+                self.metrics.retried += 1
+                if error is None:
+                    continue
+                attempts += 1
+                values = {"attempts": attempts, "last_error": error[:1000]}
+                if attempts >= MAX_ATTEMPTS:
+                    values["status"] = "dead"
+                    self.metrics.dead += 1
+                    logger.error(f"Webhook delivery to {url} gave up after {attempts} attempts: {error}")
+                else:
+                    values["next_attempt_at"] = done + timedelta(seconds=retry_delay(attempts))
+                await db.execute(
+                    update(WebhookDelivery).where(WebhookDelivery.id == delivery_id).where(still_claimed).values(**values)
+                )
+            await db.commit()
+
+    async def retry_backlog(self, db: AsyncSession) -> Dict[str, int]:
+        """Count deliveries per status (for the metrics endpoint)."""
+        result = await db.execute(
+            select(WebhookDelivery.status, func.count()).group_by(WebhookDelivery.status)
+        )
+        return {status: int(count) for status, count in result.all()}
+
+
+# Singleton instance
+webhook_dispatcher = WebhookDispatcher()
+
+
+async def dispatch_webhook(event_type: str, payload: Dict[str, Any]):
+    """Queue an event for every subscription listening to this event type. Never blocks on the network."""
+    webhook_dispatcher.enqueue(event_type, payload)
+
+
+async def register_webhook_subscription(db: AsyncSession, url: str, events: List[str]) -> WebhookSubscription:
+    """Persist a subscription and refresh this process's subscriber list."""
+    sub = WebhookSubscription(url=url, events=events)
+    db.add(sub)
+    await db.commit()
+    await db.refresh(sub)
+    await webhook_dispatcher.reload_subscriptions()
     logger.info(f"Registered new webhook for {url}")
+    return sub
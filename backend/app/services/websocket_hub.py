@@ -3,10 +3,13 @@ Industrial Wearable AI — WebSocket Connection Hub
 Manages active connections and broadcasts live state to dashboard clients.
 """
 import logging
+import time
 from typing import List
 
 from fastapi import WebSocket
 
+from app.services.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +19,10 @@ class WebSocketHub:
     def __init__(self):
         self._connections: List[WebSocket] = []
 
+    @property
+    def client_count(self) -> int:
+        return len(self._connections)
+
     async def connect(self, websocket: WebSocket) -> None:
         """Accept connection and add to list."""
         await websocket.accept()
@@ -30,6 +37,7 @@ class WebSocketHub:
 
     async def broadcast(self, message: dict) -> None:
         """Send JSON to all connected clients."""
+        start = time.perf_counter()
         dead = []
         for ws in self._connections:
             try:
@@ -39,6 +47,8 @@ class WebSocketHub:
                 dead.append(ws)
         for ws in dead:
             self.disconnect(ws)
+        metrics.ws_messages.inc()
+        metrics.ws_broadcast_seconds.observe(time.perf_counter() - start)
 
 
 # Singleton instance
@@ -1,73 +1,126 @@
 """
 Industrial Wearable AI — Celery Tasks for automated reports.
 """
-import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
 from celery_config import celery_app
+from app.config import REPORT_DAILY_RECIPIENTS, REPORT_WEEKLY_RECIPIENTS
+from app.database import get_sync_session
 from app.services.email import send_email_sync
+from app.services.report_generator import generate_period_summary_csv, generate_period_summary_pdf
+from app.services.shift_summary import compute_period_summary
 
-# Since Celery is sync and SQLAlchemy is async in this project,
-# we need to bridge the gap by running an event loop if we need DB access.
-# For demonstration purposes, we'll implement a mock summary.
-# In a real app, we'd use async_to_sync or raw psycopg2 queries for Celery.
+# Celery is sync and the app's SQLAlchemy engine is async, so these tasks read
+# through the sync (psycopg2) session factory instead of bridging an event loop.
 
 log = logging.getLogger(__name__)
 
+# Concurrent SMTP sends per task; recipients share the same rendered attachments
+MAX_SEND_WORKERS = 8
+
+
+def _load_summary(since: datetime, until: datetime) -> Dict[str, Any]:
+    db = get_sync_session()
+    try:
+        return compute_period_summary(db, since, until)
+    finally:
+        db.close()
+
+
+def _build_attachments(title: str, summary: Dict[str, Any], stem: str) -> List[Tuple[str, bytes, str]]:
+    """Render PDF + CSV once; every recipient gets the same bytes."""
+    return [
+        (f"{stem}.pdf", generate_period_summary_pdf(title, summary), "pdf"),
+        (f"{stem}.csv", generate_period_summary_csv(summary), "csv"),
+    ]
+
+
+def _send_to_all(recipients: List[str], subject: str, body: str, attachments) -> None:
+    """Fan out SMTP sends so one slow mailbox does not serialise the rest."""
+    if not recipients:
+        log.warning("No recipients configured for '%s'", subject)
+        return
+    with ThreadPoolExecutor(max_workers=min(MAX_SEND_WORKERS, len(recipients))) as pool:
+        for addr in recipients:
+            pool.submit(send_email_sync, to_address=addr, subject=subject, body=body, attachments=attachments)
+
+
 @celery_app.task
 def send_daily_summary():
     """Compiles and sends a daily shift summary via email."""
     log.info("Starting daily_summary task...")
-    
-    # Mock data fetch
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    
+
+    until = datetime.now(timezone.utc)
+    since = until.replace(hour=0, minute=0, second=0, microsecond=0)
+    today = since.strftime("%Y-%m-%d")
+
+    summary = _load_summary(since, until)
+    totals = summary["totals"]
+
     body = f"""
     Hello Supervisor,
-    
+
     Here is the automated daily shift summary for {today}.
-    
-    - Total Active Workers: 12
-    - Average Productivity: 82%
-    - Total Ergonomic Alerts: 5
-    - Total Fatigue Alerts: 2
-    
+
+    - Total Active Workers: {totals["worker_count"]}
+    - Hours Worked: {totals["hours_worked"]:.1f}
+    - Average Active Time: {totals["active_pct"]:.1f}%
+    - Average Productivity: {totals["productivity_score"]:.1f}%
+    - Total Risk Alerts: {totals["alert_count"]}
+
+    Per-station and per-worker breakdowns are attached (PDF + CSV).
     Please review the dashboard for detailed analytics.
-    
+
     Regards,
     Industrial Wearable AI System
     """
-    
-    send_email_sync(
-        to_address="supervisor@factory.com",
-        subject=f"Daily Shift Summary - {today}",
-        body=body
-    )
+
+    attachments = _build_attachments(f"Daily Shift Summary — {today}", summary, f"daily_summary_{today}")
+    _send_to_all(REPORT_DAILY_RECIPIENTS, f"Daily Shift Summary - {today}", body, attachments)
     return f"Daily summary sent for {today}"
 
+
 @celery_app.task
 def send_weekly_digest():
     """Compiles and sends a weekly digest via email."""
     log.info("Starting weekly_digest task...")
-    
-    week_start = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d")
-    
-    body = """
+
+    until = datetime.now(timezone.utc)
+    since = until - timedelta(days=7)
+    week_start = since.strftime("%Y-%m-%d")
+
+    summary = _load_summary(since, until)
+    totals, stations = summary["totals"], summary["stations"]
+
+    if stations:
+        best = stations[0]
+        riskiest = max(stations, key=lambda s: s["alert_count"])
+        station_lines = (
+            f"- Best Performing Station: {best['station']} ({best['productivity_score']:.0f}% Productivity)\n"
+            f"    - Highest Risk Station: {riskiest['station']} ({riskiest['alert_count']} Alerts)\n"
+            f"    - Recommended Action: Review ergonomic setup at {riskiest['station']}."
+        )
+    else:
+        station_lines = "- No sessions were recorded this week."
+
+    body = f"""
     Hello Admin,
-    
+
     Here is the automated weekly digest.
-    
-    - Best Performing Station: Station 3 (91% Productivity)
-    - Highest Risk Station: Station 1 (14 Alerts)
-    - Recommended Action: Review ergonomic setup at Station 1.
-    
+
+    - Workers Monitored: {totals["worker_count"]} ({totals["hours_worked"]:.1f} hours)
+    - Average Productivity: {totals["productivity_score"]:.1f}%
+    {station_lines}
+
+    Per-station and per-worker breakdowns are attached (PDF + CSV).
+
     Regards,
     Industrial Wearable AI System
     """
-    
-    send_email_sync(
-        to_address="admin@factory.com",
-        subject=f"Weekly Operations Digest - Week of {week_start}",
-        body=body
-    )
+
+    attachments = _build_attachments(f"Weekly Digest — Week of {week_start}", summary, f"weekly_digest_{week_start}")
+    _send_to_all(REPORT_WEEKLY_RECIPIENTS, f"Weekly Operations Digest - Week of {week_start}", body, attachments)
     return "Weekly digest sent"
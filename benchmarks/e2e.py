@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — End-to-End Benchmark
+Edge → backend → /ws/live throughput and latency, with CPU/RSS per component.
+
+Starts the backend with uvicorn (or uses --url), connects dashboard clients to /ws/live,
+then drives N simulated workers either
+    --mode api   straight into POST /api/events (ingest path only), or
+    --mode edge  through the real edge gateway (python -m edge.src.main, SIM_WORKERS=N):
+                 simulator → buffer → pipeline → classifier → API.
+
+Dashboard latency is receive time minus the event ts broadcast as `updated_at`. In edge
+mode that ts is stamped when the window containing the sample is classified, so it covers
+classify → HTTP → DB → broadcast, not the window length itself.
+
+Results are written as JSON (--out). With --baseline the run is compared against an
+earlier result and the exit code is 1 if any tracked metric regressed beyond --tolerance.
+
+Usage (from repo root; needs a migrated Postgres at DATABASE_URL):
+    python benchmarks/e2e.py --mode api --workers 200 --duration 60
+    python benchmarks/e2e.py --mode edge --workers 50 --baseline benchmarks/results/v1.2.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import numpy as np
+
+# Optional: per-process CPU/RSS via psutil; falls back to /proc on Linux
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    psutil = None
+    HAS_PSUTIL = False
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from edge.src.classifier import LABELS  # noqa: E402
+from edge.src.simulator import FleetSimulator  # noqa: E402
+
+LABEL_NAMES = np.array(LABELS)
+DEFAULT_KEY = "bench-edge-key"
+SAMPLE_INTERVAL_SEC = 1.0
+
+# Metric path → True if higher is better; used for --baseline comparison
+TRACKED = {
+    "ingest.events_per_sec": True,
+    "dashboard.latency_ms.p50": False,
+    "dashboard.latency_ms.p95": False,
+    "dashboard.latency_ms.p99": False,
+    "ingest.post_latency_ms.p95": False,
+    "resources.backend.cpu_pct_mean": False,
+    "resources.backend.rss_mb_max": False,
+}
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "n": 0}
+    arr = np.asarray(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2), "max": round(arr.max(), 2), "n": len(arr)}
+
+
+# ── Process monitoring ────────────────────────────────────────────────────
+
+class ProcessMonitor:
+    """Samples CPU% and RSS of named processes once per interval."""
+
+    def __init__(self, pids: Dict[str, int]):
+        self.pids = pids
+        self.samples: Dict[str, List[tuple]] = {name: [] for name in pids}
+        self._last: Dict[str, tuple] = {}
+        self._clk = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _read(self, pid: int) -> Optional[tuple]:
+        """(cpu seconds, rss bytes) or None if the process is gone."""
+        try:
+            if HAS_PSUTIL:
+                p = psutil.Process(pid)
+                procs = [p] + p.children(recursive=True)
+                cpu = sum(sum(q.cpu_times()[:2]) for q in procs)
+                rss = sum(q.memory_info().rss for q in procs)
+                return cpu, rss
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu = (int(fields[11]) + int(fields[12])) / self._clk
+            rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+            return cpu, rss
+        except Exception:  # process exited (psutil.NoSuchProcess / OSError)
+            return None
+
+    async def run(self, interval: float = SAMPLE_INTERVAL_SEC) -> None:
+        while True:
+            now = time.monotonic()
+            for name, pid in self.pids.items():
+                reading = self._read(pid)
+                if reading is None:
+                    continue
+                prev = self._last.get(name)
+                if prev is not None:
+                    cpu_pct = 100.0 * (reading[0] - prev[1][0]) / max(1e-6, now - prev[0])
+                    self.samples[name].append((cpu_pct, reading[1]))
+                self._last[name] = (now, reading)
+            await asyncio.sleep(interval)
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for name, rows in self.samples.items():
+            if not rows:
+                continue
+            cpu = [r[0] for r in rows]
+            out[name] = {
+                "cpu_pct_mean": round(float(np.mean(cpu)), 1),
+                "cpu_pct_max": round(float(np.max(cpu)), 1),
+                "rss_mb_max": round(max(r[1] for r in rows) / 1024 / 1024, 1),
+            }
+        return out
+
+
+# ── Components ────────────────────────────────────────────────────────────
+
+def start_backend(port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT / "backend",
+        env=env,
+    )
+
+
+def start_edge(workers: int, backend_url: str, api_key: str, workdir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "BACKEND_URL": backend_url,
+        "EDGE_API_KEY": api_key,
+        "SIM_WORKERS": str(workers),
+        "BLE_DEVICE_ID": "",
+        "SIM_DISCONNECT_RATE": "0",  # disconnects broadcast synthetic states that would skew latency
+    }
+    # Own working directory so the offline buffer doesn't touch the repo's database file
+    return subprocess.Popen([sys.executable, "-m", "edge.src.main"], cwd=workdir, env=env)
+
+
+async def wait_healthy(session: aiohttp.ClientSession, url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{url}/health") as r:
+                if r.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Backend at {url} not healthy after {timeout:.0f}s")
+
+
+class DashboardClients:
+    """K /ws/live subscribers recording broadcast latency."""
+
+    def __init__(self, ws_url: str, n_clients: int):
+        self.ws_url = ws_url
+        self.n_clients = n_clients
+        self.latencies_ms: List[float] = []
+        self.messages = 0
+        self.recording = False
+
+    async def _client(self, session: aiohttp.ClientSession, ready: asyncio.Event, connected: list) -> None:
+        async with session.ws_connect(self.ws_url, heartbeat=30) as ws:
+            connected.append(1)
+            if len(connected) == self.n_clients:
+                ready.set()
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                received_ms = time.time() * 1000
+                if not self.recording:
+                    continue
+                data = json.loads(msg.data)
+                if "type" in data:  # sensor / device_status side channels
+                    continue
+                self.messages += 1
+                updated_at = data.get("updated_at")
+                if isinstance(updated_at, (int, float)):
+                    self.latencies_ms.append(received_ms - updated_at)
+
+    async def start(self, session: aiohttp.ClientSession) -> List[asyncio.Task]:
+        ready, connected = asyncio.Event(), []
+        tasks = [asyncio.create_task(self._client(session, ready, connected)) for _ in range(self.n_clients)]
+        await asyncio.wait_for(ready.wait(), timeout=30)
+        return tasks
+
+
+class ApiLoad:
+    """Posts classified-event batches for N workers, at the rate the edge would (one event per window step)."""
+
+    def __init__(self, url: str, api_key: str, workers: int, event_interval: float, batch_size: int, seed: int):
+        self.url = url
+        self.headers = {"X-API-Key": api_key}
+        self.workers = [f"BENCH{i + 1:04d}" for i in range(workers)]
+        self.event_interval = event_interval
+        self.batch_size = batch_size
+        self.sim = FleetSimulator(self.workers, seed=seed, dropout_rate=0.0, disconnect_rate=0.0)
+        self.seq = int(time.time() * 1000) * 1000
+        self.sent = self.accepted = self.duplicates = self.throttled = self.errors = 0
+        self.post_latencies_ms: List[float] = []
+
+    async def _post(self, session: aiohttp.ClientSession, worker_id: str, events: List[dict]) -> None:
+        t0 = time.perf_counter()
+        try:
+            async with session.post(f"{self.url}/api/events", json={"worker_id": worker_id, "events": events}, headers=self.headers) as r:
+                if r.status == 200:
+                    body = await r.json()
+                    self.accepted += body.get("count", 0)
+                    self.duplicates += body.get("duplicates", 0)
+                    self.post_latencies_ms.append((time.perf_counter() - t0) * 1000)
+                elif r.status == 429:
+                    self.throttled += 1
+                else:
+                    self.errors += 1
+        except aiohttp.ClientError:
+            self.errors += 1
+        self.sent += len(events)
+
+    async def run(self, session: aiohttp.ClientSession, duration: float) -> None:
+        """Every batch_size × event_interval seconds each worker posts one batch; posts are spread over the period."""
+        period = self.event_interval * self.batch_size
+        pending = set()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            tick = time.monotonic()
+            labels = self.sim.step(int(period * self.sim.sample_rate)).labels  # ground-truth activity mix
+            for i, worker_id in enumerate(self.workers):
+                now_ms = int(time.time() * 1000)
+                idx = labels[i, :: max(1, labels.shape[1] // self.batch_size)][: self.batch_size]
+                events = []
+                for j, label in enumerate(LABEL_NAMES[idx].tolist()):
+                    self.seq += 1
+                    events.append({"ts": now_ms - (len(idx) - 1 - j) * int(self.event_interval * 1000),
+                                   "seq": self.seq, "label": label, "risk_ergo": False, "risk_fatigue": label == "idle"})
+                pending.add(asyncio.create_task(self._post(session, worker_id, events)))
+                await asyncio.sleep(period / len(self.workers))
+            pending = {t for t in pending if not t.done()}
+            await asyncio.sleep(max(0.0, period - (time.monotonic() - tick)))
+        if pending:
+            await asyncio.wait(pending, timeout=30)
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────
+
+def _get(result: dict, path: str):
+    for key in path.split("."):
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Lines describing each tracked metric; those prefixed REGRESSION exceed tolerance."""
+    lines = []
+    for path, higher_is_better in TRACKED.items():
+        new, old = _get(result, path), _get(baseline, path)
+        if new is None or old is None or old == 0:
+            continue
+        change = (new - old) / abs(old)
+        worse = -change if higher_is_better else change
+        tag = "REGRESSION" if worse > tolerance else "ok"
+        lines.append(f"{tag:>10}  {path:<36} {old:>10} → {new:<10} ({change:+.1%})")
+    return lines
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    procs: Dict[str, subprocess.Popen] = {}
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}"
+        backend_env = {
+            **os.environ,
+            "EDGE_GATEWAYS": f"bench:{args.api_key}:{args.rate_limit}:{args.rate_limit * 5}",
+        }
+        procs["backend"] = start_backend(args.port, backend_env)
+    ws_url = url.replace("http", "ws", 1) + "/ws/live"
+
+    workdir = tempfile.mkdtemp(prefix="bench-edge-")
+    monitor_task = None
+    dashboard_tasks: List[asyncio.Task] = []
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+            await wait_healthy(session, url)
+            dashboard = DashboardClients(ws_url, args.clients)
+            dashboard_tasks = await dashboard.start(session)
+
+            load = None
+            if args.mode == "edge":
+                procs["edge"] = start_edge(args.workers, url, args.api_key, workdir)
+            else:
+                load = ApiLoad(url, args.api_key, args.workers, args.event_interval, args.batch_size, args.seed)
+
+            pids = {name: p.pid for name, p in procs.items()}
+            pids["harness"] = os.getpid()
+            monitor = ProcessMonitor(pids)
+            monitor_task = asyncio.create_task(monitor.run())
+
+            if args.warmup > 0:
+                if load is not None:
+                    await load.run(session, args.warmup)
+                    load.sent = load.accepted = load.duplicates = load.throttled = load.errors = 0
+                    load.post_latencies_ms.clear()
+                else:
+                    await asyncio.sleep(args.warmup)
+
+            dashboard.recording = True
+            monitor.samples = {name: [] for name in pids}
+            started = time.monotonic()
+            if load is not None:
+                await load.run(session, args.duration)
+            else:
+                await asyncio.sleep(args.duration)
+            elapsed = time.monotonic() - started
+            dashboard.recording = False
+
+            result = {
+                "meta": {
+                    "benchmark": "e2e",
+                    "mode": args.mode,
+                    "workers": args.workers,
+                    "dashboard_clients": args.clients,
+                    "duration_sec": round(elapsed, 1),
+                    "git_rev": git_revision(),
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "python": platform.python_version(),
+                    "host": platform.node(),
+                    "cpu_count": os.cpu_count(),
+                },
+                "dashboard": {
+                    "messages": dashboard.messages,
+                    "messages_per_sec": round(dashboard.messages / elapsed, 1),
+                    "latency_ms": percentiles(dashboard.latencies_ms),
+                },
+                "resources": monitor.summary(),
+            }
+            if load is not None:
+                result["ingest"] = {
+                    "events_sent": load.sent,
+                    "events_accepted": load.accepted,
+                    "duplicates": load.duplicates,
+                    "events_per_sec": round(load.accepted / elapsed, 1),
+                    "throttled_posts": load.throttled,
+                    "failed_posts": load.errors,
+                    "post_latency_ms": percentiles(load.post_latencies_ms),
+                }
+            else:
+                # Edge mode: each broadcast is one accepted batch; count clients once
+                batches = dashboard.messages / max(1, args.clients)
+                result["ingest"] = {"batches_per_sec": round(batches / elapsed, 1)}
+            return result
+    finally:
+        if monitor_task is not None:
+            monitor_task.cancel()
+        for task in dashboard_tasks:
+            task.cancel()
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="End-to-end throughput/latency benchmark")
+    p.add_argument("--mode", choices=("api", "edge"), default="api")
+    p.add_argument("--workers", type=int, default=100)
+    p.add_argument("--clients", type=int, default=5, help="Dashboard /ws/live subscribers")
+    p.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    p.add_argument("--warmup", type=float, default=10.0)
+    p.add_argument("--url", help="Use a running backend instead of starting one")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--api-key", default=os.getenv("EDGE_API_KEY", DEFAULT_KEY))
+    p.add_argument("--rate-limit", type=int, default=100_000, help="Gateway token rate for the spawned backend")
+    p.add_argument("--event-interval", type=float, default=1.5, help="api mode: seconds between a worker's events (window step)")
+    p.add_argument("--batch-size", type=int, default=5, help="api mode: events per POST (edge BATCH_SIZE)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", type=Path, help="Result JSON (default benchmarks/results/e2e-<mode>-<time>.json)")
+    p.add_argument("--baseline", type=Path, help="Earlier result JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = p.parse_args()
+
+    result = asyncio.run(run(args))
+    out = args.out or ROOT / "benchmarks" / "results" / f"e2e-{args.mode}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    print(json.dumps(result, indent=2))
+    print(f"Wrote {out}")
+
+    if args.baseline:
+        lines = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        print(f"\nCompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        print("\n".join(lines) or "  no comparable metrics")
+        return 1 if any(line.lstrip().startswith("REGRESSION") for line in lines) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — Edge Micro-Benchmarks
+Per-call cost of the edge hot paths at production window sizes, plus the whole
+per-window cycle for N devices. Input data comes from the fleet simulator.
+
+Each case is auto-calibrated (≥ --min-time per repeat) and reports min / median per
+call; min is the number to compare. Results are JSON; --baseline prints the ratio per
+case and exits 1 if any case got slower than --tolerance.
+
+Usage (from repo root):
+    python benchmarks/edge_micro.py
+    python benchmarks/edge_micro.py --filter process_window --out /tmp/after.json --baseline /tmp/before.json
+    python benchmarks/edge_micro.py --model ml/models/activity_model.joblib --devices 200
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from edge.src.anomaly_detector import AnomalyDetector  # noqa: E402
+from edge.src.buffer import SampleBuffer  # noqa: E402
+from edge.src.classifier import LABELS, load_model, predict_with_confidence  # noqa: E402
+from edge.src.feature_extractor import extract_features  # noqa: E402
+from edge.src.pipeline import process_window  # noqa: E402
+from edge.src.risk_detector import RiskDetector  # noqa: E402
+from edge.src.simulator import FleetSimulator  # noqa: E402
+
+AXES = ("ax", "ay", "az", "gx", "gy", "gz")
+SAMPLE_RATE = 25.0
+WINDOW_SECONDS = 3.0
+WINDOW_SAMPLES = int(WINDOW_SECONDS * SAMPLE_RATE)  # 75, as in edge main
+HISTORY = 200  # RiskDetector keeps the last 200 labels
+
+
+class Case:
+    def __init__(self, name: str, fn: Callable[[], object], note: str = ""):
+        self.name = name
+        self.fn = fn
+        self.note = note
+
+
+def time_case(fn: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    """Calibrate loop count so one repeat takes ≥ min_time, then time `repeat` runs."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 22:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - t0) / number)
+    runs_us = np.array(runs) * 1e6
+    return {
+        "min_us": round(float(runs_us.min()), 3),
+        "median_us": round(float(np.median(runs_us)), 3),
+        "ops_per_sec": round(1e6 / float(runs_us.min()), 1),
+        "loops": number,
+    }
+
+
+def _fit_models(windows: np.ndarray, labels: np.ndarray, seed: int):
+    """Small models shaped like the trained ones (train.py / train_anomaly.py); None without sklearn."""
+    try:
+        from sklearn.ensemble import IsolationForest, RandomForestClassifier
+    except ImportError:
+        return None, None
+    X = np.stack([process_window(w) for w in windows])
+    y = np.array(LABELS)[labels]
+    clf = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=seed).fit(X, y)
+    iso = IsolationForest(n_estimators=100, contamination=0.05, random_state=seed).fit(X)
+    return clf, iso
+
+
+def build_cases(args) -> List[Case]:
+    engine = FleetSimulator([f"B{i:03d}" for i in range(max(args.devices, 8))], seed=args.seed, dropout_rate=0.0, disconnect_rate=0.0)
+    block = engine.step(WINDOW_SAMPLES * 4)
+    windows = block.imu[:, -WINDOW_SAMPLES:]                     # (W, 75, 6)
+    window_labels = np.array([np.bincount(l[-WINDOW_SAMPLES:]).argmax() for l in block.labels])
+    window = windows[0]
+    window_dicts = [dict(zip(AXES, row), ts=0) for row in window.tolist()]
+    features = process_window(window)
+    samples = [dict(zip(AXES, row), ts=i) for i, row in enumerate(block.imu[0].tolist())]
+
+    full_buffer = SampleBuffer(max_seconds=WINDOW_SECONDS * 2, sample_rate=SAMPLE_RATE)
+    for s in samples:
+        full_buffer.append(s)
+    sample_iter = iter(samples * 1_000_000)
+    frame_imu, frame_ts = block.imu[0, :5], block.ts[:5]
+
+    risk = RiskDetector()
+    rng = np.random.default_rng(args.seed)
+    for label in rng.choice(LABELS, HISTORY).tolist():
+        risk.update_rolling_state(label)
+    anomaly = AnomalyDetector()
+
+    model = load_model(args.model) if args.model else None
+    iso_model = None
+    if model is None:
+        model, iso_model = _fit_models(windows, window_labels, args.seed)
+    model_note = args.model or "RandomForest(100, depth 10) fitted on simulator windows"
+
+    cases = [
+        Case("buffer.append", lambda: full_buffer.append(next(sample_iter)), "one §4.1 dict into a full 6 s ring"),
+        Case("buffer.extend[5]", lambda: full_buffer.extend(frame_imu, frame_ts), "one decoded 5-sample BLE frame"),
+        Case("buffer.get_window[75]", lambda: full_buffer.get_window(WINDOW_SAMPLES), "list-of-dicts window"),
+        Case("buffer.get_array[75]", lambda: full_buffer.get_array(WINDOW_SAMPLES), "(75, 6) array window"),
+        Case("extract_features[75]", lambda: extract_features(window_dicts)),
+        Case("process_window[75,dicts]", lambda: process_window(window_dicts)),
+        Case("process_window[75,array]", lambda: process_window(window)),
+        Case("predict.rule_based", lambda: predict_with_confidence(None, features)),
+        Case("risk.build_fatigue_features", lambda: risk._build_fatigue_features(features), f"{HISTORY}-label history"),
+        Case("risk.build_ergo_features", lambda: risk._build_ergo_features(features)),
+        Case("risk.detect_fatigue+ergo", lambda: (risk.detect_fatigue(features), risk.detect_ergo_risk(features)), "rule-based"),
+        Case("anomaly.detect.statistical", lambda: anomaly.detect(features)),
+    ]
+    if model is not None:
+        cases.append(Case("predict.model", lambda: predict_with_confidence(model, features), model_note))
+    if iso_model is not None:
+        anomaly_model = AnomalyDetector()
+        anomaly_model.model = iso_model
+        cases.append(Case("anomaly.detect.isolation_forest", lambda: anomaly_model.detect(features), "IsolationForest(100)"))
+
+    # Whole per-window cycle for every device, as main._maybe_process runs it
+    detectors = [(RiskDetector(), AnomalyDetector()) for _ in range(args.devices)]
+    device_windows = windows[: args.devices]
+
+    def cycle():
+        for w, (rd, ad) in zip(device_windows, detectors):
+            f = process_window(w)
+            label, _ = predict_with_confidence(model, f)
+            rd.update_rolling_state(label, interval_sec=WINDOW_SECONDS, features=f, temp=25.0)
+            rd.detect_fatigue(f)
+            rd.detect_ergo_risk(f)
+            ad.detect(f)
+
+    cases.append(Case(
+        f"cycle[{args.devices} devices]", cycle,
+        f"process → {'model' if model is not None else 'rule'} predict → risk → anomaly per device",
+    ))
+    return cases
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Edge hot-path micro-benchmarks")
+    p.add_argument("--devices", type=int, default=50, help="Devices in the full-cycle case")
+    p.add_argument("--model", help="Joblib activity model (default: fit a RandomForest if sklearn is installed)")
+    p.add_argument("--filter", default="", help="Only cases whose name contains this")
+    p.add_argument("--repeat", type=int, default=7)
+    p.add_argument("--min-time", type=float, default=0.1, help="Seconds per repeat")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", type=Path, help="Write results JSON here")
+    p.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    args = p.parse_args()
+    logging.disable(logging.INFO)  # detector model-loading chatter
+
+    results = {}
+    print(f"{'case':<34} {'min':>12} {'median':>12} {'ops/s':>12}")
+    for case in build_cases(args):
+        if args.filter and args.filter not in case.name:
+            continue
+        r = time_case(case.fn, args.repeat, args.min_time)
+        r["note"] = case.note
+        results[case.name] = r
+        print(f"{case.name:<34} {_fmt(r['min_us']):>12} {_fmt(r['median_us']):>12} {r['ops_per_sec']:>12,.0f}")
+
+    cycle = next((r for name, r in results.items() if name.startswith("cycle[")), None)
+    if cycle:
+        step_sec = WINDOW_SECONDS * 0.5  # OVERLAP 0.5
+        per_device = cycle["min_us"] / args.devices
+        print(f"\n≈ {per_device:.0f} µs per device-window → one core keeps up with ~{step_sec * 1e6 / per_device:,.0f} devices")
+
+    report = {
+        "meta": {
+            "benchmark": "edge_micro",
+            "git_rev": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "host": platform.node(),
+            "window_samples": WINDOW_SAMPLES,
+            "devices": args.devices,
+        },
+        "results": results,
+    }
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.out}")
+
+    if args.baseline:
+        base = json.loads(args.baseline.read_text()).get("results", {})
+        print(f"\nCompared with {args.baseline} (min per call, tolerance {args.tolerance:.0%}):")
+        regressed = False
+        for name, r in results.items():
+            if name not in base:
+                print(f"{'new':>10}  {name}")
+                continue
+            ratio = r["min_us"] / base[name]["min_us"]
+            tag = "ok"
+            if ratio > 1 + args.tolerance:
+                tag, regressed = "REGRESSION", True
+            elif ratio < 1 - args.tolerance:
+                tag = "faster"
+            print(f"{tag:>10}  {name:<34} {_fmt(base[name]['min_us']):>10} → {_fmt(r['min_us']):<10} ({ratio:.2f}×)")
+        return 1 if regressed else 0
+    return 0
+
+
+def _fmt(us: float) -> str:
+    return f"{us / 1000:.2f} ms" if us >= 1000 else f"{us:.2f} µs"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — Edge Startup Benchmark
+How long a gateway restart takes to produce its first event, and where import time goes.
+
+1. Import profile: `python -X importtime -c "import edge.src.main"` (best of --runs),
+   summarised as total, top modules by self time and top-level packages by self time.
+2. Restarts: the real gateway (python -m edge.src.main, SIM_WORKERS=--workers) is started
+   --runs times against an unreachable backend; the startup phases (startup.py) are read
+   from GET /status on the health server once first_event is reached.
+
+first_event includes filling the first window (3 s of samples at 25 Hz); the overhead
+to watch is first_sample and first_event − first_window. Results are JSON; --baseline
+compares per phase and exits 1 when one got slower than --tolerance.
+
+Usage (from repo root):
+    python benchmarks/edge_startup.py
+    python benchmarks/edge_startup.py --workers 50 --out /tmp/after.json --baseline /tmp/before.json
+    MODEL_PATH=ml/models/activity_model.edge.npz python benchmarks/edge_startup.py
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+HEALTH_PORT = 8081  # fixed in edge main
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(runs: int, top: int) -> dict:
+    """Best-of-runs -X importtime for edge.src.main (µs)."""
+    best: Dict[str, List[int]] = {}
+    total = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import edge.src.main"],
+            cwd=ROOT, env={**os.environ, "PYTHONPATH": str(ROOT)}, capture_output=True, text=True,
+        )
+        for line in proc.stderr.splitlines():
+            m = IMPORT_LINE.match(line)
+            if not m:
+                continue
+            self_us, cum_us, name = int(m.group(1)), int(m.group(2)), m.group(4)
+            prev = best.get(name)
+            if prev is None or cum_us < prev[1]:
+                best[name] = [self_us, cum_us]
+        main = best.get("edge.src.main")
+        total = main[1] if main else None
+    packages: Dict[str, int] = {}
+    for name, (self_us, _) in best.items():
+        pkg = name if name.startswith("edge.") else name.split(".")[0]
+        packages[pkg] = packages.get(pkg, 0) + self_us
+    by_self = sorted(best.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+    return {
+        "total_us": total,
+        "modules": len(best),
+        "top_self": [{"module": n, "self_us": s, "cumulative_us": c} for n, (s, c) in by_self],
+        "top_packages": [{"package": k, "self_us": v} for k, v in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]],
+    }
+
+
+def _status() -> Optional[dict]:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{HEALTH_PORT}/status", timeout=0.5) as resp:
+            return json.loads(resp.read())
+    except (OSError, ValueError):
+        return None
+
+
+def restart_once(workers: int, timeout: float) -> dict:
+    """Start the gateway, wait for first_event in /status, stop it. Returns phase → seconds."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "BACKEND_URL": "http://127.0.0.1:9",  # unreachable: events go to the offline buffer
+        "SIM_WORKERS": str(workers),
+        "BLE_DEVICE_ID": "",
+        "CONFIG_POLL_SEC": "3600",
+    }
+    with tempfile.TemporaryDirectory() as workdir:  # offline buffer DB outside the repo
+        proc = subprocess.Popen([sys.executable, "-m", "edge.src.main"], cwd=workdir, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"gateway exited with {proc.returncode}")
+                status = _status()
+                if status and "first_event" in status.get("startup", {}):
+                    return status["startup"]
+                time.sleep(0.1)
+            raise RuntimeError(f"no first_event within {timeout:.0f}s")
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Edge gateway cold-start profile")
+    p.add_argument("--runs", type=int, default=3, help="Import profiles and restarts")
+    p.add_argument("--workers", type=int, default=4, help="Simulated workers per restart")
+    p.add_argument("--top", type=int, default=12, help="Modules / packages listed")
+    p.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the first event")
+    p.add_argument("--skip-restart", action="store_true", help="Import profile only")
+    p.add_argument("--out", type=Path, help="Write results JSON here")
+    p.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    args = p.parse_args()
+
+    imports = import_profile(args.runs, args.top)
+    print(f"import edge.src.main: {imports['total_us'] / 1000:.0f} ms, {imports['modules']} modules (best of {args.runs})")
+    print(f"\n{'module (self time)':<44} {'self':>9} {'cumul.':>9}")
+    for m in imports["top_self"]:
+        print(f"{m['module']:<44} {m['self_us'] / 1000:>7.1f}ms {m['cumulative_us'] / 1000:>7.1f}ms")
+    print(f"\n{'package (self time)':<44} {'self':>9}")
+    for pkg in imports["top_packages"]:
+        print(f"{pkg['package']:<44} {pkg['self_us'] / 1000:>7.1f}ms")
+
+    phases: Dict[str, Dict[str, float]] = {}
+    if not args.skip_restart:
+        runs = [restart_once(args.workers, args.timeout) for _ in range(args.runs)]
+        for run in runs:
+            run["event_after_window"] = round(run["first_event"] - run["first_window"], 3)
+        print(f"\n{'phase (s since process start)':<44} {'min':>9} {'median':>9}")
+        for name in sorted(runs[0], key=lambda k: runs[0][k] if k != "event_after_window" else float("inf")):
+            values = sorted(r[name] for r in runs if name in r)
+            phases[name] = {"min": values[0], "median": values[len(values) // 2]}
+            print(f"{name:<44} {values[0]:>8.2f}s {values[len(values) // 2]:>8.2f}s")
+
+    report = {
+        "meta": {
+            "benchmark": "edge_startup",
+            "git_rev": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "workers": args.workers,
+            "model_path": os.getenv("MODEL_PATH", ""),
+        },
+        "imports": imports,
+        "phases": phases,
+    }
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.out}")
+
+    if args.baseline:
+        base = json.loads(args.baseline.read_text())
+        current = {"import_total": imports["total_us"] / 1e6, **{k: v["min"] for k, v in phases.items()}}
+        before = {"import_total": (base["imports"]["total_us"] or 0) / 1e6, **{k: v["min"] for k, v in base.get("phases", {}).items()}}
+        print(f"\nCompared with {args.baseline} (min, tolerance {args.tolerance:.0%}):")
+        regressed = False
+        for name, value in current.items():
+            if name not in before:
+                print(f"{'new':>10}  {name}")
+                continue
+            ratio = value / before[name] if before[name] else 1.0
+            tag = "ok"
+            if ratio > 1 + args.tolerance:
+                tag, regressed = "REGRESSION", True
+            elif ratio < 1 - args.tolerance:
+                tag = "faster"
+            print(f"{tag:>10}  {name:<30} {before[name]:>8.3f}s → {value:<8.3f}s ({ratio:.2f}×)")
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
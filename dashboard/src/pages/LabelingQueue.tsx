@@ -14,6 +14,11 @@ interface QueueItem {
     confidence: number;
 }
 
+interface QueuePage {
+    items: QueueItem[];
+    next_cursor: string | null;
+}
+
 const LABELS = ["sewing", "idle", "adjusting", "break", "error"];
 
 const LABEL_COLORS: Record<string, string> = {
@@ -37,14 +42,16 @@ export default function LabelingQueue() {
     const [loading, setLoading] = useState(true);
     const [submitting, setSubmitting] = useState<Set<string>>(new Set());
     const [labeled, setLabeled] = useState<Set<string>>(new Set());
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
 
     const fetchQueue = useCallback(async () => {
         setLoading(true);
         try {
-            const { data } = await apiClient.get<QueueItem[]>("/api/labels/queue", {
+            const { data } = await apiClient.get<QueuePage>("/api/labels/queue", {
                 params: { limit: 30 },
             });
-            setQueue(data);
+            setQueue(data.items);
+            setNextCursor(data.next_cursor);
         } catch {
             // handled by interceptor
         } finally {
@@ -52,6 +59,19 @@ export default function LabelingQueue() {
         }
     }, []);
 
+    const fetchOlder = async () => {
+        if (!nextCursor) return;
+        try {
+            const { data } = await apiClient.get<QueuePage>("/api/labels/queue", {
+                params: { limit: 30, cursor: nextCursor },
+            });
+            setQueue((prev) => [...prev, ...data.items]);
+            setNextCursor(data.next_cursor);
+        } catch {
+            // handled by interceptor
+        }
+    };
+
     useEffect(() => {
         fetchQueue();
     }, [fetchQueue]);
@@ -142,6 +162,11 @@ export default function LabelingQueue() {
                             </div>
                         </div>
                     ))}
+                    {nextCursor && (
+                        <button className="lq-label-btn" onClick={fetchOlder}>
+                            Load older events
+                        </button>
+                    )}
                 </div>
             )}
         </div>
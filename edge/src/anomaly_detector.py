@@ -10,24 +10,37 @@ from typing import Optional
 
 import numpy as np
 
+from .edge_model import is_edge_model, load_edge_model
+
 logger = logging.getLogger(__name__)
 
+# Statistical fallback thresholds (feature std). Keys match backend SystemConfig.
+ANOMALY_THRESHOLDS = {
+    "anomaly_max_std": 5.0,
+    "anomaly_spike_std": 3.0,
+}
+
 
 class AnomalyDetector:
     """Detects anomalous motion patterns from 30-dim feature vectors."""
 
-    def __init__(self, model_path: Optional[Path] = None):
-        self.model = self._load(model_path)
+    def __init__(self, model_path: Optional[Path] = None, model: Optional[object] = None):
+        self.model = model if model is not None else self._load(model_path)
         self._recent_scores: list[float] = []
 
     @staticmethod
     def _load(path: Optional[Path]):
-        if not path or not path.exists():
+        if not path:
+            return None
+        if not path.exists():
             logger.info("No anomaly model at %s — using statistical fallback", path)
             return None
         try:
-            import joblib
-            model = joblib.load(path)
+            if is_edge_model(path):
+                model = load_edge_model(path)
+            else:
+                import joblib
+                model = joblib.load(path)
             logger.info("Loaded anomaly model from %s", path)
             return model
         except Exception as e:
@@ -70,7 +83,8 @@ class AnomalyDetector:
             return True, -0.9
 
         # Extreme values
-        if max_std > 5.0 or (max_std > 3.0 and min_std < 0.001):
+        t = ANOMALY_THRESHOLDS
+        if max_std > t["anomaly_max_std"] or (max_std > t["anomaly_spike_std"] and min_std < 0.001):
             return True, -0.5
 
         return False, 0.1
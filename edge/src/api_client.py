@@ -2,16 +2,25 @@
 Industrial Wearable AI — Backend API Client
 POST events to backend. Payload per TECHNICAL_STACK_SPEC §4.2.
 POST sensor snapshot for live temp/movement (Phase C).
+POST raw-window snapshots of low-confidence events (snapshot_uploader.py).
+aiohttp is imported on first use; the gateway warms it up in a background thread at
+startup so it stays off the path to the first sample.
 """
+import asyncio
 import math
 import os
 import time
-from typing import List, Optional
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-import aiohttp
 import logging
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    import aiohttp
+
+from .metrics import metrics, worker_label
 from .offline_buffer import edge_buffer
 
 load_dotenv()
@@ -22,6 +31,16 @@ BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 EDGE_API_KEY = os.getenv("EDGE_API_KEY", "dev-edge-key-123")
 API_HEADERS = {"X-API-Key": EDGE_API_KEY}
 
+# Offline replay: rows read per drain round, events per POST, and the AIMD
+# bounds for how many POSTs are in flight (across workers; one worker's chunks
+# are sent in order). Events carry seq and the backend dedupes on it, so
+# chunks may be retried freely.
+SYNC_READ_BATCHES = 2000
+SYNC_MAX_EVENTS_PER_POST = 1000
+SYNC_MIN_CONCURRENCY = 2
+SYNC_MAX_CONCURRENCY = 32
+SYNC_IDLE_SEC = 5.0
+
 
 def accel_mag_from_sample(sample: dict) -> float:
     """Compute magnitude of acceleration (ax, ay, az) in g."""
@@ -34,23 +53,42 @@ def accel_mag_from_sample(sample: dict) -> float:
 async def post_events(
     worker_id: str,
     events: List[dict],
+    session: Optional["aiohttp.ClientSession"] = None,
 ) -> bool:
     """
     POST to BACKEND_URL/api/events.
-    events: [{ts, label, risk_ergo, risk_fatigue}]
-    Return True if status 200.
+    events: [{ts, seq, label, risk_ergo, risk_fatigue, confidence}]
+    Return True if status 200. Pass `session` to reuse a pooled connection.
     """
     if not events:
         return True
+    import aiohttp
+
     url = f"{BACKEND_URL.rstrip('/')}/api/events"
     payload = {"worker_id": worker_id, "events": events}
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=API_HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                return resp.status == 200
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await _post_json(own_session, url, payload)
+        return await _post_json(session, url, payload)
     except Exception:
         return False
 
+
+async def _post_json(session: "aiohttp.ClientSession", url: str, payload: dict, timeout: float = 10) -> bool:
+    """POST and record latency / status per endpoint in edge metrics."""
+    import aiohttp
+
+    endpoint = urlsplit(url).path
+    started = time.perf_counter()
+    try:
+        async with session.post(url, json=payload, headers=API_HEADERS, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            metrics.observe_http(endpoint, str(resp.status), time.perf_counter() - started)
+            return resp.status == 200
+    except Exception:
+        metrics.observe_http(endpoint, "error", time.perf_counter() - started)
+        raise
+
 async def post_events_with_buffer(worker_id: str, events: List[dict]) -> bool:
     """
     Tries to POST events. If fails, stores in local SQLite buffer.
@@ -58,44 +96,107 @@ async def post_events_with_buffer(worker_id: str, events: List[dict]) -> bool:
     """
     if not events:
         return True
+    wl = worker_label(worker_id)
+    started = time.perf_counter()
     ok = await post_events(worker_id, events)
+    metrics.stage_seconds.observe(time.perf_counter() - started, wl, "post")
     if not ok:
         log.warning("[%s] Backend unreachable; queueing %d events to offline buffer", worker_id, len(events))
         await edge_buffer.add_events(worker_id, events)
+    metrics.events.inc(wl, "sent" if ok else "buffered", amount=len(events))
     return True
 
+def _group_for_replay(batches: List[Tuple[int, str, List[dict]]]) -> Dict[str, List[Tuple[List[int], List[dict]]]]:
+    """
+    Merge buffered batches per worker (oldest first) into POST-sized chunks.
+    Returns worker_id → [(buffer row ids, events)], chunks in replay order.
+    """
+    grouped: Dict[str, List[Tuple[List[int], List[dict]]]] = OrderedDict()
+    for record_id, worker_id, events in batches:
+        chunks = grouped.setdefault(worker_id, [])
+        if not chunks or len(chunks[-1][1]) + len(events) > SYNC_MAX_EVENTS_PER_POST:
+            chunks.append(([], []))
+        ids, merged = chunks[-1]
+        ids.append(record_id)
+        merged.extend(events)
+    return grouped
+
+
+async def _replay_round(session: "aiohttp.ClientSession", concurrency: int) -> Tuple[int, bool]:
+    """
+    Replay one read of the buffer. Workers are replayed in parallel, bounded by
+    `concurrency`; one worker's chunks go one after another, oldest first, and stop
+    at its first failure (the backend serializes batches per worker anyway).
+    Returns (events delivered, any failure).
+    """
+    batches = await edge_buffer.get_batch(limit=SYNC_READ_BATCHES)
+    if not batches:
+        return 0, False
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _replay_worker(worker_id: str, chunks: List[Tuple[List[int], List[dict]]]) -> Tuple[List[int], int, bool]:
+        delivered_ids: List[int] = []
+        sent = 0
+        for ids, events in chunks:
+            async with semaphore:
+                ok = await post_events(worker_id, events, session=session)
+            if not ok:
+                return delivered_ids, sent, True
+            metrics.events.inc(worker_label(worker_id), "replayed", amount=len(events))
+            delivered_ids.extend(ids)
+            sent += len(events)
+        return delivered_ids, sent, False
+
+    results = await asyncio.gather(*(
+        _replay_worker(worker_id, chunks)
+        for worker_id, chunks in _group_for_replay(batches).items()
+    ))
+    await edge_buffer.delete_batch([i for ids, _, _ in results for i in ids])
+    return sum(sent for _, sent, _ in results), any(failed for _, _, failed in results)
+
+
 async def start_sync_loop():
-    """Background task to push buffered events when backend is up."""
-    while True:
-        await asyncio.sleep(5.0)
-        count = await edge_buffer.get_count()
-        if count == 0:
-            continue
-            
-        # Try a ping first
-        url = f"{BACKEND_URL.rstrip('/')}/health"
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=2) as resp:
+    """
+    Background task to push buffered events when backend is up.
+    Drains back-to-back while rounds succeed; concurrency grows by one per clean
+    round and halves on failure (AIMD), so replay speed tracks what the link
+    and backend can take.
+    """
+    import aiohttp
+
+    health_url = f"{BACKEND_URL.rstrip('/')}/health"
+    concurrency = SYNC_MIN_CONCURRENCY
+    connector = aiohttp.TCPConnector(limit=SYNC_MAX_CONCURRENCY)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        while True:
+            await asyncio.sleep(SYNC_IDLE_SEC)
+            if await edge_buffer.get_count() == 0:
+                continue
+
+            # Try a ping first
+            try:
+                async with session.get(health_url, timeout=aiohttp.ClientTimeout(total=2)) as resp:
                     if resp.status != 200:
                         continue
-        except Exception:
-            continue
-            
-        log.info("Backend reachable. Syncing offline buffer (%d batches pending)...", count)
-        batches = await edge_buffer.get_batch(limit=10)
-        success_ids = []
-        
-        for record_id, worker_id, payload in batches:
-            ok = await post_events(worker_id, payload)
-            if ok:
-                success_ids.append(record_id)
-            else:
-                break # Stop if it fails mid-sync
-                
-        if success_ids:
-            await edge_buffer.delete_batch(success_ids)
-            log.info("Successfully synced %d batches to backend.", len(success_ids))
+            except Exception:
+                continue
+
+            log.info("Backend reachable. Syncing offline buffer (%d events pending)...", edge_buffer.event_count)
+            started = time.monotonic()
+            total = 0
+            while await edge_buffer.get_count() > 0:
+                sent, failed = await _replay_round(session, concurrency)
+                total += sent
+                if failed:
+                    concurrency = max(SYNC_MIN_CONCURRENCY, concurrency // 2)
+                    metrics.replay_concurrency.set(concurrency)
+                    break
+                concurrency = min(SYNC_MAX_CONCURRENCY, concurrency + 1)
+                metrics.replay_concurrency.set(concurrency)
+            if total:
+                elapsed = time.monotonic() - started
+                log.info("Synced %d buffered events in %.1fs (%.0f events/s, concurrency %d).",
+                         total, elapsed, total / max(elapsed, 1e-6), concurrency)
 
 
 async def post_sensor_snapshot(
@@ -117,14 +218,38 @@ async def post_sensor_snapshot(
         payload["temp"] = round(float(temp), 1)
     if accel_mag is not None:
         payload["accel_mag"] = round(float(accel_mag), 2)
+    import aiohttp
+
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=API_HEADERS, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                return resp.status == 200
+            return await _post_json(session, url, payload, timeout=5)
     except Exception:
         return False
 
 
+async def post_snapshots(session: "aiohttp.ClientSession", worker_id: str, body: bytes) -> Optional[dict]:
+    """
+    POST raw-window snapshots (snapshot_uploader.py wire format) to BACKEND_URL/api/snapshots.
+    Returns the backend's {"stored", "pending"} reply, or None if the upload failed.
+    """
+    import aiohttp
+
+    url = f"{BACKEND_URL.rstrip('/')}/api/snapshots"
+    endpoint = urlsplit(url).path
+    started = time.perf_counter()
+    try:
+        async with session.post(
+            url, data=body, params={"worker_id": worker_id},
+            headers={**API_HEADERS, "Content-Type": "application/octet-stream"},
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as resp:
+            metrics.observe_http(endpoint, str(resp.status), time.perf_counter() - started)
+            return await resp.json() if resp.status == 200 else None
+    except Exception:
+        metrics.observe_http(endpoint, "error", time.perf_counter() - started)
+        return None
+
+
 async def post_device_status(worker_id: str, mpu_connected: bool) -> bool:
     """
     POST to BACKEND_URL/api/live/device-status when device reports MPU connected or not.
@@ -132,9 +257,10 @@ async def post_device_status(worker_id: str, mpu_connected: bool) -> bool:
     """
     url = f"{BACKEND_URL.rstrip('/')}/api/live/device-status"
     payload = {"worker_id": worker_id, "mpu_connected": mpu_connected}
+    import aiohttp
+
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=API_HEADERS, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                return resp.status == 200
+            return await _post_json(session, url, payload, timeout=5)
     except Exception:
         return False
@@ -1,58 +1,26 @@
 """
 Industrial Wearable AI — BLE Client & Simulator
-read_ble_stream: real BLE or simulated samples. Sample format per TECHNICAL_STACK_SPEC §4.1.
+read_ble_stream: real BLE or simulated samples (simulator.fleet_runner). Sample format per TECHNICAL_STACK_SPEC §4.1.
+Firmware notifications are packed multi-sample frames (ble_protocol) or, from older
+firmware, one JSON sample each; both are accepted.
 """
 import asyncio
-import json
 import logging
-import random
 import time
 from typing import Any, AsyncIterator, Callable, Optional
 
+from .ble_protocol import SampleBlock, decode_notification
+from .metrics import metrics, worker_label
+from .simulator import fleet_runner
+
 log = logging.getLogger(__name__)
 
-# Bleak for real BLE (optional import)
-try:
-    from bleak import BleakClient, BleakScanner
-    HAS_BLEAK = True
-except ImportError:
-    BleakScanner = None
-    HAS_BLEAK = False
-
-SAMPLE_RATE_HZ = 25
-SAMPLE_INTERVAL = 1.0 / SAMPLE_RATE_HZ  # ~0.04 s
-
-
-def _make_sim_sample(worker_id: str) -> dict:
-    """Generate one fake sample matching §4.1 format."""
-    return {
-        "worker_id": worker_id,
-        "ts": int(time.time() * 1000),
-        "ax": round(random.uniform(-1, 1), 2),
-        "ay": round(random.uniform(-1, 1), 2),
-        "az": round(random.uniform(9, 10), 2),
-        "gx": round(random.uniform(-50, 50), 1),
-        "gy": round(random.uniform(-50, 50), 1),
-        "gz": round(random.uniform(-50, 50), 1),
-        "temp": round(random.uniform(28, 35), 1),
-    }
-
-
-async def _simulator_loop(
-    worker_id: str,
-    callback: Callable[[dict], Any],
-) -> None:
-    """Emit simulated samples at ~25 Hz. Runs until task cancelled."""
-    while True:
-        sample = _make_sim_sample(worker_id)
-        try:
-            if asyncio.iscoroutinefunction(callback):
-                await callback(sample)
-            else:
-                callback(sample)
-        except Exception:
-            pass
-        await asyncio.sleep(SAMPLE_INTERVAL)
+
+async def _invoke(callback: Callable[[Any], Any], arg: Any) -> None:
+    if asyncio.iscoroutinefunction(callback):
+        await callback(arg)
+    else:
+        callback(arg)
 
 
 async def read_ble_stream(
@@ -60,35 +28,50 @@ async def read_ble_stream(
     callback: Callable[[dict], Any],
     worker_id: str = "W01",
     use_simulator: Optional[bool] = None,
+    block_callback: Optional[Callable[[SampleBlock], Any]] = None,
 ) -> None:
     """
     Async stream of raw samples. If use_simulator or no device_id: generate fake samples.
     Otherwise connect to BLE device and read GATT characteristic.
+    Packed frames go to block_callback whole when given; otherwise each sample in the
+    frame is passed to callback as a §4.1 dict. Legacy JSON samples always go to callback.
     Runs until task is cancelled.
     """
     if use_simulator is None:
         use_simulator = not device_id
 
     if use_simulator or not device_id:
-        await _simulator_loop(worker_id, callback)
+        await fleet_runner.stream(worker_id, callback, block_callback)
         return
 
-    # Real BLE mode (when firmware is ready)
-    if not HAS_BLEAK:
-        raise RuntimeError("bleak not installed; use simulator or pip install bleak")
+    # Real BLE mode (when firmware is ready). Bleak is imported here, so simulator runs never load it.
+    try:
+        from bleak import BleakClient, BleakScanner
+    except ImportError:
+        raise RuntimeError("bleak not installed; use simulator or pip install bleak") from None
 
     CHAR_UUID = "0000fff1-0000-1000-8000-00805f9b34fb"  # Must match firmware
 
+    wl = worker_label(worker_id)
+
     async def _ble_notify_handler(sender, data: bytearray):
-        try:
-            text = data.decode("utf-8")
-            sample = json.loads(text)
-            if asyncio.iscoroutinefunction(callback):
-                await callback(sample)
-            else:
-                callback(sample)
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            pass
+        t0 = time.perf_counter()
+        decoded = decode_notification(data)
+        metrics.observe_stage(worker_id, "ble_decode", time.perf_counter() - t0)
+        if decoded is None:
+            metrics.frames.inc(wl, "invalid")
+            metrics.samples_dropped.inc(wl, "undecodable")
+            return
+        metrics.frames.inc(wl, "json" if isinstance(decoded, dict) else "packed")
+        if isinstance(decoded, dict):
+            await _invoke(callback, decoded)
+        elif not decoded.mpu_connected:
+            await _invoke(callback, {"worker_id": worker_id, "mpu_connected": False})
+        elif block_callback is not None:
+            await _invoke(block_callback, decoded)
+        else:
+            for sample in decoded.to_samples(worker_id):
+                await _invoke(callback, sample)
 
     BLE_NAME = "WearableAI"
     scan_timeout = 10.0
@@ -97,34 +80,33 @@ async def read_ble_stream(
     for attempt in range(max_retries):
         address = device_id
         # On Windows, device is often "not found" until we scan first
-        if BleakScanner is not None:
-            log.info("Scanning for BLE device (attempt %s/%s)...", attempt + 1, max_retries)
-            try:
-                device = await BleakScanner.find_device_by_address(device_id, timeout=scan_timeout)
-                if device is None:
-                    devices = await BleakScanner.discover(timeout=scan_timeout)
-                    device = next(
-                        (d for d in devices if d.name and BLE_NAME in d.name),
-                        next((d for d in devices if d.address and d.address.upper().replace("-", ":") == device_id.upper().replace("-", ":")), None),
-                    )
-                if device is not None:
-                    address = device.address
-                    log.info("Device found at %s, connecting (timeout=60s)...", address)
-                else:
-                    raise RuntimeError(
-                        f"'{BLE_NAME}' not found. Is the ESP32 powered and advertising? "
-                        "Keep it close to the laptop and try again."
-                    )
-            except RuntimeError:
-                raise
-            except Exception as e:
-                log.warning("Scan failed: %s", e)
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2.0 * (attempt + 1))
-                    continue
+        log.info("Scanning for BLE device (attempt %s/%s)...", attempt + 1, max_retries)
+        try:
+            device = await BleakScanner.find_device_by_address(device_id, timeout=scan_timeout)
+            if device is None:
+                devices = await BleakScanner.discover(timeout=scan_timeout)
+                device = next(
+                    (d for d in devices if d.name and BLE_NAME in d.name),
+                    next((d for d in devices if d.address and d.address.upper().replace("-", ":") == device_id.upper().replace("-", ":")), None),
+                )
+            if device is not None:
+                address = device.address
+                log.info("Device found at %s, connecting (timeout=60s)...", address)
+            else:
                 raise RuntimeError(
-                    f"Could not find BLE device. Is the ESP32 on and advertising as '{BLE_NAME}'?"
-                ) from e
+                    f"'{BLE_NAME}' not found. Is the ESP32 powered and advertising? "
+                    "Keep it close to the laptop and try again."
+                )
+        except RuntimeError:
+            raise
+        except Exception as e:
+            log.warning("Scan failed: %s", e)
+            if attempt < max_retries - 1:
+                await asyncio.sleep(2.0 * (attempt + 1))
+                continue
+            raise RuntimeError(
+                f"Could not find BLE device. Is the ESP32 on and advertising as '{BLE_NAME}'?"
+            ) from e
 
         # Longer timeout for BLE connect (Windows can be slow)
         client = BleakClient(address, timeout=60.0)
@@ -134,13 +116,16 @@ async def read_ble_stream(
                 raise RuntimeError("BLE connect failed")
             await asyncio.sleep(0.3)
             await client.start_notify(CHAR_UUID, _ble_notify_handler)
+            metrics.ble_connects.inc(wl)
             log.info("BLE connected and notify started for %s", address)
             try:
                 while client.is_connected:
                     await asyncio.sleep(1)
+                metrics.ble_disconnects.inc(wl, "link_lost")
             finally:
                 await client.disconnect()
         except Exception as e:
+            metrics.ble_disconnects.inc(wl, "error")
             err_msg = str(e).lower()
             if attempt < max_retries - 1 and (
                 "not found" in err_msg or "not connected" in err_msg or "unreachable" in err_msg
@@ -5,11 +5,15 @@ Parses devices.json and runs concurrent device pipelines.
 import asyncio
 import json
 import logging
+import os
 from pathlib import Path
 from typing import Callable, Coroutine
 
 log = logging.getLogger(__name__)
 
+# Load testing: SIM_WORKERS=N replaces devices.json with N simulated wearables (SIM001..)
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", "0"))
+
 class BLEDeviceManager:
     def __init__(self, config_path: str, pipeline_factory: Callable[[str | None, str], Coroutine]):
         self.config_path = Path(config_path)
@@ -17,6 +21,9 @@ class BLEDeviceManager:
         self.tasks = []
 
     def load_devices(self) -> list[dict]:
+        if SIM_WORKERS > 0:
+            log.info("SIM_WORKERS=%d: running simulated fleet instead of %s", SIM_WORKERS, self.config_path)
+            return [{"mac_address": None, "worker_id": f"SIM{i + 1:03d}"} for i in range(SIM_WORKERS)]
         if not self.config_path.exists():
             log.warning("Config file %s not found, defaulting to single simulator.", self.config_path)
             return [{"mac_address": None, "worker_id": "W01"}]
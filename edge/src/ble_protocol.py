@@ -0,0 +1,164 @@
+"""
+Industrial Wearable AI — BLE Sample Frame Protocol
+Packed binary frames carrying several IMU samples per notification, with a JSON
+fallback for firmware that still sends one JSON object per sample.
+
+Frame v1, little-endian (mirrors firmware/src/frame.h):
+    header  magic u8 (0xA7), version u8, count u8, flags u8 (bit0 mpu_connected),
+            counter u16 (sample counter of the first sample, wraps),
+            t0_ms u32 (device millis of the first sample), temp i16 (°C × 100)
+    sample  dt_ms u16 (offset from t0), ax ay az i16 (m/s² × 1000), gx gy gz i16 (°/s × 100)
+
+Five samples per frame is 82 bytes against ~550 bytes of JSON, and the edge
+decodes a whole frame with one numpy.frombuffer call.
+"""
+import json
+import struct
+from typing import List, NamedTuple, Optional, Union
+
+import numpy as np
+
+FRAME_MAGIC = 0xA7
+FRAME_VERSION = 1
+SAMPLES_PER_FRAME = 5
+FLAG_MPU_CONNECTED = 0x01
+
+ACCEL_SCALE = 1000.0
+GYRO_SCALE = 100.0
+TEMP_SCALE = 100.0
+
+AXES = ("ax", "ay", "az", "gx", "gy", "gz")
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "u1"), ("version", "u1"), ("count", "u1"), ("flags", "u1"),
+    ("counter", "<u2"), ("t0_ms", "<u4"), ("temp", "<i2"),
+])
+SAMPLE_DTYPE = np.dtype([("dt_ms", "<u2")] + [(axis, "<i2") for axis in AXES])
+HEADER_SIZE = HEADER_DTYPE.itemsize  # 12
+SAMPLE_SIZE = SAMPLE_DTYPE.itemsize  # 14
+
+_HEADER = struct.Struct("<BBBBHIh")  # same layout as HEADER_DTYPE, cheaper for one record
+_SCALES = np.array([ACCEL_SCALE] * 3 + [GYRO_SCALE] * 3, dtype=np.float64)
+
+
+class SampleBlock(NamedTuple):
+    """
+    Decoded frame: imu is (count, 6) float64 in ax..gz order, ts is device ms.
+    labels is the ground-truth label index per sample for simulated data (None from hardware).
+    """
+
+    imu: np.ndarray
+    ts: np.ndarray
+    temp: Optional[float]
+    counter: int
+    mpu_connected: bool
+    labels: Optional[np.ndarray] = None
+
+    def _sample(self, row: List[float], ts: int, worker_id: Optional[str]) -> dict:
+        sample = dict(zip(AXES, row))
+        sample["ts"] = ts
+        if self.temp is not None:
+            sample["temp"] = self.temp
+        if worker_id:
+            sample["worker_id"] = worker_id
+        return sample
+
+    def to_samples(self, worker_id: Optional[str] = None) -> List[dict]:
+        """Expand to the per-sample dict format (TECHNICAL_STACK_SPEC §4.1)."""
+        return [self._sample(row, ts, worker_id) for row, ts in zip(self.imu.tolist(), self.ts.tolist())]
+
+    def last_sample(self, worker_id: Optional[str] = None) -> dict:
+        """Only the newest sample in the dict format, without expanding the rest of the frame."""
+        return self._sample(self.imu[-1].tolist(), int(self.ts[-1]), worker_id)
+
+
+def decode_frame(data: bytes) -> Optional[SampleBlock]:
+    """Decode a packed frame. Returns None if `data` is not a valid v1 frame."""
+    if len(data) < HEADER_SIZE or data[0] != FRAME_MAGIC or data[1] != FRAME_VERSION:
+        return None
+    _, _, count, flags, counter, t0_ms, temp = _HEADER.unpack_from(data)
+    if len(data) != HEADER_SIZE + count * SAMPLE_SIZE:
+        return None
+    # Every sample field is 16-bit, so the body is a (count, 7) int16 matrix: dt | ax..gz
+    body = np.frombuffer(data, dtype="<i2", count=count * 7, offset=HEADER_SIZE).reshape(count, 7)
+    return SampleBlock(
+        imu=body[:, 1:] / _SCALES,
+        ts=t0_ms + body[:, 0].view("<u2").astype(np.int64),
+        temp=temp / TEMP_SCALE,
+        counter=counter,
+        mpu_connected=bool(flags & FLAG_MPU_CONNECTED),
+    )
+
+
+def decode_notification(data: Union[bytes, bytearray]) -> Union[SampleBlock, dict, None]:
+    """Packed frame → SampleBlock; legacy JSON sample → dict; anything else → None."""
+    data = bytes(data)
+    block = decode_frame(data)
+    if block is not None:
+        return block
+    try:
+        sample = json.loads(data.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return sample if isinstance(sample, dict) else None
+
+
+def encode_frame(
+    imu: np.ndarray,
+    ts: np.ndarray,
+    temp: float = 25.0,
+    counter: int = 0,
+    mpu_connected: bool = True,
+) -> bytes:
+    """Pack samples exactly as the firmware does (same scaling, rounding and clamping)."""
+    imu = np.asarray(imu, dtype=np.float64).reshape(-1, 6)
+    ts = np.asarray(ts, dtype=np.int64)
+    count = len(imu)
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = FRAME_MAGIC
+    header["version"] = FRAME_VERSION
+    header["count"] = count
+    header["flags"] = FLAG_MPU_CONNECTED if mpu_connected else 0
+    header["counter"] = counter & 0xFFFF
+    t0 = int(ts[0]) if count else 0
+    header["t0_ms"] = t0 & 0xFFFFFFFF
+    header["temp"] = int(np.clip(round(temp * TEMP_SCALE), -32767, 32767))
+    body = np.zeros(count, dtype=SAMPLE_DTYPE)
+    body["dt_ms"] = np.clip(ts - t0, 0, 0xFFFF)
+    scaled = np.clip(np.rint(imu * _SCALES), -32767, 32767).astype(np.int16)
+    for i, axis in enumerate(AXES):
+        body[axis] = scaled[:, i]
+    return header.tobytes() + body.tobytes()
+
+
+class FirmwareFrameSimulator:
+    """
+    Mirrors the firmware's batching: collects samples and emits a frame every
+    SAMPLES_PER_FRAME samples. Lets the decoder and pipeline run without hardware.
+    """
+
+    def __init__(self, samples_per_frame: int = SAMPLES_PER_FRAME):
+        self.samples_per_frame = samples_per_frame
+        self._counter = 0
+        self._pending: List[dict] = []
+
+    def push(self, sample: dict) -> Optional[bytes]:
+        """Add one §4.1 sample dict; return a packed frame when one is full."""
+        self._pending.append(sample)
+        if len(self._pending) < self.samples_per_frame:
+            return None
+        return self.flush()
+
+    def flush(self) -> Optional[bytes]:
+        if not self._pending:
+            return None
+        pending, self._pending = self._pending, []
+        imu = np.array([[s.get(axis, 0.0) for axis in AXES] for s in pending], dtype=np.float64)
+        ts = np.array([s.get("ts", 0) for s in pending], dtype=np.int64)
+        frame = encode_frame(imu, ts, temp=pending[-1].get("temp", 25.0), counter=self._counter)
+        self._counter = (self._counter + len(pending)) & 0xFFFF
+        return frame
+
+    def disconnected_frame(self) -> bytes:
+        """What the firmware sends when the MPU is missing: an empty frame with the flag cleared."""
+        return encode_frame(np.empty((0, 6)), np.empty(0, dtype=np.int64), mpu_connected=False, counter=self._counter)
@@ -2,38 +2,75 @@
 Industrial Wearable AI — Sample Buffer
 Ring buffer for raw IMU samples. Used by pipeline for sliding windows.
 """
-from collections import deque
-from typing import Any, List, Optional
+from typing import List, Optional
+
+import numpy as np
+
+AXES = ("ax", "ay", "az", "gx", "gy", "gz")
 
 
 class SampleBuffer:
     """
     Ring buffer for samples. maxlen = max_seconds * sample_rate.
+    Stores the six IMU axes in a preallocated (maxlen, 6) array so decoded BLE
+    frames can be copied in as a block; dict samples are still accepted.
     Thread-safe for single-threaded async usage.
     """
 
     def __init__(self, max_seconds: float = 5.0, sample_rate: float = 25.0):
         self.max_seconds = max_seconds
         self.sample_rate = sample_rate
-        maxlen = int(max_seconds * sample_rate)
-        self._deque: deque = deque(maxlen=maxlen)
+        self.maxlen = int(max_seconds * sample_rate)
+        self._imu = np.zeros((self.maxlen, len(AXES)), dtype=np.float64)
+        self._ts = np.zeros(self.maxlen, dtype=np.int64)
+        self._next = 0   # slot the next sample is written to
+        self._count = 0  # valid samples (<= maxlen)
 
     def append(self, sample: dict) -> None:
         """Add sample to buffer (drops oldest if full)."""
-        self._deque.append(sample)
+        i = self._next
+        self._imu[i] = [sample.get(axis, 0) for axis in AXES]
+        self._ts[i] = sample.get("ts", 0)
+        self._next = (i + 1) % self.maxlen
+        self._count = min(self._count + 1, self.maxlen)
+
+    def extend(self, imu: np.ndarray, ts: np.ndarray) -> None:
+        """Add a block of samples: imu (n, 6) in ax..gz order, ts (n,). Drops oldest if full."""
+        n = len(imu)
+        if n >= self.maxlen:
+            imu, ts, n = imu[-self.maxlen:], ts[-self.maxlen:], self.maxlen
+        first = min(n, self.maxlen - self._next)
+        self._imu[self._next:self._next + first] = imu[:first]
+        self._ts[self._next:self._next + first] = ts[:first]
+        if first < n:
+            self._imu[:n - first] = imu[first:]
+            self._ts[:n - first] = ts[first:]
+        self._next = (self._next + n) % self.maxlen
+        self._count = min(self._count + n, self.maxlen)
+
+    def get_array(self, num_samples: int) -> Optional[np.ndarray]:
+        """Return the last num_samples as a (num_samples, 6) array (oldest first), or None if insufficient."""
+        if self._count < num_samples or num_samples <= 0:
+            return None
+        start = self._next - num_samples
+        if start >= 0:
+            return self._imu[start:self._next].copy()
+        return np.concatenate((self._imu[start:], self._imu[:self._next]))
 
     def get_window(self, num_samples: int) -> Optional[List[dict]]:
         """
         Return last num_samples as list, or None if insufficient.
         """
-        if len(self._deque) < num_samples:
+        arr = self.get_array(num_samples)
+        if arr is None:
             return None
-        # Take last num_samples (newest at end)
-        return list(self._deque)[-num_samples:]
+        ts = self._ts[(self._next - num_samples + np.arange(num_samples)) % self.maxlen]
+        return [dict(zip(AXES, row), ts=t) for row, t in zip(arr.tolist(), ts.tolist())]
 
     def __len__(self) -> int:
-        return len(self._deque)
+        return self._count
 
     def clear(self) -> None:
         """Clear buffer."""
-        self._deque.clear()
+        self._next = 0
+        self._count = 0
@@ -1,6 +1,6 @@
 """
 Industrial Wearable AI — Activity Classifier
-Load joblib model or use rule-based fallback. Labels match backend enum.
+Load joblib model (or compact .edge.npz artifact) or use rule-based fallback. Labels match backend enum.
 """
 import os
 from pathlib import Path
@@ -8,17 +8,30 @@ from typing import Optional, Union
 
 import numpy as np
 
+from .edge_model import is_edge_model, load_edge_model
+
 LABELS = ["sewing", "idle", "adjusting", "error", "break"]
 
+# Rule-based fallback thresholds (std sums/maxima). Keys match backend SystemConfig so
+# remote_config can override them from GET /api/config/edge.
+RULE_THRESHOLDS = {
+    "classifier_idle_std_sum": 0.06,
+    "classifier_idle_std_max": 0.12,
+    "classifier_adjusting_std_sum": 0.25,
+    "classifier_adjusting_std_max": 0.5,
+}
+
 
 def load_model(path: Optional[Union[str, Path]]) -> Optional[object]:
-    """Load joblib model if path exists; else return None."""
+    """Load joblib model (or .edge.npz artifact, NumPy only) if path exists; else return None."""
     if not path:
         return None
     p = Path(path)
     if not p.exists():
         return None
     try:
+        if is_edge_model(p):
+            return load_edge_model(p)
         import joblib
         return joblib.load(p)
     except Exception:
@@ -62,9 +75,10 @@ def _rule_based_predict(features: np.ndarray) -> str:
     var_sum = sum(stds)
     var_max = max(stds) if stds else 0.0
     # Any noticeable motion on one axis → at least adjusting (then sewing if more)
-    if var_sum < 0.06 and var_max < 0.12:
+    t = RULE_THRESHOLDS
+    if var_sum < t["classifier_idle_std_sum"] and var_max < t["classifier_idle_std_max"]:
         return "idle"
-    if var_sum < 0.25 and var_max < 0.5:
+    if var_sum < t["classifier_adjusting_std_sum"] and var_max < t["classifier_adjusting_std_max"]:
         return "adjusting"
     return "sewing"
 
@@ -0,0 +1,204 @@
+"""
+Industrial Wearable AI — Compact Edge Model Runtime
+Loads the portable model artifacts written by ml/scripts/export_edge_model.py and
+runs them with NumPy only (no sklearn / xgboost / joblib import, no pickle).
+
+An artifact (*.edge.npz) holds a JSON header (format, version, kind, feature schema,
+classes, quantization) and packed arrays. Tree ensembles are stored as concatenated
+per-node arrays:
+
+    tree_offset  int32   first node of each tree
+    feature      int16   split feature, -1 on leaves
+    threshold    f16|f32 split threshold (x <= t goes left), rounded toward -inf
+    left, right  i16|i32 child index within the tree
+    leaf         int32   row in `value` for leaves, -1 elsewhere
+    value        f16|f32 leaf payload: class distribution, boosting score or path length
+
+Prediction walks all trees of all rows at once, one level per step, so a single
+window costs max_depth vectorised steps instead of a Python call per tree.
+The objects expose the subset of the sklearn API the edge uses (classes_, predict,
+predict_proba, score_samples, decision_function).
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+FORMAT = "iwai-edge-model"
+FORMAT_VERSION = 1
+SUFFIX = ".edge.npz"
+
+
+def is_edge_model(path: Union[str, Path]) -> bool:
+    return str(path).endswith(".npz")
+
+
+def _as_rows(X) -> np.ndarray:
+    # sklearn trees compare float32 inputs; thresholds are stored so this is exact
+    X = np.asarray(X, dtype=np.float32)
+    return X.reshape(1, -1) if X.ndim == 1 else X
+
+
+class _PackedForest:
+    """Packed trees → leaf node per (row, tree)."""
+
+    def __init__(self, arrays: dict, max_depth: int):
+        offset = arrays["tree_offset"].astype(np.intp)
+        n_nodes = len(arrays["feature"])
+        tree_of_node = np.repeat(np.arange(len(offset)), np.diff(np.append(offset, n_nodes)))
+        feature = arrays["feature"].astype(np.intp)
+        is_leaf = feature < 0
+        nodes = np.arange(n_nodes)
+        left = arrays["left"].astype(np.intp) + offset[tree_of_node]
+        right = arrays["right"].astype(np.intp) + offset[tree_of_node]
+        # Leaves point at themselves, so every row can take max_depth steps unconditionally
+        left[is_leaf] = nodes[is_leaf]
+        right[is_leaf] = nodes[is_leaf]
+        feature[is_leaf] = 0
+        self.roots = offset
+        self.feature = feature
+        self.threshold = arrays["threshold"].astype(np.float32)
+        self.left = left
+        self.right = right
+        self.leaf = arrays["leaf"].astype(np.intp)
+        self.value = arrays["value"].astype(np.float64)
+        self.max_depth = max_depth
+        self.n_trees = len(offset)
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """value rows of the leaf each row reaches in each tree: (n_rows, n_trees, ...)."""
+        nodes = np.tile(self.roots, (len(X), 1))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[self.leaf[nodes]]
+
+
+class EdgeModel:
+    def __init__(self, header: dict, arrays: dict):
+        self.header = header
+        self.n_features_in_ = int(header["n_features"])
+        if header.get("classes") is not None:
+            self.classes_ = np.array(header["classes"])
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.header.get('source', {}).get('type', '?')}, v{self.header['version']})"
+
+
+class EdgeForestClassifier(EdgeModel):
+    """RandomForestClassifier: mean of per-tree leaf class distributions."""
+
+    def __init__(self, header: dict, arrays: dict):
+        super().__init__(header, arrays)
+        self.forest = _PackedForest(arrays, header["max_depth"])
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.forest.leaf_values(_as_rows(X)).mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class EdgeGradientBoostingClassifier(EdgeModel):
+    """GradientBoostingClassifier: init + learning_rate × per-class tree sums, then sigmoid/softmax."""
+
+    def __init__(self, header: dict, arrays: dict):
+        super().__init__(header, arrays)
+        self.forest = _PackedForest(arrays, header["max_depth"])
+        self.init = np.asarray(header["init"], dtype=np.float64)
+        self.learning_rate = float(header["learning_rate"])
+        tree_class = arrays["tree_class"].astype(np.intp)
+        self._class_onehot = np.eye(len(self.init))[tree_class]  # (n_trees, K)
+
+    def decision_function(self, X) -> np.ndarray:
+        vals = self.forest.leaf_values(_as_rows(X))  # (n, n_trees)
+        return self.init + self.learning_rate * (vals @ self._class_onehot)
+
+    def predict_proba(self, X) -> np.ndarray:
+        raw = self.decision_function(X)
+        if raw.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        raw = raw - raw.max(axis=1, keepdims=True)
+        e = np.exp(raw)
+        return e / e.sum(axis=1, keepdims=True)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class EdgeLinearRegressor(EdgeModel):
+    """StandardScaler + Ridge folded into one affine map."""
+
+    def __init__(self, header: dict, arrays: dict):
+        super().__init__(header, arrays)
+        self.coef = arrays["coef"].astype(np.float64)
+        self.intercept = float(header["intercept"])
+
+    def predict(self, X) -> np.ndarray:
+        return _as_rows(X).astype(np.float64) @ self.coef + self.intercept
+
+
+class EdgeIsolationForest(EdgeModel):
+    """IsolationForest: leaves store path length (depth + c(n) − 1 as sklearn sums)."""
+
+    def __init__(self, header: dict, arrays: dict):
+        super().__init__(header, arrays)
+        self.forest = _PackedForest(arrays, header["max_depth"])
+        self.offset_ = float(header["offset"])
+        self._denominator = self.forest.n_trees * float(header["average_path_length_max_samples"])
+
+    def score_samples(self, X) -> np.ndarray:
+        depths = self.forest.leaf_values(_as_rows(X)).sum(axis=1)
+        if self._denominator == 0:
+            return np.full(len(depths), -0.5)  # sklearn: single training sample scores 2**-1
+        return -(2 ** (-depths / self._denominator))
+
+    def decision_function(self, X) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X) -> np.ndarray:
+        return np.where(self.decision_function(X) >= 0, 1, -1)
+
+
+KINDS = {
+    "forest_classifier": EdgeForestClassifier,
+    "gradient_boosting_classifier": EdgeGradientBoostingClassifier,
+    "linear_regressor": EdgeLinearRegressor,
+    "isolation_forest": EdgeIsolationForest,
+}
+
+
+def build_edge_model(header: dict, arrays: dict) -> EdgeModel:
+    """Model object from a parsed header and its arrays (what load_edge_model reads from disk)."""
+    if header.get("format") != FORMAT:
+        raise ValueError("not an edge model artifact")
+    if int(header.get("version", 0)) > FORMAT_VERSION:
+        raise ValueError(f"format version {header['version']} is newer than this runtime ({FORMAT_VERSION})")
+    cls = KINDS.get(header.get("kind"))
+    if cls is None:
+        raise ValueError(f"unsupported model kind {header.get('kind')!r}")
+    return cls(header, arrays)
+
+
+@lru_cache(maxsize=16)
+def _load_cached(path: str, mtime_ns: int) -> EdgeModel:
+    with np.load(path, allow_pickle=False) as z:
+        header = json.loads(z["header"].tobytes().decode("utf-8"))
+        arrays = {k: z[k] for k in z.files if k != "header"}
+    try:
+        return build_edge_model(header, arrays)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def load_edge_model(path: Union[str, Path]) -> EdgeModel:
+    """
+    Load an artifact. Models are read-only, so every worker's detector shares one
+    instance per file (until the file changes).
+    """
+    p = Path(path)
+    return _load_cached(str(p.resolve()), p.stat().st_mtime_ns)
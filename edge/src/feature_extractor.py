@@ -28,17 +28,27 @@ def extract_features(samples: List[dict]) -> np.ndarray:
     """
     if not samples:
         return np.zeros(FEATURE_DIM, dtype=np.float32)
+    arr = np.array([[s.get(axis, 0) for axis in AXES] for s in samples], dtype=np.float64)
+    return extract_features_array(arr)
 
-    features = []
-    for axis in AXES:
-        arr = np.array([s.get(axis, 0) for s in samples], dtype=np.float64)
-        mean_val = np.mean(arr)
-        std_val = np.std(arr)
-        if np.isnan(std_val) or std_val == 0:
-            std_val = 1e-8
-        min_val = np.min(arr)
-        max_val = np.max(arr)
-        zcr = _zero_crossing_rate(arr)
-        features.extend([mean_val, std_val, min_val, max_val, zcr])
-
-    return np.array(features, dtype=np.float32)
+
+def extract_features_array(window: np.ndarray) -> np.ndarray:
+    """
+    Same features from a (n_samples, 6) array in AXES order, computed for all axes at once.
+    Reductions run along contiguous rows so results match the per-axis version bit for bit.
+    """
+    if len(window) == 0:
+        return np.zeros(FEATURE_DIM, dtype=np.float32)
+    cols = np.ascontiguousarray(window.T, dtype=np.float64)  # (6, n)
+    mean_val = cols.mean(axis=1)
+    std_val = cols.std(axis=1)
+    std_val[np.isnan(std_val) | (std_val == 0)] = 1e-8
+    min_val = cols.min(axis=1)
+    max_val = cols.max(axis=1)
+    n = cols.shape[1]
+    if n < 2:
+        zcr = np.zeros(len(AXES))
+    else:
+        changes = np.sum(np.abs(np.diff(np.sign(cols), axis=1)), axis=1) // 2
+        zcr = changes / (2 * (n - 1))
+    return np.stack([mean_val, std_val, min_val, max_val, zcr], axis=1).astype(np.float32).ravel()
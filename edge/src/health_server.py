@@ -1,12 +1,16 @@
 """
 Industrial Wearable AI — Edge Health Server
 Exposes a lightweight local HTTP API to inspect edge gateway status.
+GET /status for a JSON summary, GET /metrics for Prometheus scraping (see metrics.py).
 """
 import aiohttp.web
 import asyncio
 import logging
 import time
+from .metrics import metrics
+from .model_watcher import models
 from .offline_buffer import edge_buffer
+from .startup import startup
 
 log = logging.getLogger(__name__)
 
@@ -23,16 +27,36 @@ async def health_handler(request):
             "status": "ok",
             "uptime_seconds": uptime,
             "buffer_depth_batches": buffer_count,
+            "startup": startup.phases,
+            "model_generation": models.current.generation,
         }
         return aiohttp.web.json_response(data)
     except Exception as e:
         log.error("Health API error: %s", e)
         return aiohttp.web.json_response({"status": "error", "message": str(e)}, status=500)
 
+def _collect_offline_buffer():
+    metrics.offline_batches.set(edge_buffer.batch_count)
+    metrics.offline_events.set(edge_buffer.event_count)
+    metrics.offline_bytes.set(edge_buffer.size_bytes)
+    metrics.offline_evicted.set(edge_buffer.evicted_events)
+
+
+metrics.add_collector(_collect_offline_buffer)
+
+
+async def metrics_handler(request):
+    """Handle GET /metrics (Prometheus text exposition format 0.0.4)"""
+    return aiohttp.web.Response(
+        body=metrics.render().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
 async def start_health_server(host="0.0.0.0", port=8081):
     """Start the aiohttp web server concurrently with the BLE process."""
     app = aiohttp.web.Application()
     app.router.add_get("/status", health_handler)
+    app.router.add_get("/metrics", metrics_handler)
     
     runner = aiohttp.web.AppRunner(app)
     await runner.setup()
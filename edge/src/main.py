@@ -2,6 +2,14 @@
 """
 Industrial Wearable AI — Edge Gateway Main
 BLE/simulator → buffer → pipeline → classifier → POST /api/events
+
+Startup keeps the path to the first event short: only what the sample path needs is
+imported eagerly; models load once in a worker thread (shared by all workers) while BLE
+scans/connects and the first window fills, and aiohttp-based services (health server,
+remote config) are imported in another. See startup.py for the phase report.
+
+Retrained models are hot-swapped without restarting pipelines (model_watcher.py): each
+pipeline reads the shared model set once per window and rebinds when it has changed.
 """
 import asyncio
 import logging
@@ -21,11 +29,17 @@ load_dotenv(_edge_dir / ".env")
 
 from .api_client import accel_mag_from_sample, post_device_status, post_events_with_buffer, post_sensor_snapshot, start_sync_loop
 from .ble_client import read_ble_stream
+from .ble_protocol import SampleBlock
+from .offline_buffer import edge_buffer
 from .buffer import SampleBuffer
 from .anomaly_detector import AnomalyDetector
-from .classifier import load_model, predict_with_confidence
+from .classifier import predict_with_confidence
+from .metrics import metrics, worker_label
+from .model_watcher import ModelSet, models
 from .pipeline import process_window
 from .risk_detector import RiskDetector
+from .snapshot_uploader import snapshots
+from .startup import startup
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -47,27 +61,48 @@ SAMPLE_RATE = 25.0
 BATCH_SIZE = 5
 FLUSH_INTERVAL_SEC = 2.5  # Send batch to backend at least this often so dashboard updates quickly
 SENSOR_INTERVAL_SEC = 2.5  # Send sensor snapshot (temp, accel_mag) for live dashboard
+STATUS_RETRY_SEC = 10.0  # Retry a device status POST the backend didn't accept
 
 
-from .health_server import start_health_server
 from .ble_manager import BLEDeviceManager
 
+startup.mark("imports")
+
+
+def _load_models() -> ModelSet:
+    """Every model, loaded and validated once (worker thread) and shared by all device pipelines."""
+    current = models.load({
+        "activity": MODEL_PATH,
+        "fatigue": FATIGUE_MODEL_PATH,
+        "ergo": ERGO_MODEL_PATH,
+        "anomaly": ANOMALY_MODEL_PATH,
+    })
+    if current.activity is None:
+        logger.info("No model; using rule-based classifier")
+    startup.mark("models")
+    return current
+
+
+def _import_services() -> None:
+    """aiohttp and the modules built on it (worker thread); api_client imports aiohttp on first use."""
+    import aiohttp  # noqa: F401
+    from . import health_server, remote_config  # noqa: F401
+    startup.mark("services")
+
+
 def _run_edge():
     """Run edge pipeline: BLE stream → buffer → pipeline → classifier → API."""
-    model = load_model(MODEL_PATH)
-    if model:
-        logger.info("Model loaded from %s", MODEL_PATH)
-    else:
-        logger.info("No model; using rule-based classifier")
+    models_ready: asyncio.Future | None = None
+    background: list[asyncio.Task] = []  # keep references so the tasks aren't garbage-collected
 
     async def create_device_pipeline(mac_address: str | None, worker_id: str):
         logger.info("Initializing pipeline for worker %s (mac=%s)", worker_id, mac_address)
-        
-        risk_detector = RiskDetector(
-            fatigue_model_path=FATIGUE_MODEL_PATH,
-            ergo_model_path=ERGO_MODEL_PATH,
-        )
-        anomaly_detector = AnomalyDetector(model_path=ANOMALY_MODEL_PATH)
+
+        # Bound at the first window, once the shared models are loaded; rebound after a hot swap
+        bound: ModelSet | None = None
+        model = None
+        risk_detector: RiskDetector | None = None
+        anomaly_detector: AnomalyDetector | None = None
 
         buffer = SampleBuffer(max_seconds=WINDOW_SECONDS * 2, sample_rate=SAMPLE_RATE)
         window_samples = int(WINDOW_SECONDS * SAMPLE_RATE)
@@ -79,52 +114,136 @@ def _run_edge():
         last_process_sample = 0
         last_sample: dict = {}  # latest raw sample for sensor snapshot
         first_sample_logged = False
+        next_counter = None  # expected frame counter; gaps are samples lost over BLE
+        reported_mpu: bool | None = None  # last MPU state the backend accepted
+        status_retry_at = 0.0
+        wl = worker_label(worker_id)
+        observe = metrics.stage_seconds.observe
 
-        async def _on_sample(sample: dict):
-            nonlocal last_ts, samples_total, last_process_sample, first_sample_logged
-            if sample.get("mpu_connected") is False:
-                await post_device_status(worker_id, False)
+        async def _maybe_process():
+            nonlocal last_ts, last_process_sample, bound, model, risk_detector, anomaly_detector
+            if samples_total - last_process_sample < step:
                 return
-            await post_device_status(worker_id, True)
-            if not first_sample_logged:
-                first_sample_logged = True
-                logger.info("[%s] First BLE sample received; building buffer...", worker_id)
-            
-            last_sample.update(sample)
-            buffer.append(sample)
-            samples_total += 1
-            win = buffer.get_window(window_samples)
+            win = buffer.get_array(window_samples)
             if win is None:
                 return
-            if samples_total - last_process_sample < step:
-                return
-            
+
             last_process_sample = samples_total
+            if risk_detector is None:
+                startup.mark("first_window")
+                await models_ready  # normally done long before: loaded while BLE connected and the window filled
+                if risk_detector is None:
+                    risk_detector = RiskDetector()
+                    anomaly_detector = AnomalyDetector()
+            # One read of the shared set per window; rolling state stays with the detectors
+            current = models.current
+            if current is not bound:
+                bound = current
+                model = current.activity
+                risk_detector.fatigue_model = current.fatigue
+                risk_detector.ergo_model = current.ergo
+                anomaly_detector.model = current.anomaly
+            t0 = time.perf_counter()
             features = process_window(win)
+            t1 = time.perf_counter()
             label, confidence = predict_with_confidence(model, features)
+            t2 = time.perf_counter()
             ts = int(time.time() * 1000)
             if ts <= last_ts:
                 ts = last_ts + 100
             last_ts = ts
 
-            risk_detector.update_rolling_state(label, interval_sec=WINDOW_SECONDS)
+            risk_detector.update_rolling_state(label, interval_sec=WINDOW_SECONDS, features=features, temp=last_sample.get("temp"))
             fatigue_level, fatigue_score = risk_detector.detect_fatigue(features)
             ergo_level, ergo_score = risk_detector.detect_ergo_risk(features)
+            t3 = time.perf_counter()
             is_anomaly, anomaly_score = anomaly_detector.detect(features)
+            t4 = time.perf_counter()
 
             risk_ergo = ergo_level in ("medium", "high")
             risk_fatigue = fatigue_level in ("mild", "high")
+            seq = await edge_buffer.next_seq(worker_id)  # backend dedupes replays on (worker, seq)
             event_batch.append({
                 "ts": ts,
+                "seq": seq,
                 "label": label,
                 "risk_ergo": risk_ergo,
                 "risk_fatigue": risk_fatigue,
+                "confidence": round(confidence, 3),  # backend queues < 0.7 for human review
             })
+            snapshots.offer(worker_id, seq, confidence, win)
+            t5 = time.perf_counter()
+            startup.mark("first_event")
+            observe(t1 - t0, wl, "features")
+            observe(t2 - t1, wl, "classify")
+            observe(t3 - t2, wl, "risk")
+            observe(t4 - t3, wl, "anomaly")
+            observe(t5 - t4, wl, "enqueue")
+            metrics.windows.inc(wl)
+            metrics.pending_events.set(len(event_batch), wl)
             if len(event_batch) >= BATCH_SIZE:
                 to_send = event_batch[:]
                 event_batch.clear()
+                metrics.pending_events.set(0, wl)
                 await post_events_with_buffer(worker_id, to_send)
 
+        async def _report_mpu(connected: bool):
+            """POST device status only when the MPU state changes (retried at most every STATUS_RETRY_SEC)."""
+            nonlocal reported_mpu, status_retry_at
+            if connected == reported_mpu or time.monotonic() < status_retry_at:
+                return
+            if await post_device_status(worker_id, connected):
+                reported_mpu = connected
+            else:
+                status_retry_at = time.monotonic() + STATUS_RETRY_SEC
+
+        def _log_first_sample():
+            nonlocal first_sample_logged
+            if not first_sample_logged:
+                first_sample_logged = True
+                startup.mark("first_sample")
+                logger.info("[%s] First BLE sample received; building buffer...", worker_id)
+
+        async def _on_sample(sample: dict):
+            nonlocal samples_total
+            if sample.get("mpu_connected") is False:
+                metrics.mpu_disconnected.inc(wl)
+                await _report_mpu(False)
+                return
+            _log_first_sample()
+            await _report_mpu(True)
+
+            t0 = time.perf_counter()
+            last_sample.update(sample)
+            buffer.append(sample)
+            samples_total += 1
+            observe(time.perf_counter() - t0, wl, "buffer")
+            metrics.samples.inc(wl)
+            metrics.buffer_fill.set(len(buffer), wl)
+            await _maybe_process()
+
+        async def _on_block(block: SampleBlock):
+            """Packed BLE frame: several samples copied into the buffer at once."""
+            nonlocal samples_total, next_counter
+            _log_first_sample()
+            await _report_mpu(True)
+
+            n = len(block.imu)
+            if next_counter is not None:
+                lost = (block.counter - next_counter) & 0xFFFF
+                if 0 < lost < 0x8000:  # forward gap; anything else is a device restart
+                    metrics.samples_dropped.inc(wl, "frame_gap", amount=lost)
+            next_counter = (block.counter + n) & 0xFFFF
+
+            t0 = time.perf_counter()
+            last_sample.update(block.last_sample(worker_id))
+            buffer.extend(block.imu, block.ts)
+            samples_total += n
+            observe(time.perf_counter() - t0, wl, "buffer")
+            metrics.samples.inc(wl, amount=n)
+            metrics.buffer_fill.set(len(buffer), wl)
+            await _maybe_process()
+
         async def _periodic_flush():
             while True:
                 await asyncio.sleep(FLUSH_INTERVAL_SEC)
@@ -132,6 +251,7 @@ def _run_edge():
                     continue
                 to_send = event_batch[:]
                 event_batch.clear()
+                metrics.pending_events.set(0, wl)
                 await post_events_with_buffer(worker_id, to_send)
 
         async def _periodic_sensor():
@@ -152,6 +272,7 @@ def _run_edge():
                 _on_sample,
                 worker_id=worker_id,
                 use_simulator=not mac_address,
+                block_callback=_on_block,
             )
         except Exception as e:
             logger.error("[%s] Pipeline error: %s", worker_id, e)
@@ -159,17 +280,39 @@ def _run_edge():
             flush_task.cancel()
             sensor_task.cancel()
             if event_batch:
-                await post_events(worker_id, event_batch)
+                await post_events_with_buffer(worker_id, event_batch)
+
+    async def _start_services():
+        await asyncio.to_thread(_import_services)
+        from .health_server import start_health_server
+        from .remote_config import start_config_sync_loop
+
+        # Pull classifier/risk thresholds from backend config (ETag conditional GET)
+        background.append(asyncio.create_task(start_config_sync_loop()))
+
+        # Start edge health server on port 8081
+        background.append(asyncio.create_task(start_health_server(port=8081)))
+
+        # Upload raw windows of low-confidence events (sampled, rate-bounded)
+        background.append(asyncio.create_task(snapshots.run()))
+
+    async def _watch_models():
+        await models_ready
+        await models.watch()
 
     async def _run():
+        nonlocal models_ready
         devices_file = _edge_dir / "devices.json"
-        
+        startup.mark("loop")
+
+        # Models and service imports load in worker threads while BLE scans and connects
+        models_ready = asyncio.ensure_future(asyncio.to_thread(_load_models))
+        background.append(asyncio.create_task(_start_services()))
+        background.append(asyncio.create_task(_watch_models()))
+
         # Start offline buffer sync loop
-        sync_task = asyncio.create_task(start_sync_loop())
-        
-        # Start edge health server on port 8081
-        health_task = asyncio.create_task(start_health_server(port=8081))
-        
+        background.append(asyncio.create_task(start_sync_loop()))
+
         # If BLE_DEVICE_ID is provided via ENV, it overrides devices.json with a single deployment
         if BLE_DEVICE_ID:
             logger.info("Using ENV BLE_DEVICE_ID %s for worker %s", BLE_DEVICE_ID, WORKER_ID)
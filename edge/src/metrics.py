@@ -0,0 +1,187 @@
+"""
+Industrial Wearable AI — Edge Metrics
+In-process counters, gauges and fixed-bucket histograms rendered in the Prometheus
+text format (served at GET /metrics by health_server). No client library: each
+observation is a dict lookup and a bisect, cheap enough for every sample.
+
+Stage timings (edge_stage_seconds) are labelled by worker and stage:
+    ble_decode → buffer → features → classify → risk → anomaly → enqueue → post
+Set METRICS_PER_WORKER=0 to fold the worker label into "all" for large fleets.
+"""
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+METRICS_PER_WORKER = os.getenv("METRICS_PER_WORKER", "1").lower() not in ("0", "false", "no")
+
+# 100 µs … 10 s: covers per-sample work up to HTTP round trips
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def worker_label(worker_id: str) -> str:
+    return worker_id if METRICS_PER_WORKER else "all"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _labels(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{self._labels(key)} {_fmt(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        """Mirror a total kept elsewhere (used by scrape-time collectors)."""
+        self._values[labelvalues] = value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        state = self._values.get(labelvalues)
+        if state is None:
+            state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, n) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    """All edge metrics. Collectors run on each scrape to refresh gauges owned by other modules."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+        self.started = time.time()
+
+        self.stage_seconds = self._add(Histogram(
+            "edge_stage_seconds", "Time spent per pipeline stage", ("worker", "stage")))
+        self.samples = self._add(Counter(
+            "edge_samples_total", "IMU samples received", ("worker",)))
+        self.frames = self._add(Counter(
+            "edge_ble_frames_total", "BLE notifications received", ("worker", "format")))
+        self.samples_dropped = self._add(Counter(
+            "edge_samples_dropped_total", "Samples lost before the buffer (frame counter gaps, undecodable payloads)", ("worker", "reason")))
+        self.windows = self._add(Counter(
+            "edge_windows_total", "Windows classified", ("worker",)))
+        self.events = self._add(Counter(
+            "edge_events_total", "Events handed to the backend client", ("worker", "outcome")))
+        self.ble_connects = self._add(Counter(
+            "edge_ble_connects_total", "Successful BLE connections (anything after the first per worker is a reconnect)", ("worker",)))
+        self.ble_disconnects = self._add(Counter(
+            "edge_ble_disconnects_total", "BLE connections lost or failed attempts", ("worker", "reason")))
+        self.mpu_disconnected = self._add(Counter(
+            "edge_mpu_disconnected_total", "Notifications reporting the IMU missing", ("worker",)))
+        self.http_requests = self._add(Counter(
+            "edge_http_requests_total", "Backend HTTP requests by outcome", ("endpoint", "status")))
+        self.http_seconds = self._add(Histogram(
+            "edge_http_request_seconds", "Backend HTTP request latency", ("endpoint",)))
+        self.pending_events = self._add(Gauge(
+            "edge_pending_events", "Classified events waiting for the next batch POST", ("worker",)))
+        self.buffer_fill = self._add(Gauge(
+            "edge_sample_buffer_samples", "Samples in the per-worker ring buffer", ("worker",)))
+        self.offline_batches = self._add(Gauge(
+            "edge_offline_buffer_batches", "Batches waiting in the offline SQLite buffer"))
+        self.offline_events = self._add(Gauge(
+            "edge_offline_buffer_events", "Events waiting in the offline SQLite buffer"))
+        self.offline_bytes = self._add(Gauge(
+            "edge_offline_buffer_bytes", "Payload bytes in the offline SQLite buffer"))
+        self.offline_evicted = self._add(Counter(
+            "edge_offline_buffer_evicted_events_total", "Events dropped because the offline buffer was full"))
+        self.replay_concurrency = self._add(Gauge(
+            "edge_replay_concurrency", "Current AIMD concurrency of offline buffer replay"))
+        self.uptime = self._add(Gauge(
+            "edge_uptime_seconds", "Seconds since the gateway started"))
+        self.startup_seconds = self._add(Gauge(
+            "edge_startup_seconds", "Seconds from process start to each startup phase (see startup.py)", ("phase",)))
+        self.model_reloads = self._add(Counter(
+            "edge_model_reloads_total", "Changed model files seen by the hot-reload watcher", ("model", "outcome")))
+        self.model_generation = self._add(Gauge(
+            "edge_model_generation", "Model set in use (1 at startup, +1 per hot swap)"))
+        self.snapshots = self._add(Counter(
+            "edge_snapshots_total", "Raw windows of low-confidence events (queued, rate_limited, uploaded, dropped)", ("outcome",)))
+
+    def _add(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        self._collectors.append(fn)
+
+    def observe_stage(self, worker_id: str, stage: str, seconds: float) -> None:
+        self.stage_seconds.observe(seconds, worker_label(worker_id), stage)
+
+    def observe_http(self, endpoint: str, status: str, seconds: float) -> None:
+        self.http_requests.inc(endpoint, status)
+        self.http_seconds.observe(seconds, endpoint)
+
+    def render(self) -> str:
+        self.uptime.set(round(time.time() - self.started, 1))
+        for collect in self._collectors:
+            collect()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
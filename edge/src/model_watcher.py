@@ -0,0 +1,253 @@
+"""
+Industrial Wearable AI — Edge Model Registry & Hot Reload
+The activity, fatigue, ergo and anomaly models shared by every device pipeline, and
+a watcher that swaps in retrained artifacts (retrain_with_labels.py, calibrate.py,
+export_edge_model.py) without restarting the gateway or dropping BLE connections.
+
+Readers never lock. `models.current` is an immutable ModelSet; a pipeline reads it
+once per window and uses that snapshot for the whole window. A reload builds a new
+ModelSet and publishes it with a single reference assignment (RCU): windows already
+running finish on the old models, which are freed when the last one drops them.
+
+Reload steps, off the event loop:
+    1. poll mtime/size every MODEL_WATCH_SEC; act once a file has stopped changing
+       for one interval (joblib.dump writes in place)
+    2. sha256 — an unchanged hash (touch, copy of the same model) is not reloaded
+    3. load (joblib or .edge.npz) in a worker thread
+    4. validate on a canary batch of simulator windows: input width, output shape,
+       finite values, known classes; log agreement with the running model
+    5. publish, or keep the running model and remember the rejected hash
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from .classifier import LABELS
+from .edge_model import is_edge_model, load_edge_model
+from .metrics import metrics
+from .risk_detector import FATIGUE_LABELS
+
+log = logging.getLogger(__name__)
+
+MODEL_WATCH_SEC = float(os.getenv("MODEL_WATCH_SEC", "10"))  # 0 disables hot reload
+CANARY_WORKERS = 16
+CANARY_WINDOWS = 4  # per worker
+HASH_CHUNK = 1 << 20
+
+INPUT_WIDTH = {"activity": 30, "fatigue": 8, "ergo": 6, "anomaly": 30}
+
+
+class ModelSet(NamedTuple):
+    """One consistent generation of the shared models (None = rule-based fallback)."""
+
+    activity: Optional[object] = None
+    fatigue: Optional[object] = None
+    ergo: Optional[object] = None
+    anomaly: Optional[object] = None
+    generation: int = 0
+
+
+def _load_file(path: Path) -> object:
+    if is_edge_model(path):
+        return load_edge_model(path)
+    import joblib
+    return joblib.load(path)
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def canary_batch() -> Dict[str, np.ndarray]:
+    """Model inputs built the way the pipeline builds them, from seeded simulator windows."""
+    from .pipeline import process_window
+    from .risk_detector import RiskDetector
+    from .classifier import predict_with_confidence
+    from .simulator import FleetSimulator
+
+    window = 75  # 3 s at 25 Hz, as in main
+    sim = FleetSimulator([f"CANARY{i}" for i in range(CANARY_WORKERS)], seed=0, dropout_rate=0.0, disconnect_rate=0.0)
+    features = np.stack([
+        process_window(w) for _ in range(CANARY_WINDOWS) for w in sim.step(window).imu
+    ])
+    risk = RiskDetector()
+    fatigue, ergo = [], []
+    for f in features:
+        label, _ = predict_with_confidence(None, f)
+        risk.update_rolling_state(label, features=f, temp=30.0)
+        fatigue.append(risk._build_fatigue_features(f))
+        ergo.append(risk._build_ergo_features(f))
+    return {"activity": features, "anomaly": features, "fatigue": np.stack(fatigue), "ergo": np.stack(ergo)}
+
+
+def _outputs(name: str, model, X: np.ndarray) -> np.ndarray:
+    """What the pipeline uses from a model, as an array (raises on anything malformed)."""
+    width = getattr(model, "n_features_in_", INPUT_WIDTH[name])
+    if width != INPUT_WIDTH[name]:
+        raise ValueError(f"expects {width} features, pipeline provides {INPUT_WIDTH[name]}")
+    if name == "anomaly":
+        pred = np.asarray(model.predict(X))
+        if not np.isin(pred, (-1, 1)).all():
+            raise ValueError("predict() must return -1/1")
+        out = np.asarray(model.score_samples(X), dtype=np.float64)
+    elif name == "ergo":
+        out = np.asarray(model.predict(X), dtype=np.float64)
+    else:
+        classes = [str(c).lower() for c in getattr(model, "classes_", [])]
+        # classifier.py maps integer classes to LABELS by index; fatigue classes index FATIGUE_LABELS
+        n_known = len(LABELS) if name == "activity" else len(FATIGUE_LABELS)
+        known = [str(i) for i in range(n_known)] + (LABELS if name == "activity" else [])
+        unknown = [c for c in classes if c not in known]
+        if unknown:
+            raise ValueError(f"unknown classes {unknown}")
+        out = np.asarray(model.predict_proba(X), dtype=np.float64)
+        if out.shape != (len(X), len(classes)):
+            raise ValueError(f"predict_proba shape {out.shape}, expected {(len(X), len(classes))}")
+    if out.shape[0] != len(X) or not np.isfinite(out).all():
+        raise ValueError("non-finite or missing outputs on the canary batch")
+    return out
+
+
+def _agreement(name: str, old: np.ndarray, new: np.ndarray) -> str:
+    if name in ("activity", "fatigue"):
+        if old.shape != new.shape:
+            return "classes changed"
+        return f"{np.mean(old.argmax(axis=1) == new.argmax(axis=1)):.0%} same class"
+    return f"mean |Δ| {np.mean(np.abs(old - new)):.3g}"
+
+
+class ModelRegistry:
+    """Shared models for all pipelines; see module docstring."""
+
+    def __init__(self):
+        self.current = ModelSet()
+        self.paths: Dict[str, Path] = {}
+        self._stat: Dict[str, Optional[tuple]] = {}
+        self._pending: Dict[str, Optional[tuple]] = {}
+        self._hash: Dict[str, str] = {}
+        self._rejected: Dict[str, str] = {}
+        self._canary: Optional[Dict[str, np.ndarray]] = None
+
+    def _canary_batch(self) -> Dict[str, np.ndarray]:
+        if self._canary is None:
+            self._canary = canary_batch()
+        return self._canary
+
+    def _try_load(self, name: str, path: Path):
+        """Load and validate; returns (model, canary outputs) or raises."""
+        model = _load_file(path)
+        return model, _outputs(name, model, self._canary_batch()[name])
+
+    def load(self, paths: Dict[str, Optional[Path]]) -> ModelSet:
+        """Initial load (blocking; the gateway runs it in a worker thread). Invalid models fall back to rules."""
+        self.paths = {name: Path(p) for name, p in paths.items() if p}
+        loaded = {}
+        for name, path in self.paths.items():
+            self._stat[name] = _stat(path)
+            if self._stat[name] is None:
+                log.info("No %s model at %s — using rule-based fallback", name, path)
+                continue
+            try:
+                digest = _sha256(path)
+            except OSError as e:
+                self._stat[name] = None  # let the watcher retry once the file is readable
+                log.warning("Cannot read %s model at %s: %s — using rule-based fallback", name, path, e)
+                continue
+            self._hash[name] = digest
+            try:
+                loaded[name], _ = self._try_load(name, path)
+                log.info("Loaded %s model from %s", name, path)
+            except Exception as e:
+                self._rejected[name] = digest
+                log.warning("Failed to load %s model from %s: %s — using rule-based fallback", name, path, e)
+        self.current = ModelSet(**loaded, generation=1)
+        metrics.model_generation.set(1)
+        return self.current
+
+    def changed(self) -> list[str]:
+        """Models whose file changed and has been stable for one poll."""
+        ready = []
+        for name, path in self.paths.items():
+            st = _stat(path)
+            if st == self._stat.get(name):
+                self._pending.pop(name, None)
+                continue
+            if st is not None and self._pending.get(name) == st:
+                ready.append(name)
+            self._pending[name] = st
+        return ready
+
+    def reload(self, names: list[str]) -> Optional[ModelSet]:
+        """Load, validate and publish changed models (blocking; runs in a worker thread)."""
+        updates = {}
+        for name in names:
+            path = self.paths[name]
+            st = self._pending.pop(name, None)
+            try:
+                digest = _sha256(path)
+            except OSError as e:
+                log.warning("Cannot read %s model %s: %s", name, path, e)
+                continue
+            self._stat[name] = st
+            if digest == self._hash.get(name) or digest == self._rejected.get(name):
+                metrics.model_reloads.inc(name, "unchanged")
+                continue
+            try:
+                model, outputs = self._try_load(name, path)
+            except Exception as e:
+                self._rejected[name] = digest
+                metrics.model_reloads.inc(name, "rejected")
+                log.warning("Rejected new %s model %s (keeping the running one): %s", name, path, e)
+                continue
+            running = getattr(self.current, name)
+            note = "no previous model"
+            if running is not None:
+                try:
+                    note = _agreement(name, _outputs(name, running, self._canary_batch()[name]), outputs)
+                except Exception:
+                    note = "previous model failed the canary"
+            updates[name] = model
+            self._hash[name] = digest
+            metrics.model_reloads.inc(name, "swapped")
+            log.info("Reloaded %s model from %s (canary: %s)", name, path, note)
+        if not updates:
+            return None
+        # Publish: one reference assignment; pipelines pick it up at their next window
+        self.current = self.current._replace(**updates, generation=self.current.generation + 1)
+        metrics.model_generation.set(self.current.generation)
+        return self.current
+
+    async def watch(self, interval: float = MODEL_WATCH_SEC) -> None:
+        """Background task: poll model files and hot-swap retrained ones."""
+        if interval <= 0 or not self.paths:
+            return
+        log.info("Watching %d model file(s) every %.0fs for hot reload", len(self.paths), interval)
+        while True:
+            await asyncio.sleep(interval)
+            names = self.changed()
+            if names:
+                try:
+                    await asyncio.to_thread(self.reload, names)
+                except Exception as e:
+                    log.error("Model reload failed: %s", e)
+
+
+# Singleton instance
+models = ModelRegistry()
@@ -2,18 +2,18 @@
 Industrial Wearable AI — Processing Pipeline
 Low-pass filter + feature extraction. process_window returns 30-dim feature vector.
 """
-from typing import List, Optional
+from typing import List, Union
 
 import numpy as np
 
-from .feature_extractor import extract_features
+from .feature_extractor import AXES, FEATURE_DIM, extract_features_array
 
 # Low-pass: exponential moving average alpha
 DEFAULT_ALPHA = 0.3
 
 
 def _lowpass_filter(arr: np.ndarray, alpha: float = DEFAULT_ALPHA) -> np.ndarray:
-    """Exponential moving average on 1D array."""
+    """Exponential moving average along axis 0 (1D signal or (n, axes) block)."""
     out = np.empty_like(arr)
     out[0] = arr[0]
     for i in range(1, len(arr)):
@@ -22,33 +22,21 @@ def _lowpass_filter(arr: np.ndarray, alpha: float = DEFAULT_ALPHA) -> np.ndarray
 
 
 def process_window(
-    samples: List[dict],
+    samples: Union[List[dict], np.ndarray],
     alpha: float = DEFAULT_ALPHA,
 ) -> np.ndarray:
     """
     Apply low-pass filter to each axis, then extract features.
+    Accepts a list of sample dicts or a (n, 6) array in ax..gz order (SampleBuffer.get_array).
     Returns 30-dim feature vector.
     """
-    if not samples:
-        return np.zeros(30, dtype=np.float32)
-
-    axes = ["ax", "ay", "az", "gx", "gy", "gz"]
-    filtered = []
-    for s in samples:
-        row = {}
-        for axis in axes:
-            arr = np.array([x.get(axis, 0) for x in samples], dtype=np.float64)
-            row[axis] = _lowpass_filter(arr, alpha)[-1]  # Use last filtered value per sample
-        filtered.append(row)
-
-    # Actually: we need to filter the whole sequence per axis, then build filtered samples
-    filtered_samples = []
-    for i in range(len(samples)):
-        row = {}
-        for axis in axes:
-            arr = np.array([s.get(axis, 0) for s in samples], dtype=np.float64)
-            filt = _lowpass_filter(arr, alpha)
-            row[axis] = filt[i]
-        filtered_samples.append(row)
-
-    return extract_features(filtered_samples)
+    if len(samples) == 0:
+        return np.zeros(FEATURE_DIM, dtype=np.float32)
+
+    if isinstance(samples, np.ndarray):
+        window = samples.astype(np.float64, copy=False)
+    else:
+        window = np.array([[s.get(axis, 0) for axis in AXES] for s in samples], dtype=np.float64)
+
+    # Filter every axis over the whole window in one pass
+    return extract_features_array(_lowpass_filter(window, alpha))
@@ -0,0 +1,74 @@
+"""
+Industrial Wearable AI — Remote Threshold Sync
+Polls GET /api/config/edge with If-None-Match and applies classifier/risk/anomaly
+thresholds in place. An unchanged config costs one 304 per poll.
+Each new config replaces the effective thresholds entirely (startup defaults + backend
+values), so an override removed on the backend reverts to its default on the edge.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+
+import aiohttp
+
+from .anomaly_detector import ANOMALY_THRESHOLDS
+from .api_client import API_HEADERS, BACKEND_URL
+from .classifier import RULE_THRESHOLDS
+from .risk_detector import RISK_THRESHOLDS
+
+log = logging.getLogger(__name__)
+
+CONFIG_POLL_SEC = float(os.getenv("CONFIG_POLL_SEC", "60"))
+
+_TABLES = (RULE_THRESHOLDS, RISK_THRESHOLDS, ANOMALY_THRESHOLDS)
+_DEFAULTS = tuple(dict(table) for table in _TABLES)  # values before any backend config
+
+
+def apply_edge_config(values: Dict[str, str]) -> int:
+    """
+    Set every threshold to its default, overridden by the backend values; unknown or
+    malformed keys are ignored. Returns the number of overrides applied.
+    """
+    applied = 0
+    for table, defaults in zip(_TABLES, _DEFAULTS):
+        effective = dict(defaults)
+        for key in defaults.keys() & values.keys():
+            try:
+                effective[key] = float(values[key])
+                applied += 1
+            except (TypeError, ValueError):
+                log.warning("Ignoring invalid edge config %s=%r", key, values[key])
+        table.update(effective)  # same key set: every entry is replaced, no reader sees a missing key
+    return applied
+
+
+async def fetch_edge_config(session: aiohttp.ClientSession, etag: Optional[str]) -> tuple:
+    """
+    Conditional GET of edge thresholds.
+    Returns (etag, values) on 200, (etag, None) on 304 or error.
+    """
+    url = f"{BACKEND_URL.rstrip('/')}/api/config/edge"
+    headers = dict(API_HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            if resp.status == 200:
+                body = await resp.json()
+                return resp.headers.get("ETag"), body.get("values", {})
+    except Exception:
+        pass
+    return etag, None
+
+
+async def start_config_sync_loop():
+    """Background task: keep thresholds in sync with the backend."""
+    etag: Optional[str] = None
+    async with aiohttp.ClientSession() as session:
+        while True:
+            etag, values = await fetch_edge_config(session, etag)
+            if values is not None:
+                applied = apply_edge_config(values)
+                log.info("Applied %d edge thresholds from backend (etag %s)", applied, etag)
+            await asyncio.sleep(CONFIG_POLL_SEC)
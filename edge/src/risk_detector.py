@@ -10,10 +10,29 @@ from typing import Optional
 
 import numpy as np
 
+from .edge_model import is_edge_model, load_edge_model
+
 logger = logging.getLogger(__name__)
 
 FATIGUE_LABELS = ["normal", "mild", "high"]
 
+HISTORY = 200           # ~10 min of labels at 3 s intervals
+RULE_IDLE_WINDOW = 60   # ~3 min, used by the rule-based fallback
+ACTIVE_LABELS = ("sewing", "adjusting")
+IDLE_LABELS = ("idle", "break")
+ZCR_INDICES = [4, 9, 14, 19, 24, 29]
+
+# Rule/level thresholds. Keys match backend SystemConfig; remote_config overrides them.
+RISK_THRESHOLDS = {
+    "risk_fatigue_high_work_min": 90.0,
+    "risk_fatigue_mild_work_min": 45.0,
+    "risk_fatigue_idle_ratio": 0.6,
+    "risk_ergo_static_var": 0.05,
+    "risk_ergo_motion_var": 1.5,
+    "risk_ergo_medium_score": 30.0,
+    "risk_ergo_high_score": 60.0,
+}
+
 
 class RiskDetector:
     """Detects fatigue and ergonomic risk from sensor features."""
@@ -22,43 +41,121 @@ class RiskDetector:
         self,
         fatigue_model_path: Optional[Path] = None,
         ergo_model_path: Optional[Path] = None,
+        fatigue_model: Optional[object] = None,
+        ergo_model: Optional[object] = None,
     ):
-        self.fatigue_model = self._load(fatigue_model_path, "fatigue")
-        self.ergo_model = self._load(ergo_model_path, "ergo")
-
-        # Rolling state for fatigue detection
-        self._recent_labels: list[str] = []
+        # Already-loaded models (the gateway loads them once and shares them across workers) skip the path
+        self.fatigue_model = fatigue_model if fatigue_model is not None else self._load(fatigue_model_path, "fatigue")
+        self.ergo_model = ergo_model if ergo_model is not None else self._load(ergo_model_path, "ergo")
+
+        # Rolling state for fatigue detection: fixed ring of the last HISTORY labels with
+        # running counters, so each window costs O(1) regardless of history length.
+        self._ring: list[str] = [""] * HISTORY
+        self._ring_temp: list[Optional[float]] = [None] * HISTORY
+        self._ring_zcr: list[float] = [0.0] * HISTORY
+        self._total = 0          # labels ever seen; ring slot of label i is i % HISTORY
+        self._mid = 0            # absolute index splitting the history into early/late halves
+        self._early_active = 0
+        self._late_active = 0
+        self._early_zcr = 0.0
+        self._late_zcr = 0.0
+        self._active = 0
+        self._idle = 0
+        self._idle_recent = 0    # idle/break among the last RULE_IDLE_WINDOW labels
+        self._transitions = 0
         self._continuous_work_minutes = 0.0
         self._last_activity = "idle"
-        self._motion_history: list[float] = []
 
     @staticmethod
     def _load(path: Optional[Path], name: str):
-        if not path or not path.exists():
+        if not path:
+            return None
+        if not path.exists():
             logger.info("No %s model at %s — using rule-based fallback", name, path)
             return None
         try:
-            import joblib
-            model = joblib.load(path)
+            if is_edge_model(path):
+                model = load_edge_model(path)
+            else:
+                import joblib
+                model = joblib.load(path)
             logger.info("Loaded %s model from %s", name, path)
             return model
         except Exception as e:
             logger.warning("Failed to load %s model: %s", name, e)
             return None
 
-    def update_rolling_state(self, label: str, interval_sec: float = 3.0):
-        """Update rolling state with the latest classification result."""
-        self._recent_labels.append(label)
-        if len(self._recent_labels) > 200:  # ~10 min at 3s intervals
-            self._recent_labels = self._recent_labels[-200:]
-
-        if label in ("sewing", "adjusting"):
+    def update_rolling_state(
+        self,
+        label: str,
+        interval_sec: float = 3.0,
+        features: Optional[np.ndarray] = None,
+        temp: Optional[float] = None,
+    ):
+        """Update rolling state with the latest classification result (and, when known, its window's features and temperature)."""
+        ring = self._ring
+        i = self._total
+        slot = i % HISTORY
+        if i >= HISTORY:
+            self._evict(i - HISTORY)
+        start = max(0, i + 1 - HISTORY)
+
+        zcr = 0.0
+        if features is not None and len(features) >= 30:
+            zcr = float(np.mean(features[ZCR_INDICES]))
+        if i > start and label != ring[(i - 1) % HISTORY]:
+            self._transitions += 1
+        ring[slot] = label
+        self._ring_temp[slot] = temp
+        self._ring_zcr[slot] = zcr
+        self._total = i + 1
+        active = label in ACTIVE_LABELS
+        idle = label in IDLE_LABELS
+        self._active += active
+        self._idle += idle
+        self._late_active += active
+        self._late_zcr += zcr
+        self._idle_recent += idle
+        if i - RULE_IDLE_WINDOW >= 0:
+            self._idle_recent -= ring[(i - RULE_IDLE_WINDOW) % HISTORY] in IDLE_LABELS
+
+        # Advance the half split to start + max(1, n // 2); it only ever moves forward
+        target = start + max(1, (self._total - start) // 2)
+        while self._mid < target:
+            moved = self._mid % HISTORY
+            moved_active = ring[moved] in ACTIVE_LABELS
+            self._late_active -= moved_active
+            self._early_active += moved_active
+            self._late_zcr -= self._ring_zcr[moved]
+            self._early_zcr += self._ring_zcr[moved]
+            self._mid += 1
+
+        if active:
             self._continuous_work_minutes += interval_sec / 60.0
-        elif label in ("break", "idle"):
+        elif idle:
             self._continuous_work_minutes = max(0, self._continuous_work_minutes - 0.5)
 
         self._last_activity = label
 
+    def _evict(self, oldest: int) -> None:
+        """Drop the label at absolute index `oldest` (always in the early half) before its slot is reused."""
+        ring = self._ring
+        slot = oldest % HISTORY
+        label = ring[slot]
+        active = label in ACTIVE_LABELS
+        self._active -= active
+        self._idle -= label in IDLE_LABELS
+        self._early_active -= active
+        self._early_zcr -= self._ring_zcr[slot]
+        if label != ring[(oldest + 1) % HISTORY]:
+            self._transitions -= 1
+
+    @property
+    def _recent_labels(self) -> list[str]:
+        """Labels in the rolling history, oldest first (diagnostics; not used on the hot path)."""
+        start = max(0, self._total - HISTORY)
+        return [self._ring[i % HISTORY] for i in range(start, self._total)]
+
     def detect_fatigue(self, features: np.ndarray) -> tuple[str, float]:
         """
         Detect fatigue risk.
@@ -91,7 +188,8 @@ class RiskDetector:
             try:
                 score = float(self.ergo_model.predict(ergo_features.reshape(1, -1))[0])
                 score = max(0.0, min(100.0, score))
-                level = "low" if score <= 30 else "medium" if score <= 60 else "high"
+                t = RISK_THRESHOLDS
+                level = "low" if score <= t["risk_ergo_medium_score"] else "medium" if score <= t["risk_ergo_high_score"] else "high"
                 return level, score
             except Exception:
                 pass
@@ -101,24 +199,33 @@ class RiskDetector:
 
     def _build_fatigue_features(self, features: np.ndarray) -> np.ndarray:
         """Build 8-dim fatigue feature vector from rolling state + current features."""
-        labels = self._recent_labels
-        n = len(labels) if labels else 1
+        start = max(0, self._total - HISTORY)
+        n = (self._total - start) or 1
 
         # Motion decay: compare recent vs earlier activity levels
         mid = max(1, n // 2)
-        early_active = sum(1 for l in labels[:mid] if l in ("sewing", "adjusting")) / max(mid, 1)
-        late_active = sum(1 for l in labels[mid:] if l in ("sewing", "adjusting")) / max(n - mid, 1)
+        early_active = self._early_active / max(mid, 1)
+        late_active = self._late_active / max(n - mid, 1)
         motion_decay = late_active / max(early_active, 0.01)
 
         # State transitions
-        transitions = sum(1 for i in range(1, n) if labels[i] != labels[i - 1])
-        repetition_count = transitions
+        repetition_count = self._transitions
 
         # Ratios
-        idle_count = sum(1 for l in labels if l in ("idle", "break"))
-        idle_ratio = idle_count / max(n, 1)
-        active_count = sum(1 for l in labels if l in ("sewing", "adjusting"))
-        active_ratio = active_count / max(n, 1)
+        idle_ratio = self._idle / max(n, 1)
+        active_ratio = self._active / max(n, 1)
+
+        # Temperature change across the history (oldest and newest windows that reported one)
+        temp_delta = 0.0
+        if self._total:
+            oldest, newest = self._ring_temp[start % HISTORY], self._ring_temp[(self._total - 1) % HISTORY]
+            if oldest is not None and newest is not None:
+                temp_delta = newest - oldest
+
+        # ZCR trend: late-half mean minus early-half mean (rising = shakier movement)
+        zcr_trend = 0.0
+        if self._total - start >= 2:
+            zcr_trend = self._late_zcr / (n - mid) - self._early_zcr / mid
 
         # Features from current window
         std_indices = [1, 6, 11, 16, 21, 26]
@@ -130,9 +237,9 @@ class RiskDetector:
             idle_ratio,
             active_ratio,
             avg_accel_std,
-            0.0,  # temp_delta (needs temperature history, placeholder)
+            temp_delta,
             self._continuous_work_minutes,
-            0.0,  # zcr_trend (placeholder)
+            zcr_trend,
         ], dtype=np.float32)
 
     def _build_ergo_features(self, features: np.ndarray) -> np.ndarray:
@@ -177,15 +284,16 @@ class RiskDetector:
 
     def _rule_based_fatigue(self) -> tuple[str, float]:
         """Rule-based fatigue detection fallback."""
-        if self._continuous_work_minutes > 90:
+        t = RISK_THRESHOLDS
+        if self._continuous_work_minutes > t["risk_fatigue_high_work_min"]:
             return "high", 0.85
-        if self._continuous_work_minutes > 45:
+        if self._continuous_work_minutes > t["risk_fatigue_mild_work_min"]:
             return "mild", 0.65
 
-        labels = self._recent_labels[-60:]  # Last ~3 minutes
-        if labels:
-            idle_ratio = sum(1 for l in labels if l in ("idle", "break")) / len(labels)
-            if idle_ratio > 0.6:
+        recent = min(self._total, RULE_IDLE_WINDOW)  # Last ~3 minutes
+        if recent:
+            idle_ratio = self._idle_recent / recent
+            if idle_ratio > t["risk_fatigue_idle_ratio"]:
                 return "mild", 0.55
 
         return "normal", 0.90
@@ -199,9 +307,10 @@ class RiskDetector:
         stds = [float(features[i]) for i in std_indices if i < len(features)]
         var_sum = sum(stds)
 
-        if var_sum < 0.05:  # Very static — prolonged posture risk
+        t = RISK_THRESHOLDS
+        if var_sum < t["risk_ergo_static_var"]:  # Very static — prolonged posture risk
             return "medium", 45.0
-        if var_sum > 1.5:  # Very high motion — repetitive strain
+        if var_sum > t["risk_ergo_motion_var"]:  # Very high motion — repetitive strain
             return "medium", 50.0
 
         return "low", 15.0
@@ -0,0 +1,148 @@
+"""
+Industrial Wearable AI — Raw Window Snapshots (Active Learning)
+Keeps the raw IMU window behind low-confidence predictions and uploads it, so events a
+human labels in the review queue can be retrained on the exact samples the edge saw
+(ml/scripts/retrain_with_labels.py) instead of a timestamp join against raw CSVs.
+
+Sampling: windows of events with confidence < SNAPSHOT_CONFIDENCE pass a token bucket
+of SNAPSHOT_RATE_PER_MIN per gateway (all workers together, 10 s of burst). Each kept
+window costs 908 bytes (75×6 float16 + seq), so upload bandwidth is bounded by
+rate × 908 B/min whatever the fleet size or confidence distribution; 0 disables.
+
+Upload: every SNAPSHOT_UPLOAD_SEC, one POST /api/snapshots?worker_id=... per worker
+with a binary body (little-endian):
+
+    "IWS1" | uint32 count | uint16 rows | uint16 cols
+    count × int64 seq
+    count × rows × cols float16 (row-major, AXES order)
+
+The backend resolves (worker, gateway, seq) to the event id. Snapshots whose event
+hasn't arrived yet (still batched or in the offline buffer) are returned as pending
+and retried; at most SNAPSHOT_MAX_PENDING are held in memory (oldest dropped), and
+they are not persisted across restarts: this is best-effort training data.
+"""
+import asyncio
+import logging
+import os
+import struct
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple
+
+import numpy as np
+
+from .metrics import metrics
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_CONFIDENCE = float(os.getenv("SNAPSHOT_CONFIDENCE", "0.7"))  # backend review queue threshold
+SNAPSHOT_RATE_PER_MIN = float(os.getenv("SNAPSHOT_RATE_PER_MIN", "6"))
+SNAPSHOT_UPLOAD_SEC = float(os.getenv("SNAPSHOT_UPLOAD_SEC", "30"))
+SNAPSHOT_MAX_PENDING = int(os.getenv("SNAPSHOT_MAX_PENDING", "1000"))
+SNAPSHOT_MAX_ATTEMPTS = 10
+SNAPSHOT_MAX_PER_POST = 500
+
+MAGIC = b"IWS1"
+_HEADER = struct.Struct("<4sIHH")
+
+
+class Snapshot(NamedTuple):
+    worker_id: str
+    seq: int
+    window: np.ndarray  # (rows, 6) float16
+    attempts: int = 0
+
+
+def encode_snapshots(seqs: List[int], windows: List[np.ndarray]) -> bytes:
+    """Wire format above; all windows must have the same shape."""
+    rows, cols = windows[0].shape
+    return b"".join((
+        _HEADER.pack(MAGIC, len(seqs), rows, cols),
+        np.asarray(seqs, dtype="<i8").tobytes(),
+        np.stack(windows).astype("<f2").tobytes(),
+    ))
+
+
+class SnapshotUploader:
+    def __init__(
+        self,
+        rate_per_min: float = SNAPSHOT_RATE_PER_MIN,
+        confidence: float = SNAPSHOT_CONFIDENCE,
+        max_pending: int = SNAPSHOT_MAX_PENDING,
+    ):
+        self.rate = rate_per_min / 60.0
+        self.capacity = max(1.0, rate_per_min / 6)
+        self.confidence = confidence
+        self._tokens = self.capacity
+        self._refilled = time.monotonic()
+        self.pending: Deque[Snapshot] = deque(maxlen=max_pending)
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _queue(self, snapshot: Snapshot) -> None:
+        if len(self.pending) == self.pending.maxlen:
+            metrics.snapshots.inc("dropped")
+        self.pending.append(snapshot)
+
+    def offer(self, worker_id: str, seq: int, confidence: float, window: np.ndarray) -> bool:
+        """Called per classified window; keeps it if low-confidence and within the rate."""
+        if self.rate <= 0 or confidence >= self.confidence:
+            return False
+        if not self._take_token():
+            metrics.snapshots.inc("rate_limited")
+            return False
+        self._queue(Snapshot(worker_id, seq, window.astype(np.float16)))
+        metrics.snapshots.inc("queued")
+        return True
+
+    def _retry(self, snapshots: List[Snapshot]) -> None:
+        for s in snapshots:
+            if s.attempts + 1 >= SNAPSHOT_MAX_ATTEMPTS:
+                metrics.snapshots.inc("dropped")
+            else:
+                self._queue(s._replace(attempts=s.attempts + 1))
+
+    async def _upload(self, session) -> None:
+        from .api_client import post_snapshots
+
+        by_worker: Dict[str, List[Snapshot]] = {}
+        while self.pending:
+            s = self.pending.popleft()
+            by_worker.setdefault(s.worker_id, []).append(s)
+        for worker_id, items in by_worker.items():
+            for i in range(0, len(items), SNAPSHOT_MAX_PER_POST):
+                chunk = items[i : i + SNAPSHOT_MAX_PER_POST]
+                body = encode_snapshots([s.seq for s in chunk], [s.window for s in chunk])
+                result = await post_snapshots(session, worker_id, body)
+                if result is None:
+                    self._retry(chunk)
+                    continue
+                waiting = set(result.get("pending", []))
+                metrics.snapshots.inc("uploaded", amount=len(chunk) - len(waiting))
+                self._retry([s for s in chunk if s.seq in waiting])
+
+    async def run(self) -> None:
+        """Background task: upload queued snapshots every SNAPSHOT_UPLOAD_SEC."""
+        if self.rate <= 0:
+            return
+        import aiohttp
+
+        async with aiohttp.ClientSession() as session:
+            while True:
+                await asyncio.sleep(SNAPSHOT_UPLOAD_SEC)
+                if self.pending:
+                    try:
+                        await self._upload(session)
+                    except Exception as e:
+                        log.warning("Snapshot upload failed: %s", e)
+
+
+# Singleton instance
+snapshots = SnapshotUploader()
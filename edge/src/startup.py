@@ -0,0 +1,67 @@
+"""
+Industrial Wearable AI — Edge Startup Profile
+Time from process start to the first classified event, by phase, so a gateway restart
+(watchdog reset, deploy) can be checked at a glance. Times are seconds since the
+process started (from /proc/self/stat on Linux, else since this module was imported):
+
+    imports       edge.src.main and its eager imports loaded
+    loop          event loop running, warm-up started
+    services      aiohttp, health server and remote config imported (warm-up thread)
+    models        activity/fatigue/ergo/anomaly models loaded (warm-up thread, in
+                  parallel with BLE scan/connect and the first window filling)
+    first_sample  first IMU sample from any worker
+    first_window  first full window in a buffer
+    first_event   first window classified and queued for the backend
+
+Logged once as one line when first_event is reached, exposed as
+edge_startup_seconds{phase} and under "startup" in GET /status.
+For import-level detail run benchmarks/edge_startup.py (-X importtime summary).
+"""
+import logging
+import os
+import time
+from typing import Dict
+
+from .metrics import metrics
+
+log = logging.getLogger(__name__)
+
+
+def _process_age() -> float:
+    """Seconds since this process was started (0 when /proc is unavailable)."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupProfile:
+    """First time each phase is reached; marks after the first are ignored."""
+
+    def __init__(self):
+        self.origin = time.monotonic() - _process_age()
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        if phase in self.phases:
+            return
+        elapsed = round(time.monotonic() - self.origin, 3)
+        self.phases[phase] = elapsed
+        metrics.startup_seconds.set(elapsed, phase)
+        if phase == "first_event":
+            log.info("Startup: %s", self.summary())
+
+    def summary(self) -> str:
+        p = self.phases
+        text = ", ".join(f"{name.replace('_', ' ')} {sec:.2f}s" for name, sec in sorted(p.items(), key=lambda kv: kv[1]))
+        if "first_event" in p and "first_window" in p:
+            text += f" (event {p['first_event'] - p['first_window']:.2f}s after the window filled)"
+        return text
+
+
+# Singleton instance
+startup = StartupProfile()
@@ -1,6 +1,7 @@
 /*
  * Industrial Wearable AI — ESP32 Firmware (Arduino IDE)
- * Reads MPU6050 (IMU); sends JSON over BLE GATT notify.
+ * Reads MPU6050 (IMU); sends packed sample frames (5 samples / notify) over BLE GATT notify.
+ * Frame layout matches firmware/src/frame.h and edge/src/ble_protocol.py; status stays JSON.
  * Libraries: Install via Sketch > Include Library > Manage Libraries:
  *   - Adafruit MPU6050
  *   - Adafruit Unified Sensor
@@ -26,6 +27,25 @@
 #define BLE_DEVICE_NAME "WearableAI"
 #define BLE_SERVICE_UUID        "0000fff0-0000-1000-8000-00805f9b34fb"
 #define BLE_CHARACTERISTIC_UUID "0000fff1-0000-1000-8000-00805f9b34fb"
+#define BLE_PREFERRED_MTU  185   // Frames are 82 bytes; the default MTU only carries 20
+#define SAMPLES_PER_FRAME  5
+
+// ----- Packed sample frame (same layout as firmware/src/frame.h) -----
+#define FRAME_MAGIC 0xA7
+#define FRAME_VERSION 1
+#define FRAME_FLAG_MPU_CONNECTED 0x01
+
+struct __attribute__((packed)) FrameHeader {
+  uint8_t magic, version, count, flags;
+  uint16_t counter;   // sample counter of the first sample (wraps)
+  uint32_t t0_ms;     // millis() of the first sample
+  int16_t temp_c100;  // degC x 100
+};
+struct __attribute__((packed)) FrameSample {
+  uint16_t dt_ms;           // offset from t0_ms
+  int16_t ax, ay, az;       // m/s^2 x 1000
+  int16_t gx, gy, gz;       // deg/s x 100
+};
 
 Adafruit_MPU6050 mpu;
 NimBLEServer* pServer = NULL;
@@ -37,6 +57,19 @@ const unsigned long imuIntervalMs = 1000UL / IMU_RATE_HZ;
 const unsigned long statusIntervalMs = 2000UL;  // When no MPU, send status every 2 s
 bool imuOk = false;
 
+uint8_t frameBuf[sizeof(FrameHeader) + SAMPLES_PER_FRAME * sizeof(FrameSample)];
+FrameHeader* frameHeader = (FrameHeader*)frameBuf;
+FrameSample* frameSamples = (FrameSample*)(frameBuf + sizeof(FrameHeader));
+uint8_t frameCount = 0;
+uint16_t sampleCounter = 0;
+
+int16_t frameScale(float value, float scale) {
+  float v = roundf(value * scale);
+  if (v > 32767.0f) return 32767;
+  if (v < -32767.0f) return -32767;
+  return (int16_t)v;
+}
+
 void sendStatus(bool mpuConnected) {
   StaticJsonDocument<128> doc;
   doc["worker_id"] = WORKER_ID;
@@ -51,21 +84,31 @@ void sendStatus(bool mpuConnected) {
 }
 
 void sendSample(float ax, float ay, float az, float gx, float gy, float gz, float temp) {
-  StaticJsonDocument<256> doc;
-  doc["worker_id"] = WORKER_ID;
-  doc["ts"] = millis();
-  doc["ax"] = round(ax * 100.0f) / 100.0f;
-  doc["ay"] = round(ay * 100.0f) / 100.0f;
-  doc["az"] = round(az * 100.0f) / 100.0f;
-  doc["gx"] = round(gx * 10.0f) / 10.0f;
-  doc["gy"] = round(gy * 10.0f) / 10.0f;
-  doc["gz"] = round(gz * 10.0f) / 10.0f;
-  doc["temp"] = round(temp * 10.0f) / 10.0f;
-
-  char buf[256];
-  size_t len = serializeJson(doc, buf);
-  if (len > 0 && pNotifyChar != NULL && pServer->getConnectedCount() > 0) {
-    pNotifyChar->setValue((uint8_t*)buf, len);
+  unsigned long now = millis();
+  if (frameCount == 0) {
+    frameHeader->counter = sampleCounter;
+    frameHeader->t0_ms = (uint32_t)now;
+  }
+  FrameSample& s = frameSamples[frameCount++];
+  s.dt_ms = (uint16_t)(now - frameHeader->t0_ms);
+  s.ax = frameScale(ax, 1000.0f);
+  s.ay = frameScale(ay, 1000.0f);
+  s.az = frameScale(az, 1000.0f);
+  s.gx = frameScale(gx, 100.0f);
+  s.gy = frameScale(gy, 100.0f);
+  s.gz = frameScale(gz, 100.0f);
+  frameHeader->temp_c100 = frameScale(temp, 100.0f);
+  sampleCounter++;
+  if (frameCount < SAMPLES_PER_FRAME) return;
+
+  frameHeader->magic = FRAME_MAGIC;
+  frameHeader->version = FRAME_VERSION;
+  frameHeader->count = frameCount;
+  frameHeader->flags = FRAME_FLAG_MPU_CONNECTED;
+  size_t len = sizeof(FrameHeader) + frameCount * sizeof(FrameSample);
+  frameCount = 0;
+  if (pNotifyChar != NULL && pServer->getConnectedCount() > 0) {
+    pNotifyChar->setValue(frameBuf, len);
     pNotifyChar->notify();
   }
 }
@@ -99,6 +142,7 @@ void setup() {
   Serial.println("[Wearable AI] Temp: placeholder 25 C");
 
   NimBLEDevice::init(BLE_DEVICE_NAME);
+  NimBLEDevice::setMTU(BLE_PREFERRED_MTU);
   Serial.print("[Wearable AI] BLE address: ");
   Serial.println(NimBLEDevice::getAddress().toString().c_str());
   pServer = NimBLEDevice::createServer();
@@ -16,3 +16,8 @@
 #define SENSOR_CHAR_UUID "00002A5D-0000-1000-8000-00805F9B34FB" // Sensor Location (used for custom payload)
 #define BATTERY_CHAR_UUID "00002A19-0000-1000-8000-00805F9B34FB" // Battery Level
 #define INFO_CHAR_UUID "00002A24-0000-1000-8000-00805F9B34FB" // Model Number String
+
+// Samples batched into one BLE notification (see frame.h).
+// 5 samples at 25 Hz = one 82-byte notify every 200 ms; needs an ATT MTU of at least 85.
+#define SAMPLES_PER_FRAME 5
+#define BLE_PREFERRED_MTU 185
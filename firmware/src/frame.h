@@ -0,0 +1,41 @@
+#pragma once
+#include <Arduino.h>
+
+// Packed multi-sample BLE frame (edge decoder: edge/src/ble_protocol.py).
+// Little-endian, like the ESP32 itself. A frame is one FrameHeader followed by
+// `count` FrameSample records; 5 samples = 12 + 5 * 14 = 82 bytes.
+
+#define FRAME_MAGIC 0xA7
+#define FRAME_VERSION 1
+#define FRAME_FLAG_MPU_CONNECTED 0x01
+
+#define FRAME_ACCEL_SCALE 1000.0f // m/s^2 -> milli-m/s^2 (±32.7 m/s^2, covers the ±2 g range)
+#define FRAME_GYRO_SCALE 100.0f   // deg/s -> centi-deg/s (±327 deg/s, covers the ±250 deg/s range)
+#define FRAME_TEMP_SCALE 100.0f   // degC -> centi-degC
+
+struct __attribute__((packed)) FrameHeader {
+    uint8_t magic;
+    uint8_t version;
+    uint8_t count;
+    uint8_t flags;
+    uint16_t counter;  // sample counter of the first sample (wraps)
+    uint32_t t0_ms;    // millis() of the first sample
+    int16_t temp_c100;
+};
+
+struct __attribute__((packed)) FrameSample {
+    uint16_t dt_ms;    // offset from t0_ms
+    int16_t ax, ay, az;
+    int16_t gx, gy, gz;
+};
+
+static_assert(sizeof(FrameHeader) == 12, "FrameHeader must be 12 bytes");
+static_assert(sizeof(FrameSample) == 14, "FrameSample must be 14 bytes");
+
+// Scale, round and clamp to int16 (same as the edge-side encoder)
+inline int16_t frameScale(float value, float scale) {
+    float v = roundf(value * scale);
+    if (v > 32767.0f) return 32767;
+    if (v < -32767.0f) return -32767;
+    return (int16_t)v;
+}
@@ -4,6 +4,7 @@
 #include "config.h"
 #include "sensors.h"
 #include "battery.h"
+#include "frame.h"
 
 NimBLEServer* pServer = nullptr;
 NimBLECharacteristic* pSensorChar = nullptr;
@@ -14,6 +15,48 @@ bool deviceConnected = false;
 unsigned long lastSampleTime = 0;
 unsigned long lastBatteryTime = 0;
 
+// Frame being filled; sent once SAMPLES_PER_FRAME samples are in
+uint8_t frameBuf[sizeof(FrameHeader) + SAMPLES_PER_FRAME * sizeof(FrameSample)];
+FrameHeader* frameHeader = (FrameHeader*)frameBuf;
+FrameSample* frameSamples = (FrameSample*)(frameBuf + sizeof(FrameHeader));
+uint8_t frameCount = 0;
+uint16_t sampleCounter = 0;
+
+void resetFrame() {
+    frameCount = 0;
+}
+
+void sendFrame(uint8_t flags) {
+    frameHeader->magic = FRAME_MAGIC;
+    frameHeader->version = FRAME_VERSION;
+    frameHeader->count = frameCount;
+    frameHeader->flags = flags;
+    pSensorChar->setValue(frameBuf, sizeof(FrameHeader) + frameCount * sizeof(FrameSample));
+    pSensorChar->notify();
+    resetFrame();
+}
+
+void addSample(unsigned long now, const SensorData& sdata) {
+    if (frameCount == 0) {
+        frameHeader->counter = sampleCounter;
+        frameHeader->t0_ms = (uint32_t)now;
+    }
+    FrameSample& s = frameSamples[frameCount++];
+    s.dt_ms = (uint16_t)(now - frameHeader->t0_ms);
+    s.ax = frameScale(sdata.ax, FRAME_ACCEL_SCALE);
+    s.ay = frameScale(sdata.ay, FRAME_ACCEL_SCALE);
+    s.az = frameScale(sdata.az, FRAME_ACCEL_SCALE);
+    // Adafruit reports rad/s; the edge pipeline and models use deg/s
+    s.gx = frameScale(sdata.gx * RAD_TO_DEG, FRAME_GYRO_SCALE);
+    s.gy = frameScale(sdata.gy * RAD_TO_DEG, FRAME_GYRO_SCALE);
+    s.gz = frameScale(sdata.gz * RAD_TO_DEG, FRAME_GYRO_SCALE);
+    frameHeader->temp_c100 = frameScale(sdata.temp, FRAME_TEMP_SCALE);
+    sampleCounter++;
+    if (frameCount >= SAMPLES_PER_FRAME) {
+        sendFrame(FRAME_FLAG_MPU_CONNECTED);
+    }
+}
+
 class MyServerCallbacks : public NimBLEServerCallbacks {
     void onConnect(NimBLEServer* pServer) {
         deviceConnected = true;
@@ -22,6 +65,7 @@ class MyServerCallbacks : public NimBLEServerCallbacks {
     }
     void onDisconnect(NimBLEServer* pServer) {
         deviceConnected = false;
+        resetFrame();
         Serial.println("Client disconnected");
         digitalWrite(STATUS_LED_PIN, LOW);
         NimBLEDevice::startAdvertising(); // Restart advertising to allow reconnection
@@ -31,6 +75,7 @@ class MyServerCallbacks : public NimBLEServerCallbacks {
 void setupBLE() {
     NimBLEDevice::init(BLE_DEVICE_NAME);
     NimBLEDevice::setPower(ESP_PWR_LVL_P9); // Max transmission power (+9dbm)
+    NimBLEDevice::setMTU(BLE_PREFERRED_MTU); // Sample frames need more than the default 23-byte MTU
     
     pServer = NimBLEDevice::createServer();
     pServer->setCallbacks(new MyServerCallbacks());
@@ -77,7 +122,9 @@ void setup() {
 
     // Populate static data
     JsonDocument infoDoc;
-    infoDoc["fw_version"] = "1.0.0";
+    infoDoc["fw_version"] = "1.1.0";
+    infoDoc["frame_version"] = FRAME_VERSION;
+    infoDoc["samples_per_frame"] = SAMPLES_PER_FRAME;
     infoDoc["mpu_connected"] = isMpuConnected();
     String infoStr;
     serializeJson(infoDoc, infoStr);
@@ -87,36 +134,20 @@ void setup() {
 void loop() {
     unsigned long now = millis();
     
-    // Stream 6-axis IMU JSON payloads via BLE at 25Hz
+    // Sample 6-axis IMU at 25Hz; notify packed frames of SAMPLES_PER_FRAME samples
     if (deviceConnected && (now - lastSampleTime >= SAMPLE_INTERVAL_MS)) {
         lastSampleTime = now;
         
         SensorData sdata;
         if (readSensors(sdata)) {
-            JsonDocument doc;
-            doc["ts"] = now;
-            doc["ax"] = sdata.ax;
-            doc["ay"] = sdata.ay;
-            doc["az"] = sdata.az;
-            doc["gx"] = sdata.gx;
-            doc["gy"] = sdata.gy;
-            doc["gz"] = sdata.gz;
-            doc["temp"] = sdata.temp;
-            
-            String jsonStr;
-            serializeJson(doc, jsonStr);
-            
-            pSensorChar->setValue(jsonStr);
-            pSensorChar->notify();
-            
+            addSample(now, sdata);
         } else {
-             // Fallback if sensor fails mid-operation
-             JsonDocument doc;
-             doc["mpu_connected"] = false;
-             String jsonStr;
-             serializeJson(doc, jsonStr);
-             pSensorChar->setValue(jsonStr);
-             pSensorChar->notify();
+            // Fallback if sensor fails mid-operation: empty frame with mpu_connected cleared
+            resetFrame();
+            frameHeader->counter = sampleCounter;
+            frameHeader->t0_ms = (uint32_t)now;
+            frameHeader->temp_c100 = 0;
+            sendFrame(0);
         }
     }
     
@@ -17,7 +17,8 @@ _scripts = Path(__file__).resolve().parent
 sys.path.insert(0, str(_scripts))
 
 from feature_extraction import extract_features_from_window
-from train import build_dataset, load_labels, MODELS_DIR
+from feature_cache import FeatureCache
+from train import build_dataset, load_labels, load_raw, MODELS_DIR
 
 WINDOW_SECONDS = 3
 SAMPLE_RATE = 25
@@ -26,7 +27,7 @@ WINDOW_SAMPLES = int(WINDOW_SECONDS * SAMPLE_RATE)
 def main():
     p = argparse.ArgumentParser(description="Calibrate activity model per factory")
     p.add_argument("--factory-id", type=str, required=True, help="Factory identifier (e.g., F001)")
-    p.add_argument("--local-raw", type=Path, required=True, help="Path to the factory's raw CSV file")
+    p.add_argument("--local-raw", type=Path, required=True, help="Path to the factory's raw CSV file or columnar store")
     p.add_argument("--local-labels", type=Path, required=True, help="Path to the factory's labels CSV file")
     args = p.parse_args()
 
@@ -40,13 +41,10 @@ def main():
     base_model = joblib.load(base_model_path)
     
     print(f"[2/4] Loading local factory data: {args.local_raw.name}")
-    raw_df = pd.read_csv(args.local_raw)
-    if "timestamp" not in raw_df.columns and "ts" in raw_df.columns:
-        raw_df = raw_df.rename(columns={"ts": "timestamp"})
-    raw_df = raw_df.sort_values("timestamp").reset_index(drop=True)
+    raw_df = load_raw(args.local_raw)
     
     labels_df = load_labels(args.local_labels)
-    X_local, y_local = build_dataset(raw_df, labels_df)
+    X_local, y_local = build_dataset(raw_df, labels_df, FeatureCache(), args.local_raw)
     
     if len(X_local) < 5:
         print("Error: Supplied local dataset is too small. Need at least 5 windows.")
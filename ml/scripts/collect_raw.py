@@ -2,7 +2,8 @@
 """
 Industrial Wearable AI — Raw Data Collector
 Writes CSV to ml/data/raw/ with columns: timestamp, ax, ay, az, gx, gy, gz, temp.
-Data source: BLE/simulator or generate dummy for testing.
+Data source: BLE/simulator or generate dummy for testing. --store also converts the
+CSV to a memory-mapped columnar store (raw_store.py), which training prefers.
 """
 import argparse
 import asyncio
@@ -91,6 +92,7 @@ def main():
     p.add_argument("--source", choices=["dummy", "stream"], default="dummy",
                    help="dummy=generate, stream=from edge BLE/simulator")
     p.add_argument("--output", help="Output path (default: raw_YYYYMMDD_HHMMSS.csv)")
+    p.add_argument("--store", action="store_true", help="Also write a columnar store next to the CSV")
     args = p.parse_args()
 
     RAW_DIR.mkdir(parents=True, exist_ok=True)
@@ -103,6 +105,12 @@ def main():
     else:
         count = asyncio.run(_collect_from_stream(args.duration, output_path))
         print(f"Wrote {output_path} ({count} samples)")
+        path = output_path
+
+    if args.store:
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from raw_store import convert_csv
+        print(f"Wrote {convert_csv(path)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — Edge Model Export
+Converts a trained joblib model into the compact artifact the gateway loads with NumPy
+only (edge/src/edge_model.py): packed node arrays in a compressed .npz plus a JSON
+header with the feature schema, classes and format version.
+
+Supported: RandomForestClassifier (activity), GradientBoostingClassifier (fatigue),
+StandardScaler + Ridge pipeline (ergo), IsolationForest (anomaly). XGBoost models are
+not exported — keep those on joblib.
+
+Quantization, applied only where it cannot change results:
+  thresholds  sklearn compares float32 inputs with float64 thresholds, so rounding each
+              threshold down to float32 is exact. float16 is used when, additionally,
+              no reference value of the split feature lies between the float16 and
+              float32 thresholds and every prediction below still matches.
+  leaf values float16 when predictions on the reference data match sklearn (same class /
+              inlier decision, probabilities and scores within tolerance), else float32.
+  children    int16 tree-local indices when every tree has < 32768 nodes.
+The reference data is the model's training distribution: real windows from raw
+recordings (activity/anomaly, --raw or everything in ml/data/raw) or the synthetic
+generators of the training scripts.
+
+Usage:
+    python ml/scripts/export_edge_model.py activity
+    python ml/scripts/export_edge_model.py anomaly --raw ml/data/raw/raw_20250101_080000.store
+    python ml/scripts/export_edge_model.py fatigue --model ml/models/fatigue_model.joblib --out /tmp/fatigue.edge.npz
+"""
+import argparse
+import hashlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+_scripts = Path(__file__).resolve().parent
+_root = _scripts.parent.parent
+sys.path.insert(0, str(_scripts))
+sys.path.insert(0, str(_root))
+
+from edge.src.edge_model import FORMAT, FORMAT_VERSION, SUFFIX, build_edge_model, load_edge_model  # noqa: E402
+
+MODELS_DIR = _root / "ml" / "models"
+MODEL_FILES = {
+    "activity": "activity_model.joblib",
+    "fatigue": "fatigue_model.joblib",
+    "ergo": "ergo_model.joblib",
+    "anomaly": "anomaly_model.joblib",
+}
+PROBA_TOLERANCE = 5e-3   # max |Δp| for classifiers
+SCORE_TOLERANCE = 1e-4   # max |Δscore| for IsolationForest
+
+
+# ── Feature schema & reference data ───────────────────────────────────────
+def feature_schema(kind: str) -> dict:
+    if kind in ("activity", "anomaly"):
+        from feature_extraction import AXES, FEATURE_VERSION
+
+        stats = ["mean", "std", "min", "max", "zcr"]
+        return {"names": [f"{a}_{s}" for a in AXES for s in stats], "feature_version": FEATURE_VERSION}
+    if kind == "fatigue":
+        from train_fatigue import FEATURE_NAMES
+    else:
+        from train_ergo import FEATURE_NAMES
+    return {"names": list(FEATURE_NAMES)}
+
+
+def reference_data(kind: str, raw_paths: Optional[list[Path]] = None) -> np.ndarray:
+    """Inputs the quantization is checked on (float32, as the edge passes them)."""
+    if kind == "fatigue":
+        from train_fatigue import generate_synthetic_data
+        return generate_synthetic_data()[0]
+    if kind == "ergo":
+        from train_ergo import generate_synthetic_data
+        return generate_synthetic_data()[0]
+
+    from raw_store import list_raw
+    from train import RAW_DIR
+    from train_anomaly import generate_normal_data, load_raw_features
+
+    raw_paths = raw_paths or (list_raw(RAW_DIR) if RAW_DIR.exists() else [])
+    parts = [generate_normal_data()]
+    if raw_paths:
+        parts.append(load_raw_features(raw_paths))
+    return np.concatenate(parts).astype(np.float32)
+
+
+# ── Packing ───────────────────────────────────────────────────────────────
+def _round_down(values: np.ndarray, dtype) -> np.ndarray:
+    """Largest representable value <= each input (x <= t is unchanged for inputs of that dtype)."""
+    out = values.astype(dtype)
+    up = out.astype(np.float64) > values
+    out[up] = np.nextafter(out[up], dtype(-np.inf))
+    return out
+
+
+def _float16_safe(feature: np.ndarray, t32: np.ndarray, ref: np.ndarray) -> bool:
+    """True if no reference value falls between a float16 threshold and its float32 original."""
+    split = feature >= 0
+    t16 = _round_down(t32.astype(np.float64), np.float16).astype(np.float32)
+    if not np.all(np.isfinite(t16[split])):
+        return False
+    for f in np.unique(feature[split]):
+        col = np.sort(ref[:, f])
+        nodes = split & (feature == f)
+        if np.any(np.searchsorted(col, t16[nodes], "right") != np.searchsorted(col, t32[nodes], "right")):
+            return False
+    return True
+
+
+def _pack_trees(trees: list, feature_maps: Optional[list] = None) -> tuple[dict, int]:
+    """Concatenate sklearn trees into node arrays (values filled in by the caller)."""
+    feature, threshold, left, right, offsets = [], [], [], [], []
+    offset, max_depth = 0, 0
+    for i, est in enumerate(trees):
+        t = est.tree_
+        f = t.feature.astype(np.int64)
+        if feature_maps is not None:
+            f = np.where(f >= 0, np.asarray(feature_maps[i])[np.maximum(f, 0)], -1)
+        is_leaf = t.children_left < 0
+        offsets.append(offset)
+        feature.append(np.where(is_leaf, -1, f))
+        threshold.append(np.where(is_leaf, 0.0, t.threshold))
+        left.append(np.where(is_leaf, 0, t.children_left))
+        right.append(np.where(is_leaf, 0, t.children_right))
+        offset += t.node_count
+        max_depth = max(max_depth, int(t.max_depth))
+    feature = np.concatenate(feature)
+    leaf = np.full(len(feature), -1, dtype=np.int32)
+    leaf[feature < 0] = np.arange(int(np.sum(feature < 0)), dtype=np.int32)
+    child_dtype = np.int16 if max(e.tree_.node_count for e in trees) < 2 ** 15 else np.int32
+    arrays = {
+        "tree_offset": np.array(offsets, dtype=np.int32),
+        "feature": feature.astype(np.int16),
+        "threshold": _round_down(np.concatenate(threshold), np.float32),
+        "left": np.concatenate(left).astype(child_dtype),
+        "right": np.concatenate(right).astype(child_dtype),
+        "leaf": leaf,
+    }
+    return arrays, max_depth
+
+
+def _leaf_rows(trees: list) -> list[np.ndarray]:
+    return [np.flatnonzero(e.tree_.children_left < 0) for e in trees]
+
+
+def _path_lengths(est) -> np.ndarray:
+    """Node depth + c(n_node_samples) − 1: what IsolationForest adds up for a sample ending there."""
+    from sklearn.ensemble._iforest import _average_path_length
+
+    t = est.tree_
+    depth = np.ones(t.node_count)  # Tree.compute_node_depths counts the root as depth 1
+    for node in range(t.node_count):  # children always follow their parent
+        if t.children_left[node] >= 0:
+            depth[t.children_left[node]] = depth[t.children_right[node]] = depth[node] + 1
+    return depth + _average_path_length(t.n_node_samples) - 1.0
+
+
+def pack(model) -> tuple[dict, dict]:
+    """(header fields, arrays) with float32 thresholds and float64 leaf values."""
+    name = type(model).__name__
+    if name.startswith("XGB"):
+        raise ValueError("XGBoost models are not supported by the edge format; deploy the joblib model")
+
+    if name == "RandomForestClassifier":
+        trees = list(model.estimators_)
+        arrays, depth = _pack_trees(trees)
+        leaves = [e.tree_.value[rows, 0, :] for e, rows in zip(trees, _leaf_rows(trees))]
+        value = np.concatenate(leaves)
+        arrays["value"] = value / value.sum(axis=1, keepdims=True)
+        return {"kind": "forest_classifier", "max_depth": depth, "classes": model.classes_.tolist()}, arrays
+
+    if name == "GradientBoostingClassifier":
+        if model.init_ != "zero" and type(model.init_).__name__ != "DummyClassifier":
+            raise ValueError(f"unsupported GradientBoosting init estimator {type(model.init_).__name__}")
+        grid = model.estimators_  # (n_estimators, K)
+        trees = list(grid.ravel())
+        arrays, depth = _pack_trees(trees)
+        arrays["value"] = np.concatenate([e.tree_.value[rows, 0, 0] for e, rows in zip(trees, _leaf_rows(trees))])
+        arrays["tree_class"] = np.tile(np.arange(grid.shape[1]), grid.shape[0]).astype(np.int16)
+        init = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+        return {
+            "kind": "gradient_boosting_classifier",
+            "max_depth": depth,
+            "classes": model.classes_.tolist(),
+            "init": init.tolist(),
+            "learning_rate": float(model.learning_rate),
+        }, arrays
+
+    if name == "IsolationForest":
+        trees = list(model.estimators_)
+        # Trees only see a feature subset when max_features < 1 (same test as sklearn scoring)
+        subsample = model._max_features != model.n_features_in_
+        arrays, depth = _pack_trees(trees, model.estimators_features_ if subsample else None)
+        arrays["value"] = np.concatenate([_path_lengths(e)[rows] for e, rows in zip(trees, _leaf_rows(trees))])
+        from sklearn.ensemble._iforest import _average_path_length
+
+        return {
+            "kind": "isolation_forest",
+            "max_depth": depth,
+            "offset": float(model.offset_),
+            "average_path_length_max_samples": float(_average_path_length([model._max_samples])[0]),
+        }, arrays
+
+    if name == "Pipeline":
+        steps = dict(model.steps)
+        scaler, reg = steps.get("scaler"), model.steps[-1][1]
+        if len(model.steps) > 2 or type(reg).__name__ not in ("Ridge", "LinearRegression"):
+            raise ValueError("only StandardScaler + Ridge/LinearRegression pipelines are supported")
+        coef = np.ravel(reg.coef_).astype(np.float64)
+        intercept = float(np.ravel(reg.intercept_)[0])
+        if scaler is not None:
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(coef)
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros_like(coef)
+            coef = coef / scale
+            intercept -= float(mean @ coef)
+        return {"kind": "linear_regressor", "intercept": intercept}, {"coef": coef}
+
+    raise ValueError(f"unsupported model type {name}")
+
+
+# ── Verification ──────────────────────────────────────────────────────────
+def compare(model, edge, X: np.ndarray) -> dict:
+    """How closely the edge model reproduces the sklearn model on X."""
+    if hasattr(model, "score_samples"):
+        ref, got = model.score_samples(X), edge.score_samples(X)
+        return {
+            "agreement": float(np.mean(model.predict(X) == edge.predict(X))),
+            "max_abs_diff": float(np.max(np.abs(ref - got))),
+        }
+    if hasattr(model, "predict_proba"):
+        ref, got = model.predict_proba(X), edge.predict_proba(X)
+        return {
+            "agreement": float(np.mean(np.argmax(ref, axis=1) == np.argmax(got, axis=1))),
+            "max_abs_diff": float(np.max(np.abs(ref - got))),
+        }
+    ref, got = model.predict(X), edge.predict(X)
+    return {"agreement": None, "max_abs_diff": float(np.max(np.abs(ref - got)))}
+
+
+def _acceptable(kind: str, result: dict) -> bool:
+    if result["agreement"] is not None and result["agreement"] < 1.0:
+        return False
+    return result["max_abs_diff"] <= (SCORE_TOLERANCE if kind == "isolation_forest" else PROBA_TOLERANCE)
+
+
+def export(model, kind: str, X: np.ndarray, source: Optional[Path] = None) -> tuple[dict, dict, dict]:
+    """
+    Pack and quantize a model, checked against the sklearn model on reference data X.
+    Returns (header, arrays, verification).
+    """
+    fields, arrays = pack(model)
+    header = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        **fields,
+        "n_features": int(model.n_features_in_),
+        "features": feature_schema(kind),
+        "source": {
+            "type": type(model).__name__,
+            "file": source.name if source else None,
+            "sha256": hashlib.sha256(source.read_bytes()).hexdigest() if source else None,
+        },
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    X = np.asarray(X, dtype=np.float32)
+
+    if "threshold" not in arrays:  # linear: a handful of float64 weights, nothing to gain
+        header["quantization"] = {"coef": "float64"}
+        return header, arrays, compare(model, build_edge_model(header, arrays), X)
+
+    t32 = arrays["threshold"]
+    thresholds = ["float16", "float32"] if _float16_safe(arrays["feature"], t32, X) else ["float32"]
+    exact = arrays["value"]
+    for t_dtype in thresholds:
+        for v_dtype in ("float16", "float32"):
+            trial = dict(arrays)
+            trial["threshold"] = _round_down(t32.astype(np.float64), np.dtype(t_dtype).type)
+            trial["value"] = exact.astype(v_dtype)
+            result = compare(model, build_edge_model(header, trial), X)
+            if _acceptable(header["kind"], result) or (t_dtype, v_dtype) == ("float32", "float32"):
+                header["quantization"] = {
+                    "threshold": t_dtype,
+                    "value": v_dtype,
+                    "children": str(arrays["left"].dtype),
+                    "reference_rows": len(X),
+                }
+                return header, trial, result
+    raise AssertionError("unreachable")
+
+
+def save(header: dict, arrays: dict, out: Path) -> Path:
+    """Write the artifact atomically (the gateway may be reading the previous one)."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    blob = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+    buf = io.BytesIO()
+    np.savez_compressed(buf, header=blob, **arrays)
+    tmp = out.with_name(f".{out.name}.tmp")
+    tmp.write_bytes(buf.getvalue())
+    tmp.replace(out)
+    return out
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Export a trained model to the compact edge format")
+    p.add_argument("kind", choices=list(MODEL_FILES))
+    p.add_argument("--model", type=Path, help="joblib model (default ml/models/<kind>_model.joblib)")
+    p.add_argument("--out", type=Path, help=f"Output (default: next to the model, {SUFFIX})")
+    p.add_argument("--raw", type=Path, nargs="+", help="Raw CSVs / stores for reference windows (activity, anomaly)")
+    args = p.parse_args()
+
+    import joblib
+
+    src = args.model or MODELS_DIR / MODEL_FILES[args.kind]
+    if not src.exists():
+        print(f"ERROR: {src} not found. Train the model first.")
+        return 1
+    out = args.out or src.with_name(src.name.replace(".joblib", "") + SUFFIX)
+    model = joblib.load(src)
+    X = reference_data(args.kind, args.raw)
+    try:
+        header, arrays, result = export(model, args.kind, X, src)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+    if result["agreement"] is not None and result["agreement"] < 1.0:
+        print(f"ERROR: edge model disagrees with {src.name} on {1 - result['agreement']:.2%} of reference rows")
+        return 1
+    save(header, arrays, out)
+
+    t0 = time.perf_counter()
+    joblib.load(src)
+    t_joblib = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    load_edge_model(out)
+    t_edge = time.perf_counter() - t0
+    q = header["quantization"]
+    print(f"{src.name} → {out}")
+    print(f"  {header['kind']}, quantization {', '.join(f'{k} {v}' for k, v in q.items())}")
+    print(f"  size {src.stat().st_size / 1024:.0f} KB → {out.stat().st_size / 1024:.0f} KB, "
+          f"load {t_joblib * 1000:.0f} ms → {t_edge * 1000:.0f} ms")
+    agree = f"agreement {result['agreement']:.2%}, " if result["agreement"] is not None else ""
+    print(f"  {agree}max |Δ| {result['max_abs_diff']:.2e} on {len(X)} reference rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — Feature Cache
+Per-window feature matrices persisted next to the raw data (ml/data/features/), so
+repeated training runs and sweeps skip feature extraction.
+
+An entry is keyed by raw content hash + window + step + low-pass alpha +
+feature_extraction.FEATURE_VERSION and holds the features of each row range
+(segment) requested so far, in one uncompressed archive:
+
+    <hash>_w75_s37_a0.3_v1.npz   features  float32 (rows, 30)
+                                 index     int64 (segments, 4): lo, hi, offset, count
+
+Only segments not already in the entry are computed; they are appended and the
+archive is replaced atomically. Matrix and index live in the same file, so concurrent
+runs on the same raw file can lose each other's appends (recomputed next time) but
+never pair an index with another run's rows. Content hashes are memoised by path,
+size and mtime.
+
+Usage:
+    python ml/scripts/feature_cache.py info
+    python ml/scripts/feature_cache.py clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from feature_extraction import DEFAULT_ALPHA, FEATURE_DIM, FEATURE_VERSION, windowed_features
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "features"
+HASH_CHUNK = 1 << 20
+
+
+def _atomic_save(path: Path, **arrays: np.ndarray) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+class FeatureCache:
+    """Segment-level feature cache for one directory."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    # ── Content hashing ───────────────────────────────────────────────────
+
+    def _hash_memo_path(self) -> Path:
+        return self.cache_dir / "hashes.json"
+
+    def content_hash(self, raw_path: Path) -> str:
+        """sha256 of a raw CSV, or of a store's arrays; memoised while size/mtime are unchanged."""
+        raw_path = Path(raw_path).resolve()
+        files = sorted(raw_path.glob("*.npy")) + [raw_path / "meta.json"] if raw_path.is_dir() else [raw_path]
+        stamp = [[f.name, f.stat().st_size, f.stat().st_mtime_ns] for f in files]
+        memo_path = self._hash_memo_path()
+        try:
+            memo = json.loads(memo_path.read_text())
+        except (OSError, ValueError):
+            memo = {}
+        entry = memo.get(str(raw_path))
+        if entry and entry["stamp"] == stamp:
+            return entry["sha256"]
+
+        h = hashlib.sha256()
+        for f in files:
+            with open(f, "rb") as fh:
+                while chunk := fh.read(HASH_CHUNK):
+                    h.update(chunk)
+        digest = h.hexdigest()
+        memo[str(raw_path)] = {"stamp": stamp, "sha256": digest}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = memo_path.with_name(f".{memo_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(memo))
+        os.replace(tmp, memo_path)
+        return digest
+
+    # ── Entries ───────────────────────────────────────────────────────────
+
+    def _entry(self, digest: str, window: int, step: int, alpha: float) -> Path:
+        return self.cache_dir / f"{digest[:24]}_w{window}_s{step}_a{alpha:g}_v{FEATURE_VERSION}.npz"
+
+    def segments(
+        self,
+        raw_path: Path,
+        data: np.ndarray,
+        bounds: Sequence[tuple[int, int]],
+        window: int,
+        step: int,
+        alpha: float = DEFAULT_ALPHA,
+    ) -> list[np.ndarray]:
+        """
+        windowed_features(data[lo:hi], window, step) for each (lo, hi), served from the
+        cache where present. data must be the sorted rows of raw_path (train.raw_arrays).
+        """
+        path = self._entry(self.content_hash(raw_path), window, step, alpha)
+        feats = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        index = np.zeros((0, 4), dtype=np.int64)
+        if path.exists():
+            try:
+                with np.load(path) as entry:
+                    feats, index = entry["features"], entry["index"]
+            except (OSError, ValueError, KeyError):
+                feats, index = np.zeros((0, FEATURE_DIM), dtype=np.float32), np.zeros((0, 4), dtype=np.int64)
+        known = {(int(lo), int(hi)): (int(off), int(cnt)) for lo, hi, off, cnt in index}
+
+        new_rows, new_index = [], []
+        offset = len(feats)
+        for lo, hi in dict.fromkeys((int(lo), int(hi)) for lo, hi in bounds):
+            if (lo, hi) in known:
+                continue
+            fv = windowed_features(data[lo:hi], window, step, alpha=alpha)
+            new_rows.append(fv)
+            new_index.append((lo, hi, offset, len(fv)))
+            known[(lo, hi)] = (offset, len(fv))
+            offset += len(fv)
+
+        self.misses += len(new_index)
+        self.hits += len(bounds) - len(new_index)
+        if new_index:
+            feats = np.concatenate([feats] + new_rows)
+            index = np.concatenate([index, np.array(new_index, dtype=np.int64)])
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_save(path, features=feats, index=index)
+
+        out = []
+        for lo, hi in bounds:
+            off, cnt = known[(int(lo), int(hi))]
+            out.append(feats[off : off + cnt])
+        return out
+
+    def clear(self) -> int:
+        removed = 0
+        for f in [*self.cache_dir.glob("*.npz"), *self.cache_dir.glob("*.npy")]:  # .npy: old two-file entries
+            f.unlink()
+            removed += 1
+        self._hash_memo_path().unlink(missing_ok=True)
+        return removed
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Feature cache maintenance")
+    p.add_argument("cmd", choices=["info", "clear"])
+    p.add_argument("--dir", type=Path, default=CACHE_DIR)
+    args = p.parse_args()
+    cache = FeatureCache(args.dir)
+
+    if args.cmd == "clear":
+        print(f"Removed {cache.clear()} files from {cache.cache_dir}")
+        return 0
+    entries = sorted(cache.cache_dir.glob("*.npz"))
+    total = 0
+    for f in entries:
+        with np.load(f) as entry:
+            segments = len(entry["index"])
+        size = f.stat().st_size
+        total += size
+        print(f"{f.name}: {segments} segments, {size / 1e6:.1f} MB")
+    print(f"{len(entries)} entries, {total / 1e6:.1f} MB in {cache.cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
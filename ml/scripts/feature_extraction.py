@@ -1,15 +1,22 @@
 """
 Industrial Wearable AI — Feature Extraction (ML Training)
 Same logic as edge/src/feature_extractor.py. Used for training pipeline consistency.
+
+windowed_features() is the batched path used to build datasets: every window of a
+segment is filtered and reduced at once, bit-identical to extract_features_from_window
+applied window by window.
 """
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Union
 
 AXES = ["ax", "ay", "az", "gx", "gy", "gz"]
 FEATURES_PER_AXIS = 5
 FEATURE_DIM = len(AXES) * FEATURES_PER_AXIS  # 30
 DEFAULT_ALPHA = 0.3  # Match edge pipeline low-pass
+FEATURE_VERSION = 1  # Bump whenever feature values change; keys the feature cache (feature_cache.py)
+BATCH_WINDOWS = 4096  # windows per batch in windowed_features (~15 MB of float64 at 75 samples)
 
 
 def _zero_crossing_rate(arr: np.ndarray) -> float:
@@ -77,3 +84,71 @@ def extract_features_from_window(df: pd.DataFrame, apply_lowpass: bool = True) -
         data = np.column_stack(filtered)
     samples = [dict(zip(AXES, data[i])) for i in range(len(data))]
     return extract_features(samples)
+
+
+def axes_array(df: pd.DataFrame) -> np.ndarray:
+    """(n, 6) float64 array of the IMU columns; zeros if any axis is missing (as extract_features_from_window)."""
+    if all(a in df.columns for a in AXES):
+        return df[AXES].to_numpy(dtype=np.float64)
+    return np.zeros((len(df), len(AXES)))
+
+
+def lowpass_windows(windows: np.ndarray, alpha: float = DEFAULT_ALPHA) -> np.ndarray:
+    """
+    EMA along the sample axis of a (n_samples, n_windows, 6) block, each window
+    starting from its own first sample as the edge does. The loop runs over the
+    window length only; every step updates all windows and axes at once.
+    """
+    out = np.empty_like(windows, dtype=np.float64)
+    out[0] = windows[0]
+    for i in range(1, len(windows)):
+        out[i] = alpha * windows[i] + (1 - alpha) * out[i - 1]
+    return out
+
+
+def extract_features_batch(cols: np.ndarray) -> np.ndarray:
+    """
+    30 features for each window of a (n_windows, 6, n_samples) C-contiguous block.
+    Reductions run along the contiguous last axis so they match the per-axis 1D
+    reductions in extract_features exactly.
+    """
+    n = cols.shape[-1]
+    mean_val = cols.mean(axis=-1)
+    std_val = cols.std(axis=-1)
+    std_val[np.isnan(std_val) | (std_val == 0)] = 1e-8
+    min_val = cols.min(axis=-1)
+    max_val = cols.max(axis=-1)
+    if n < 2:
+        zcr = np.zeros_like(mean_val)
+    else:
+        changes = np.sum(np.abs(np.diff(np.sign(cols), axis=-1)), axis=-1) // 2
+        zcr = changes / (2 * (n - 1))
+    # (W, 6, 5) → per window: axis-major [mean, std, min, max, zcr] like extract_features
+    return np.stack([mean_val, std_val, min_val, max_val, zcr], axis=-1).astype(np.float32).reshape(len(cols), -1)
+
+
+def windowed_features(
+    data: np.ndarray,
+    window: int,
+    step: int,
+    apply_lowpass: bool = True,
+    alpha: float = DEFAULT_ALPHA,
+) -> np.ndarray:
+    """
+    Features of every window data[i:i+window] for i in range(0, n - window + 1, step).
+    data is an (n, 6) array in AXES order (see axes_array). Returns (n_windows, 30).
+    """
+    if len(data) < window:
+        return np.zeros((0, FEATURE_DIM), dtype=np.float32)
+    # (n_windows, 6, window) strided view: no copy until a batch is materialised
+    view = sliding_window_view(data, window, axis=0)[::step]
+    out = np.empty((len(view), FEATURE_DIM), dtype=np.float32)
+    for b in range(0, len(view), BATCH_WINDOWS):
+        chunk = view[b : b + BATCH_WINDOWS]
+        if apply_lowpass:
+            filtered = lowpass_windows(chunk.transpose(2, 0, 1), alpha)  # (window, W, 6)
+            cols = np.ascontiguousarray(filtered.transpose(1, 2, 0))
+        else:
+            cols = np.ascontiguousarray(chunk, dtype=np.float64)
+        out[b : b + len(chunk)] = extract_features_batch(cols)
+    return out
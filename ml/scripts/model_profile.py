@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — Model Inference Profile & Budgets
+Measures an exported model (.joblib or compact .edge.npz) the way the gateway runs it, on this machine:
+single-row latency (one window per call, p50/p95), batched per-row latency,
+serialized size, peak memory while loading, and tree count/depth/node statistics.
+check_budgets() turns configured limits into a list of violations, so training can
+refuse a model that would multiply gateway CPU.
+
+Budgets default from the environment (unset = no limit):
+    MODEL_MAX_LATENCY_US   single-row p50, µs
+    MODEL_MAX_SIZE_KB      serialized size
+    MODEL_MAX_LOAD_MB      peak memory allocated while loading
+
+Usage:
+    python ml/scripts/model_profile.py ml/models/activity_model.joblib
+    python ml/scripts/model_profile.py ml/models/fatigue_model.joblib --features 8 --max-latency-us 500
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+SINGLE_ROWS = 300
+BATCH_SIZE = 256
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else None
+
+
+def default_budgets() -> dict:
+    return {
+        "max_latency_us": _env_float("MODEL_MAX_LATENCY_US"),
+        "max_size_kb": _env_float("MODEL_MAX_SIZE_KB"),
+        "max_load_mb": _env_float("MODEL_MAX_LOAD_MB"),
+    }
+
+
+def _predict_fn(model):
+    """Classifiers are called through predict_proba on the edge; others through predict."""
+    return model.predict_proba if hasattr(model, "predict_proba") else model.predict
+
+
+def _loader(path: Path):
+    if str(path).endswith(".npz"):  # compact edge artifact (export_edge_model.py)
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+        from edge.src.edge_model import load_edge_model
+
+        return load_edge_model
+    import joblib
+
+    return joblib.load
+
+
+def load_with_peak(path: Path):
+    """Model load under tracemalloc (numpy buffers are traced). Returns (model, peak MB)."""
+    load = _loader(path)
+    tracemalloc.start()
+    try:
+        model = load(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return model, peak / 1e6
+
+
+def tree_stats(model) -> Optional[dict]:
+    """Tree count, depth and node statistics for tree ensembles (sklearn forests / boosting)."""
+    forest = getattr(model, "forest", None)
+    if forest is not None:  # edge artifact: walk the packed nodes (children follow their parent)
+        depth = np.zeros(len(forest.feature), dtype=np.int64)
+        for node in np.flatnonzero(forest.left != np.arange(len(depth))):
+            depth[forest.left[node]] = depth[forest.right[node]] = depth[node] + 1
+        per_tree = np.maximum.reduceat(depth, forest.roots)
+        return {
+            "trees": forest.n_trees,
+            "depth_max": int(per_tree.max()),
+            "depth_mean": round(float(per_tree.mean()), 2),
+            "nodes_total": len(depth),
+            "nodes_mean": round(len(depth) / forest.n_trees, 1),
+        }
+    estimators = getattr(model, "estimators_", None)
+    if estimators is None:
+        return None
+    trees = [e for e in np.ravel(np.asarray(estimators, dtype=object)) if hasattr(e, "tree_")]
+    if not trees:
+        return None
+    depths = np.array([t.tree_.max_depth for t in trees])
+    nodes = np.array([t.tree_.node_count for t in trees])
+    return {
+        "trees": len(trees),
+        "depth_max": int(depths.max()),
+        "depth_mean": round(float(depths.mean()), 2),
+        "nodes_total": int(nodes.sum()),
+        "nodes_mean": round(float(nodes.mean()), 1),
+    }
+
+
+def latency(model, X: np.ndarray) -> dict:
+    """Single-row latency distribution and batched per-row cost, in µs."""
+    predict = _predict_fn(model)
+    rows = [X[i % len(X)].reshape(1, -1) for i in range(SINGLE_ROWS)]
+    predict(rows[0])  # warm-up
+    times = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        t0 = time.perf_counter()
+        predict(row)
+        times[i] = time.perf_counter() - t0
+    batch = np.resize(X, (BATCH_SIZE, X.shape[1]))
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        predict(batch)
+        best = min(best, time.perf_counter() - t0)
+    us = times * 1e6
+    return {
+        "single_p50_us": round(float(np.percentile(us, 50)), 1),
+        "single_p95_us": round(float(np.percentile(us, 95)), 1),
+        "single_min_us": round(float(us.min()), 1),
+        f"batch{BATCH_SIZE}_per_row_us": round(best * 1e6 / BATCH_SIZE, 2),
+    }
+
+
+def profile_model(path: Path, X: np.ndarray) -> dict:
+    """Everything above for the model saved at path, timed on rows of X."""
+    model, load_mb = load_with_peak(path)
+    return {
+        "model": type(model).__name__,
+        "path": str(path),
+        "size_kb": round(path.stat().st_size / 1024, 1),
+        "load_peak_mb": round(load_mb, 2),
+        "latency": latency(model, np.asarray(X, dtype=np.float32)),
+        "trees": tree_stats(model),
+        "machine": {
+            "host": platform.node(),
+            "cpu": platform.processor() or platform.machine(),
+            "python": platform.python_version(),
+        },
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def check_budgets(profile: dict, budgets: dict) -> list[str]:
+    """Human-readable violations; empty when every configured budget holds."""
+    violations = []
+    limit = budgets.get("max_latency_us")
+    if limit is not None and profile["latency"]["single_p50_us"] > limit:
+        violations.append(f"single-row latency p50 {profile['latency']['single_p50_us']:.0f}µs > budget {limit:.0f}µs")
+    limit = budgets.get("max_size_kb")
+    if limit is not None and profile["size_kb"] > limit:
+        violations.append(f"size {profile['size_kb']:.0f}KB > budget {limit:.0f}KB")
+    limit = budgets.get("max_load_mb")
+    if limit is not None and profile["load_peak_mb"] > limit:
+        violations.append(f"load peak {profile['load_peak_mb']:.1f}MB > budget {limit:.1f}MB")
+    return violations
+
+
+def card_section(profile: dict, budgets: dict) -> str:
+    """Markdown for the MODEL_CARD 'Inference' section."""
+    lat = profile["latency"]
+    batch_key = next(k for k in lat if k.startswith("batch"))
+
+    def budget(key: str, unit: str) -> str:
+        return f" (budget {budgets[key]:g}{unit})" if budgets.get(key) is not None else ""
+
+    lines = [
+        f"Measured on {profile['machine']['host']} ({profile['machine']['cpu']}, Python {profile['machine']['python']}) at {profile['measured_at']}",
+        f"- **Single-row latency:** p50 {lat['single_p50_us']:.0f} µs, p95 {lat['single_p95_us']:.0f} µs{budget('max_latency_us', ' µs')}",
+        f"- **Batched ({BATCH_SIZE}) per row:** {lat[batch_key]:.1f} µs",
+        f"- **Serialized size:** {profile['size_kb']:.0f} KB{budget('max_size_kb', ' KB')}",
+        f"- **Peak memory on load:** {profile['load_peak_mb']:.1f} MB{budget('max_load_mb', ' MB')}",
+    ]
+    t = profile.get("trees")
+    if t:
+        lines.append(
+            f"- **Trees:** {t['trees']} (depth max {t['depth_max']}, mean {t['depth_mean']}; "
+            f"{t['nodes_total']} nodes, {t['nodes_mean']:.0f} per tree)"
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Profile an exported model against inference budgets")
+    p.add_argument("model", type=Path)
+    p.add_argument("--features", type=int, default=30, help="Input width for random rows (30 activity/anomaly, 8 fatigue, 6 ergo)")
+    p.add_argument("--max-latency-us", type=float)
+    p.add_argument("--max-size-kb", type=float)
+    p.add_argument("--max-load-mb", type=float)
+    p.add_argument("--json", type=Path, help="Write the profile here")
+    args = p.parse_args()
+
+    budgets = default_budgets()
+    for key in budgets:
+        if getattr(args, key) is not None:
+            budgets[key] = getattr(args, key)
+    X = np.random.default_rng(0).normal(size=(BATCH_SIZE, args.features)).astype(np.float32)
+    profile = profile_model(args.model, X)
+    violations = check_budgets(profile, budgets)
+    print(card_section(profile, budgets))
+    if args.json:
+        args.json.write_text(json.dumps({**profile, "budgets": budgets, "violations": violations}, indent=2))
+    for v in violations:
+        print(f"BUDGET EXCEEDED: {v}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — Columnar Raw IMU Store
+A raw recording stored as a directory of memory-mapped .npy arrays instead of CSV:
+
+    raw_YYYYMMDD_HHMMSS.store/
+        meta.json   rows, time range, source file
+        ts.npy      int64 (n,)     Unix ms, sorted ascending (the index)
+        imu.npy     float64 (n, 6) ax, ay, az, gx, gy, gz — row-major, so segments are views
+        temp.npy    float64 (n,)
+
+Opening a store parses nothing and reads pages only as they are touched; label
+segments are found with searchsorted on ts. Values are kept as float64 so features
+match the CSV path exactly.
+
+Usage:
+    python ml/scripts/raw_store.py convert ml/data/raw/raw_*.csv
+    python ml/scripts/raw_store.py info ml/data/raw/raw_20250101_080000.store
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+AXES = ["ax", "ay", "az", "gx", "gy", "gz"]
+STORE_SUFFIX = ".store"
+FORMAT_VERSION = 1
+
+
+def is_store(path: Path) -> bool:
+    return path.is_dir() and (path / "meta.json").exists()
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    """Same parsing and ordering as train.load_raw."""
+    df = pd.read_csv(path)
+    if "timestamp" not in df.columns and "ts" in df.columns:
+        df = df.rename(columns={"ts": "timestamp"})
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+
+def write_store(df: pd.DataFrame, out_dir: Path, source: Optional[str] = None) -> Path:
+    """Write a DataFrame with timestamp, ax..gz, temp columns as a store (sorted by timestamp)."""
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp").reset_index(drop=True)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n = len(df)
+    np.save(out_dir / "ts.npy", df["timestamp"].to_numpy(dtype=np.int64))
+    imu = np.zeros((n, len(AXES)))
+    for j, axis in enumerate(AXES):
+        if axis in df.columns:
+            imu[:, j] = df[axis].to_numpy(dtype=np.float64)
+    np.save(out_dir / "imu.npy", imu)
+    temp = df["temp"].to_numpy(dtype=np.float64) if "temp" in df.columns else np.full(n, np.nan)
+    np.save(out_dir / "temp.npy", temp)
+    meta = {
+        "version": FORMAT_VERSION,
+        "rows": n,
+        "start_ts": int(df["timestamp"].iloc[0]) if n else None,
+        "end_ts": int(df["timestamp"].iloc[-1]) if n else None,
+        "axes": AXES,
+        # CSVs missing an axis build all-zero windows in extract_features_from_window; keep that
+        "has_all_axes": all(a in df.columns for a in AXES),
+        "source": source,
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    return out_dir
+
+
+def convert_csv(csv_path: Path, out_dir: Optional[Path] = None) -> Path:
+    """Convert one raw CSV; default output is alongside it as <stem>.store/."""
+    out_dir = out_dir or csv_path.with_suffix(STORE_SUFFIX)
+    return write_store(_read_csv(csv_path), out_dir, source=csv_path.name)
+
+
+class RawStore:
+    """Read-only, memory-mapped view of a store directory."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.ts = np.load(self.path / "ts.npy", mmap_mode="r")
+        self.imu = np.load(self.path / "imu.npy", mmap_mode="r")
+        self.temp = np.load(self.path / "temp.npy", mmap_mode="r")
+        if not self.meta.get("has_all_axes", True):
+            self.imu = np.zeros(self.imu.shape)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def segment_slice(self, start_ts: int, end_ts: int) -> slice:
+        """Rows with start_ts <= ts <= end_ts."""
+        return slice(
+            int(np.searchsorted(self.ts, start_ts, "left")),
+            int(np.searchsorted(self.ts, end_ts, "right")),
+        )
+
+    def segment(self, start_ts: int, end_ts: int) -> np.ndarray:
+        """(k, 6) IMU rows of a time range (a view into the map)."""
+        return self.imu[self.segment_slice(start_ts, end_ts)]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialise as a DataFrame with the CSV columns (loads everything)."""
+        df = pd.DataFrame(np.asarray(self.imu), columns=AXES)
+        df.insert(0, "timestamp", np.asarray(self.ts))
+        df["temp"] = np.asarray(self.temp)
+        return df
+
+
+def list_raw(raw_dir: Path) -> list[Path]:
+    """Raw recordings in a directory, oldest first; a store replaces the CSV of the same name."""
+    stores = {p.name[: -len(STORE_SUFFIX)]: p for p in raw_dir.glob(f"raw_*{STORE_SUFFIX}") if is_store(p)}
+    csvs = {p.stem: p for p in raw_dir.glob("raw_*.csv")}
+    merged = {**csvs, **stores}
+    return [merged[k] for k in sorted(merged)]
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Columnar raw IMU store")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("convert", help="Convert raw CSV(s) to stores")
+    c.add_argument("csv", type=Path, nargs="+")
+    c.add_argument("--out-dir", type=Path, help="Directory for the stores (default: next to each CSV)")
+    i = sub.add_parser("info", help="Describe a store")
+    i.add_argument("store", type=Path)
+    args = p.parse_args()
+
+    if args.cmd == "convert":
+        for csv_path in args.csv:
+            out = args.out_dir / csv_path.with_suffix(STORE_SUFFIX).name if args.out_dir else None
+            store = RawStore(convert_csv(csv_path, out))
+            print(f"{csv_path.name} → {store.path} ({len(store)} rows)")
+        return 0
+
+    store = RawStore(args.store)
+    m = store.meta
+    hours = (m["end_ts"] - m["start_ts"]) / 3_600_000 if m["rows"] else 0.0
+    print(f"{store.path}: {m['rows']} rows, {hours:.2f} h, source {m.get('source')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
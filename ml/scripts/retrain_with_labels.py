@@ -3,6 +3,10 @@
 Industrial Wearable AI — Active Learning Retraining
 Fetches human-verified labels from the database, extracts corresponding raw features,
 merges them into the core dataset, and retrains the base model.
+Labeled events with an edge snapshot (event_snapshots: the raw window the edge classified)
+use that window; the rest fall back to a timestamp join against the latest raw CSV.
+With no raw recording in ml/data/raw (the usual case in production), the model is
+trained on the snapshot windows alone and labels without a snapshot are skipped.
 """
 import sys
 import argparse
@@ -20,53 +24,74 @@ _scripts = Path(__file__).resolve().parent
 sys.path.insert(0, str(_scripts))
 sys.path.insert(0, str(_scripts.parent.parent / "backend")) # Access backend for DB
 
-from feature_extraction import extract_features_from_window
-from train import build_synthetic_dataset, RAW_DIR, MODELS_DIR
+from feature_cache import FeatureCache
+from feature_extraction import FEATURE_DIM, windowed_features
+from raw_store import list_raw
+from train import build_synthetic_dataset, load_raw, raw_arrays, segment, RAW_DIR, MODELS_DIR
 
 # Need backend DB access
 from app.database import AsyncSessionLocal
 from app.models.activity_event import ActivityEvent
+from app.models.event_label import EventLabel
+from app.models.event_snapshot import EventSnapshot
 
 WINDOW_SECONDS = 3
 SAMPLE_RATE = 25
 WINDOW_SAMPLES = int(WINDOW_SECONDS * SAMPLE_RATE)
 
 async def fetch_human_labels():
-    """Fetch human-corrected labels from the activity_events table (if implemented)."""
-    # Note: In a true active learning setup, we'd have a `human_labels` table 
-    # or a `is_human_verified` flag on activity_events. 
-    # For this implementation, we pull a subset of recent events to act as our "labeled" set.
+    """Fetch human-corrected labels (event_labels, filled from the dashboard labeling queue)."""
     async with AsyncSessionLocal() as db:
-        query = select(ActivityEvent).order_by(ActivityEvent.ts.desc()).limit(1000)
-        result = await db.execute(query)
-        events = result.scalars().all()
-        
-        if not events:
+        query = (
+            select(ActivityEvent.ts, EventLabel.human_label, EventSnapshot.rows, EventSnapshot.cols, EventSnapshot.data)
+            .join(EventLabel, EventLabel.event_id == ActivityEvent.id)
+            .outerjoin(EventSnapshot, EventSnapshot.event_id == ActivityEvent.id)
+            .order_by(ActivityEvent.ts)
+        )
+        rows = (await db.execute(query)).all()
+
+        if not rows:
             return pd.DataFrame()
-            
-        return pd.DataFrame([
-            {"start_ts": e.ts, "end_ts": e.ts + (WINDOW_SECONDS * 1000), "label": e.label.value}
-            for e in events
-        ])
 
-def merge_datasets(raw_df: pd.DataFrame, human_labels: pd.DataFrame):
-    """Combine base synthetic dataset with new human labels."""
-    # 1. Base dataset
-    X_base, y_base = build_synthetic_dataset(raw_df)
+        # Event ts is stamped when its window was classified, i.e. at the end of the window
+        df = pd.DataFrame({
+            "end_ts": [int(row.ts.timestamp() * 1000) for row in rows],
+            "label": [row.human_label.value for row in rows],
+            "window": [
+                np.frombuffer(row.data, dtype="<f2").reshape(row.rows, row.cols).astype(np.float32)
+                if row.data is not None else None
+                for row in rows
+            ],
+        })
+        df.insert(0, "start_ts", df["end_ts"] - WINDOW_SECONDS * 1000)
+        return df
+
+def merge_datasets(raw_df: pd.DataFrame | None, human_labels: pd.DataFrame, raw_path: Path | None = None):
+    """Combine base synthetic dataset with new human labels (raw_df None: human labels with snapshots only)."""
+    # 1. Base dataset (features cached per raw file across retrains)
+    if raw_df is not None:
+        X_base, y_base = build_synthetic_dataset(raw_df, FeatureCache(), raw_path)
+    else:
+        X_base, y_base = np.zeros((0, FEATURE_DIM), dtype=np.float32), np.array([], dtype=str)
     
     # 2. Human verified dataset
     X_human, y_human = [], []
     
     if not human_labels.empty:
+        if raw_df is not None:
+            ts, data, sorted_ts = raw_arrays(raw_df)
         for _, row in human_labels.iterrows():
-            start, end = int(row["start_ts"]), int(row["end_ts"])
-            # The raw CSV timestamps are in Unix MS
-            mask = (raw_df["timestamp"] >= start) & (raw_df["timestamp"] <= end)
-            seg = raw_df.loc[mask]
+            if row.get("window") is not None:
+                seg = row["window"]
+            elif raw_df is None:
+                continue
+            else:
+                start, end = int(row["start_ts"]), int(row["end_ts"])
+                # The raw timestamps are in Unix MS
+                seg = segment(ts, data, sorted_ts, start, end)
             
             if len(seg) >= WINDOW_SAMPLES:
-                win = seg.iloc[0:WINDOW_SAMPLES]
-                fv = extract_features_from_window(win)
+                fv = windowed_features(seg[:WINDOW_SAMPLES], WINDOW_SAMPLES, WINDOW_SAMPLES)[0]
                 X_human.append(fv)
                 y_human.append(row["label"].lower())
                 
@@ -81,27 +106,26 @@ def merge_datasets(raw_df: pd.DataFrame, human_labels: pd.DataFrame):
     return X_base, y_base
 
 async def async_main(args):
-    raw_files = sorted(RAW_DIR.glob("raw_*.csv"))
-    if not raw_files:
-        print("ERROR: No raw CSV found in ml/data/raw.")
-        return
-        
-    raw_path = raw_files[-1]
-    raw_df = pd.read_csv(raw_path)
-    if "timestamp" not in raw_df.columns and "ts" in raw_df.columns:
-        raw_df = raw_df.rename(columns={"ts": "timestamp"})
-    raw_df = raw_df.sort_values("timestamp").reset_index(drop=True)
+    raw_files = list_raw(RAW_DIR)
+    raw_path = raw_files[-1] if raw_files else None
+    raw_df = load_raw(raw_path) if raw_path else None
+    if raw_df is None:
+        print("No raw CSV in ml/data/raw; training on labeled edge snapshots only.")
     
     print("Fetching human-verified labels from Database...")
     try:
         human_labels = await fetch_human_labels()
-        print(f"Found {len(human_labels)} human-verified window labels.")
+        with_window = int(human_labels["window"].notna().sum()) if not human_labels.empty else 0
+        print(f"Found {len(human_labels)} human-verified window labels ({with_window} with edge snapshots).")
     except Exception as e:
         print(f"Warning: Could not connect to DB. Proceeding with synthetic only. Error: {e}")
         human_labels = pd.DataFrame()
         
     print("Building merged feature dataset...")
-    X, y = merge_datasets(raw_df, human_labels)
+    X, y = merge_datasets(raw_df, human_labels, raw_path)
+    if len(X) == 0:
+        print("ERROR: No raw CSV in ml/data/raw and no labeled events with edge snapshots.")
+        return
     
     print(f"Training RandomForest on {len(X)} windows...")
     from sklearn.ensemble import RandomForestClassifier
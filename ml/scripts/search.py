@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Industrial Wearable AI — Hyperparameter Search & Model Selection
+
+Grid or random search for the four edge models (activity, fatigue, ergo, anomaly).
+Candidates are evaluated in parallel worker processes with grouped cross-validation.
+Each candidate is then timed serially, one row per call through the same method the
+gateway uses, so latency is not distorted by the parallel fits. The result is the
+Pareto front of CV score vs per-row latency, with pickled model size alongside, and a
+selection: the fastest front candidate within --tolerance of the best score.
+
+Grouping (folds never split a group, so overlapping windows cannot leak):
+  activity  one group per raw recording when there are at least --cv of them, else
+            contiguous blocks of --block-minutes within each recording
+  fatigue, ergo, anomaly  synthetic i.i.d. rows unless --raw is given (anomaly only):
+            plain K-fold
+
+Usage:
+    python ml/scripts/search.py activity --all-raw --labels labels.csv --jobs 0
+    python ml/scripts/search.py activity --mode random --n-iter 30 --out /tmp/activity_search.json
+    python ml/scripts/search.py fatigue --jobs 4 --save ml/models/fatigue_model.joblib
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+_scripts = Path(__file__).resolve().parent
+sys.path.insert(0, str(_scripts))
+
+MODELS = ("activity", "fatigue", "ergo", "anomaly")
+LATENCY_ROWS = 200
+
+# Search spaces. Grids are the full cartesian product; --mode random samples --n-iter of them.
+SPACES = {
+    "activity": {
+        "n_estimators": [10, 25, 50, 100, 200],
+        "max_depth": [4, 6, 8, 10, None],
+        "min_samples_leaf": [1, 2, 5],
+        "max_features": ["sqrt", 0.5],
+    },
+    "fatigue": {
+        "n_estimators": [25, 50, 100, 200],
+        "max_depth": [2, 3, 5],
+        "learning_rate": [0.05, 0.1, 0.2],
+    },
+    "ergo": {
+        "alpha": [0.01, 0.1, 1.0, 10.0, 100.0],
+    },
+    "anomaly": {
+        "n_estimators": [25, 50, 100, 200],
+        "max_samples": ["auto", 128, 512],
+        "max_features": [0.5, 0.8, 1.0],
+    },
+}
+SCORING = {"activity": "accuracy", "fatigue": "accuracy", "ergo": "r2", "anomaly": "balanced_detection"}
+
+
+# ── Estimators ────────────────────────────────────────────────────────────
+
+def make_estimator(kind: str, params: dict, seed: int = 42):
+    """Same model families as train.py / train_fatigue.py / train_ergo.py / train_anomaly.py."""
+    if kind == "activity":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    if kind == "fatigue":
+        try:
+            from xgboost import XGBClassifier
+            return XGBClassifier(random_state=seed, n_jobs=1, **params)
+        except ImportError:
+            from sklearn.ensemble import GradientBoostingClassifier
+            return GradientBoostingClassifier(random_state=seed, **params)
+    if kind == "ergo":
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+        return Pipeline([("scaler", StandardScaler()), ("regressor", Ridge(**params))])
+    if kind == "anomaly":
+        from sklearn.ensemble import IsolationForest
+        return IsolationForest(contamination=0.05, random_state=seed, n_jobs=1, **params)
+    raise ValueError(f"Unknown model: {kind}")
+
+
+def edge_call(kind: str, model) -> Callable[[np.ndarray], object]:
+    """The per-window call the gateway makes (classifier / risk_detector / anomaly_detector)."""
+    if kind == "activity":
+        return lambda row: model.predict_proba(row)
+    if kind == "fatigue":
+        return lambda row: (model.predict(row), model.predict_proba(row))
+    if kind == "ergo":
+        return lambda row: model.predict(row)
+    return lambda row: (model.predict(row), model.score_samples(row))
+
+
+# ── Data ──────────────────────────────────────────────────────────────────
+
+def load_activity(args) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    from raw_store import list_raw
+    from train import RAW_DIR, SAMPLE_RATE, WINDOW_SAMPLES, _build_file, load_labels
+
+    raw_paths = args.raw or (list_raw(RAW_DIR) if args.all_raw else list_raw(RAW_DIR)[-1:])
+    if not raw_paths:
+        raise SystemExit("ERROR: No raw recordings found. Run collect_raw.py first.")
+    labels_df = load_labels(args.labels) if args.labels else None
+    n = len(raw_paths)
+    jobs = min(n, args.jobs if args.jobs > 0 else os.cpu_count() or 1)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(_build_file, raw_paths, [labels_df] * n))
+    else:
+        parts = [_build_file(p, labels_df) for p in raw_paths]
+
+    step = WINDOW_SAMPLES // 2 if labels_df is not None else WINDOW_SAMPLES // 4
+    block = max(1, int(args.block_minutes * 60 * SAMPLE_RATE / step))  # windows per block
+    per_file = sum(1 for X, _ in parts if len(X)) >= args.cv
+    groups = []
+    for i, (X, _) in enumerate(parts):
+        g = np.full(len(X), i * 1_000_000)
+        groups.append(g if per_file else g + np.arange(len(X)) // block)
+    X = np.concatenate([X for X, _ in parts])
+    y = np.concatenate([y for _, y in parts])
+    print(f"Activity: {len(X)} windows from {n} recording(s), {'synthetic' if labels_df is None else args.labels.name} labels, "
+          f"groups by {'recording' if per_file else f'{args.block_minutes:g}-minute block'}")
+    return X, y, np.concatenate(groups)
+
+
+def load_data(kind: str, args) -> tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    if kind == "activity":
+        return load_activity(args)
+    if kind == "fatigue":
+        from train_fatigue import generate_synthetic_data
+        X, y = generate_synthetic_data()
+        return X, y, None
+    if kind == "ergo":
+        from train_ergo import generate_synthetic_data
+        X, y = generate_synthetic_data()
+        return X, y, None
+    from train_anomaly import generate_normal_data, load_raw_features
+    X = load_raw_features(args.raw, args.jobs) if args.raw else generate_normal_data()
+    return X, np.ones(len(X), dtype=np.int32), None
+
+
+# ── Evaluation (worker processes) ─────────────────────────────────────────
+
+_W: dict = {}
+
+
+def _init_worker(kind: str, X: np.ndarray, y: np.ndarray, groups: Optional[np.ndarray], cv: int, seed: int) -> None:
+    _W.update(kind=kind, X=X, y=y, groups=groups, cv=cv, seed=seed)
+
+
+def _folds(y: np.ndarray, groups: Optional[np.ndarray], cv: int, seed: int):
+    from sklearn.model_selection import GroupKFold, KFold
+    if groups is not None:
+        return list(GroupKFold(n_splits=min(cv, len(np.unique(groups)))).split(y, y, groups))
+    return list(KFold(n_splits=cv, shuffle=True, random_state=seed).split(y))
+
+
+def _score(kind: str, model, X: np.ndarray, y: np.ndarray, seed: int) -> float:
+    if kind in ("activity", "fatigue"):
+        return float(np.mean(model.predict(X) == y))
+    if kind == "ergo":
+        from sklearn.metrics import r2_score
+        return float(r2_score(y, model.predict(X)))
+    # Anomaly: held-out normal windows kept + off-distribution vectors flagged (as train_anomaly's check)
+    outliers = np.random.default_rng(seed).uniform(-5, 5, size=(100, X.shape[1])).astype(np.float32)
+    return float((np.mean(model.predict(X) == 1) + np.mean(model.predict(outliers) == -1)) / 2)
+
+
+def _evaluate(params: dict) -> dict:
+    kind, X, y, seed = _W["kind"], _W["X"], _W["y"], _W["seed"]
+    scores, model = [], None
+    t0 = time.perf_counter()
+    for train_idx, test_idx in _folds(y, _W["groups"], _W["cv"], seed):
+        model = make_estimator(kind, params, seed)
+        if kind == "anomaly":
+            model.fit(X[train_idx])
+        else:
+            model.fit(X[train_idx], y[train_idx])
+        scores.append(_score(kind, model, X[test_idx], y[test_idx], seed))
+    return {
+        "params": params,
+        "score": float(np.mean(scores)),
+        "score_std": float(np.std(scores)),
+        "fit_seconds": round(time.perf_counter() - t0, 3),
+        "model": pickle.dumps(model),  # last fold's model: size and latency are measured on it
+    }
+
+
+# ── Selection ─────────────────────────────────────────────────────────────
+
+def row_latency_us(call: Callable[[np.ndarray], object], X: np.ndarray, repeat: int = 3) -> float:
+    rows = [X[i : i + 1] for i in range(min(LATENCY_ROWS, len(X)))]
+    call(rows[0])  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for row in rows:
+            call(row)
+        best = min(best, (time.perf_counter() - t0) / len(rows))
+    return best * 1e6
+
+
+def pareto_front(results: list[dict]) -> list[dict]:
+    """Candidates no other candidate beats on both score (higher) and latency (lower)."""
+    front, best = [], -float("inf")
+    for r in sorted(results, key=lambda r: (r["latency_us"], -r["score"])):
+        if r["score"] > best:
+            front.append(r)
+            best = r["score"]
+    return front
+
+
+def select(front: list[dict], tolerance: float) -> dict:
+    """Fastest front candidate scoring within tolerance of the best."""
+    best = max(r["score"] for r in front)
+    return min((r for r in front if r["score"] >= best - tolerance), key=lambda r: r["latency_us"])
+
+
+def candidates(kind: str, mode: str, n_iter: int, seed: int) -> list[dict]:
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+    space = SPACES[kind]
+    grid = list(ParameterGrid(space))
+    if mode == "random" and n_iter < len(grid):
+        return list(ParameterSampler(space, n_iter=n_iter, random_state=seed))
+    return grid
+
+
+def _fmt_params(params: dict) -> str:
+    return ", ".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Hyperparameter search and model selection")
+    p.add_argument("model", choices=MODELS)
+    p.add_argument("--mode", choices=["grid", "random"], default="grid")
+    p.add_argument("--n-iter", type=int, default=20, help="Candidates for --mode random")
+    p.add_argument("--cv", type=int, default=5, help="Folds")
+    p.add_argument("--jobs", type=int, default=1, help="Worker processes (0 = all CPUs)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--tolerance", type=float, default=0.01, help="Score loss accepted for a faster model")
+    p.add_argument("--raw", type=Path, nargs="+", help="Raw CSVs / stores (activity, anomaly)")
+    p.add_argument("--all-raw", action="store_true", help="Every recording in ml/data/raw (activity)")
+    p.add_argument("--labels", type=Path, help="Labels CSV (activity; default synthetic labels)")
+    p.add_argument("--block-minutes", type=float, default=5.0, help="CV group size within one recording (activity)")
+    p.add_argument("--out", type=Path, help="Write all results as JSON")
+    p.add_argument("--save", type=Path, help="Refit the selected candidate on all data and save it (joblib)")
+    args = p.parse_args()
+
+    kind = args.model
+    X, y, groups = load_data(kind, args)
+    cands = candidates(kind, args.mode, args.n_iter, args.seed)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    print(f"{len(cands)} candidates × {args.cv} folds, {SCORING[kind]}, {jobs} worker(s)")
+
+    t0 = time.perf_counter()
+    init = (kind, X, y, groups, args.cv, args.seed)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=init) as pool:
+            results = list(pool.map(_evaluate, cands))
+    else:
+        _init_worker(*init)
+        results = [_evaluate(c) for c in cands]
+    print(f"Search: {time.perf_counter() - t0:.1f}s")
+
+    # Latency serially in this process, one row per call as on the gateway
+    for r in results:
+        blob = r.pop("model")
+        r["size_kb"] = round(len(blob) / 1024, 1)
+        r["latency_us"] = round(row_latency_us(edge_call(kind, pickle.loads(blob)), X), 1)
+
+    front = pareto_front(results)
+    chosen = select(front, args.tolerance)
+    print(f"\nPareto front ({SCORING[kind]} vs per-row latency):")
+    print(f"{'score':>8} {'± std':>7} {'latency':>10} {'size':>10}  params")
+    for r in front:
+        mark = " *" if r is chosen else ""
+        print(f"{r['score']:>8.4f} {r['score_std']:>7.4f} {r['latency_us']:>8.1f}µs {r['size_kb']:>8.1f}KB  {_fmt_params(r['params'])}{mark}")
+    best = max(results, key=lambda r: r["score"])
+    print(f"\nBest score: {best['score']:.4f} ({best['latency_us']:.1f}µs, {_fmt_params(best['params'])})")
+    print(f"Selected (*): {chosen['score']:.4f} at {chosen['latency_us']:.1f}µs — "
+          f"{best['latency_us'] / max(chosen['latency_us'], 1e-9):.1f}× faster, {best['score'] - chosen['score']:+.4f} score")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps({
+            "model": kind,
+            "scoring": SCORING[kind],
+            "cv": args.cv,
+            "grouped": groups is not None,
+            "samples": len(X),
+            "results": results,
+            "front": [r["params"] for r in front],
+            "selected": chosen,
+        }, indent=2, default=str))
+        print(f"Wrote {args.out}")
+
+    if args.save:
+        import joblib
+        model = make_estimator(kind, chosen["params"], args.seed)
+        if kind == "anomaly":
+            model.fit(X)
+        else:
+            model.fit(X, y)
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(model, args.save)
+        print(f"Model saved → {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,19 @@
 """
 Industrial Wearable AI — Training Script
 Load raw + labels, extract features, train RandomForestClassifier, export joblib.
+
+The exported model is profiled (model_profile.py) into MODEL_CARD.md / .json; with
+latency, size or load-memory budgets set it is only installed if it fits them.
+
+Raw recordings are CSVs or columnar stores (raw_store.py; memory-mapped, preferred
+when both exist). Several can be given (--raw a.csv b.store, or --all-raw); --jobs
+builds their windows in parallel worker processes.
 """
 import argparse
+import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Ensure scripts dir on path for imports
@@ -20,7 +30,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 from sklearn.model_selection import train_test_split
 
-from feature_extraction import extract_features_from_window
+from feature_cache import FeatureCache
+from feature_extraction import FEATURE_DIM, axes_array, windowed_features
+from model_profile import card_section, check_budgets, default_budgets, profile_model
+from raw_store import RawStore, is_store, list_raw
 
 RAW_DIR = Path(__file__).resolve().parent.parent / "data" / "raw"
 LABELED_DIR = Path(__file__).resolve().parent.parent / "data" / "labeled"
@@ -31,8 +44,10 @@ SAMPLE_RATE = 25
 WINDOW_SAMPLES = int(WINDOW_SECONDS * SAMPLE_RATE)
 
 
-def load_raw(path: Path) -> pd.DataFrame:
-    """Load raw CSV with timestamp, ax, ay, az, gx, gy, gz, temp."""
+def load_raw(path: Path) -> pd.DataFrame | RawStore:
+    """Load raw CSV with timestamp, ax, ay, az, gx, gy, gz, temp (or open a columnar store)."""
+    if is_store(path):
+        return RawStore(path)
     df = pd.read_csv(path)
     if "timestamp" not in df.columns and "ts" in df.columns:
         df = df.rename(columns={"ts": "timestamp"})
@@ -44,70 +59,151 @@ def load_labels(path: Path) -> pd.DataFrame:
     return pd.read_csv(path)
 
 
-def build_dataset(raw_df: pd.DataFrame, labels_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
-    """Extract features per labeled segment. Return X, y."""
+def raw_arrays(raw: pd.DataFrame | RawStore) -> tuple[np.ndarray, np.ndarray, bool]:
+    """(timestamps, (n, 6) IMU array, timestamps sorted) for a DataFrame or store."""
+    if isinstance(raw, RawStore):
+        return raw.ts, raw.imu, True
+    return raw["timestamp"].to_numpy(), axes_array(raw), bool(raw["timestamp"].is_monotonic_increasing)
+
+
+def segment(ts: np.ndarray, data: np.ndarray, sorted_ts: bool, start: int, end: int) -> np.ndarray:
+    """IMU rows with start <= ts <= end."""
+    if sorted_ts:
+        return data[np.searchsorted(ts, start, "left") : np.searchsorted(ts, end, "right")]
+    return data[(ts >= start) & (ts <= end)]
+
+
+def _features(
+    data: np.ndarray,
+    bounds: list[tuple[int, int]],
+    step: int,
+    cache: FeatureCache | None,
+    source: Path | None,
+) -> list[np.ndarray]:
+    """Window features of each data[lo:hi], from the feature cache when one is given."""
+    if cache is not None and source is not None:
+        return cache.segments(source, data, bounds, WINDOW_SAMPLES, step)
+    return [windowed_features(data[lo:hi], WINDOW_SAMPLES, step) for lo, hi in bounds]
+
+
+def build_dataset(
+    raw_df: pd.DataFrame | RawStore,
+    labels_df: pd.DataFrame,
+    cache: FeatureCache | None = None,
+    source: Path | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Extract features per labeled segment. Return X, y.
+    With a cache and the raw file it came from (source), features are reused across runs.
+    """
+    step = max(1, WINDOW_SAMPLES // 2)  # Sliding windows within segment (50% overlap)
+    ts, data, sorted_ts = raw_arrays(raw_df)
     X_list, y_list = [], []
-    for _, row in labels_df.iterrows():
-        start, end = int(row["start_ts"]), int(row["end_ts"])
-        mask = (raw_df["timestamp"] >= start) & (raw_df["timestamp"] <= end)
-        seg = raw_df.loc[mask]
-        if len(seg) < WINDOW_SAMPLES:
-            continue
-        # Sliding windows within segment (50% overlap)
-        step = max(1, WINDOW_SAMPLES // 2)
-        for i in range(0, len(seg) - WINDOW_SAMPLES + 1, step):
-            win = seg.iloc[i : i + WINDOW_SAMPLES]
-            fv = extract_features_from_window(win)
+    if sorted_ts:
+        starts = np.searchsorted(ts, labels_df["start_ts"].to_numpy(dtype=np.int64), "left")
+        ends = np.searchsorted(ts, labels_df["end_ts"].to_numpy(dtype=np.int64), "right")
+        keep = [(int(lo), int(hi), label) for lo, hi, label in zip(starts, ends, labels_df["label"]) if hi - lo >= WINDOW_SAMPLES]
+        feats = _features(data, [(lo, hi) for lo, hi, _ in keep], step, cache, source)
+        for fv, (_, _, label) in zip(feats, keep):
             X_list.append(fv)
-            y_list.append(row["label"].lower())
-    return np.array(X_list, dtype=np.float32), np.array(y_list)
+            y_list.append(np.full(len(fv), label.lower(), dtype=object))
+    else:
+        for start, end, label in zip(labels_df["start_ts"], labels_df["end_ts"], labels_df["label"]):
+            seg = segment(ts, data, sorted_ts, int(start), int(end))
+            if len(seg) < WINDOW_SAMPLES:
+                continue
+            fv = windowed_features(seg, WINDOW_SAMPLES, step)
+            X_list.append(fv)
+            y_list.append(np.full(len(fv), label.lower(), dtype=object))
+    if not X_list:
+        return np.zeros((0, FEATURE_DIM), dtype=np.float32), np.array([])
+    return np.concatenate(X_list), np.concatenate(y_list).astype(str)
 
 
-def build_synthetic_dataset(raw_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+def build_synthetic_dataset(
+    raw_df: pd.DataFrame | RawStore,
+    cache: FeatureCache | None = None,
+    source: Path | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
     """Build dataset with synthetic labels (for testing without real labels)."""
-    X_list, y_list = [], []
     step = max(1, WINDOW_SAMPLES // 4)  # Smaller step for more synthetic samples
-    for i in range(0, len(raw_df) - WINDOW_SAMPLES + 1, step):
-        win = raw_df.iloc[i : i + WINDOW_SAMPLES]
-        fv = extract_features_from_window(win)
-        X_list.append(fv)
-        # Assign label by variance (simple heuristic)
-        var_sum = np.sum(fv[[1, 6, 11, 16, 21, 26]])
-        if var_sum < 0.5:
-            lbl = "idle"
-        elif var_sum < 2.0:
-            lbl = "adjusting"
-        else:
-            lbl = "sewing"
-        y_list.append(lbl)
-    return np.array(X_list, dtype=np.float32), np.array(y_list)
+    data = raw_arrays(raw_df)[1]
+    X = np.asarray(_features(data, [(0, len(data))], step, cache, source)[0])
+    # Assign label by variance (simple heuristic)
+    var_sum = X[:, [1, 6, 11, 16, 21, 26]].sum(axis=1)
+    y = np.where(var_sum < 0.5, "idle", np.where(var_sum < 2.0, "adjusting", "sewing"))
+    return X, y
+
+
+def _build_file(raw_path: Path, labels_df: pd.DataFrame | None, use_cache: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    raw_df = load_raw(raw_path)
+    cache = FeatureCache() if use_cache else None
+    if labels_df is None:
+        return build_synthetic_dataset(raw_df, cache, raw_path)
+    return build_dataset(raw_df, labels_df, cache, raw_path)
+
+
+def build_from_files(
+    raw_paths: list[Path],
+    labels_df: pd.DataFrame | None = None,
+    jobs: int = 1,
+    use_cache: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Windows from several raw files, concatenated in the order given. Labels (absolute
+    timestamps) apply to every file; None uses synthetic labels. jobs > 1 builds
+    files in parallel processes (jobs <= 0: one per CPU). Features come from the
+    feature cache (ml/data/features) unless use_cache is False.
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(raw_paths))
+    n = len(raw_paths)
+    if jobs <= 1:
+        parts = [_build_file(p, labels_df, use_cache) for p in raw_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(_build_file, raw_paths, [labels_df] * n, [use_cache] * n))
+    parts = [(X, y) for X, y in parts if len(X)]
+    if not parts:
+        return np.zeros((0, FEATURE_DIM), dtype=np.float32), np.array([])
+    return np.concatenate([X for X, _ in parts]), np.concatenate([y for _, y in parts])
 
 
 def main():
     p = argparse.ArgumentParser(description="Train activity classifier")
-    p.add_argument("--raw", type=Path, help="Raw CSV path (default: latest in ml/data/raw)")
+    p.add_argument("--raw", type=Path, nargs="+", help="Raw CSV or store path(s) (default: latest in ml/data/raw)")
+    p.add_argument("--all-raw", action="store_true", help="Use every raw recording in ml/data/raw")
+    p.add_argument("--jobs", type=int, default=1, help="Worker processes for feature extraction across raw files (0 = all CPUs)")
+    p.add_argument("--no-cache", action="store_true", help="Recompute features instead of using ml/data/features")
     p.add_argument("--labels", type=Path, help="Labels CSV path")
     p.add_argument("--synthetic", action="store_true", help="Use synthetic labels (no labels file)")
     p.add_argument("--output", type=Path, help="Output model path (default: ml/models/activity_model.joblib)")
     p.add_argument("--test-size", type=float, default=0.2, help="Validation fraction")
+    p.add_argument("--max-latency-us", type=float, help="Fail if single-row p50 latency exceeds this (env MODEL_MAX_LATENCY_US)")
+    p.add_argument("--max-size-kb", type=float, help="Fail if the serialized model exceeds this (env MODEL_MAX_SIZE_KB)")
+    p.add_argument("--max-load-mb", type=float, help="Fail if loading needs more memory than this (env MODEL_MAX_LOAD_MB)")
     args = p.parse_args()
+    budgets = default_budgets()
+    for key in budgets:
+        if getattr(args, key) is not None:
+            budgets[key] = getattr(args, key)
 
-    raw_path = args.raw
-    if not raw_path:
-        raw_files = sorted(RAW_DIR.glob("raw_*.csv"))
+    raw_paths = args.raw
+    if not raw_paths:
+        raw_files = list_raw(RAW_DIR)
         if not raw_files:
             print("ERROR: No raw CSV found. Run collect_raw.py first.")
             return 1
-        raw_path = raw_files[-1]
-    raw_df = load_raw(raw_path)
-    print(f"Raw: {raw_path.name}, {len(raw_df)} rows")
+        raw_paths = raw_files if args.all_raw else raw_files[-1:]
+    print(f"Raw: {', '.join(p.name for p in raw_paths)}")
 
     if args.synthetic or not args.labels:
-        X, y = build_synthetic_dataset(raw_df)
+        X, y = build_from_files(raw_paths, None, jobs=args.jobs, use_cache=not args.no_cache)
         print(f"Synthetic labels: {len(X)} windows")
     else:
         labels_df = load_labels(args.labels)
-        X, y = build_dataset(raw_df, labels_df)
+        X, y = build_from_files(raw_paths, labels_df, jobs=args.jobs, use_cache=not args.no_cache)
         print(f"Labels: {args.labels.name}, {len(X)} windows")
 
     if len(X) < 10:
@@ -128,7 +224,32 @@ def main():
 
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     out_path = args.output or MODELS_DIR / "activity_model.joblib"
-    joblib.dump(model, out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Profile the exported file before it replaces the current model
+    staged = out_path.with_name(f".{out_path.name}.staged")
+    joblib.dump(model, staged)
+    profile = profile_model(staged, X_val)
+    violations = check_budgets(profile, budgets)
+    card_json = {
+        "model": "activity",
+        "date": datetime.now().isoformat(),
+        "samples": len(X),
+        "accuracy": round(float(acc), 4),
+        "params": {k: v for k, v in model.get_params().items() if k in ("n_estimators", "max_depth", "min_samples_leaf", "max_features")},
+        "inference": profile,
+        "budgets": budgets,
+        "violations": violations,
+    }
+    if violations:
+        rejected = out_path.with_name(out_path.stem + ".rejected" + out_path.suffix)
+        staged.replace(rejected)
+        (MODELS_DIR / "MODEL_CARD.rejected.json").write_text(json.dumps(card_json, indent=2, default=str), encoding="utf-8")
+        for v in violations:
+            print(f"BUDGET EXCEEDED: {v}")
+        print(f"Model not installed; kept as {rejected}")
+        return 1
+    staged.replace(out_path)
     print(f"Model saved: {out_path}")
 
     # Write MODEL_CARD
@@ -137,21 +258,25 @@ def main():
 
 ## Training
 - **Date:** {datetime.now().isoformat()}
-- **Raw data:** {raw_path.name}
+- **Raw data:** {", ".join(p.name for p in raw_paths)}
 - **Labels:** {"synthetic" if args.synthetic else str(args.labels)}
 - **Samples:** {len(X)} windows
 
 ## Parameters
 - **Window:** {WINDOW_SECONDS}s ({WINDOW_SAMPLES} samples @ {SAMPLE_RATE} Hz)
 - **Overlap:** 50%
-- **Model:** RandomForestClassifier (n_estimators=100, max_depth=10)
+- **Model:** RandomForestClassifier (n_estimators={model.n_estimators}, max_depth={model.max_depth})
 
 ## Features (30)
 Per axis (ax,ay,az,gx,gy,gz): mean, std, min, max, zero_crossing_rate
 
 ## Metrics
 - **Accuracy:** {acc:.2%}
+
+## Inference
+{card_section(profile, budgets)}
 """, encoding="utf-8")
+    (MODELS_DIR / "MODEL_CARD.json").write_text(json.dumps(card_json, indent=2, default=str), encoding="utf-8")
     print(f"Model card: {card_path}")
 
     return 0 if acc >= 0.85 else 1
@@ -7,9 +7,12 @@ Anomalies include: sudden stops after sustained activity, extreme
 temperature spikes, or motion profiles that don't match any known
 activity class.
 
-Uses the same 30-dim feature vector as the activity classifier.
+Uses the same 30-dim feature vector as the activity classifier. By default it is
+fitted on synthetic feature vectors; --raw / --all-raw fits on real windows from raw
+recordings instead (features served from the feature cache, see feature_cache.py).
 Model saved to: ml/models/anomaly_model.joblib
 """
+import argparse
 import json
 import sys
 from pathlib import Path
@@ -22,6 +25,15 @@ sys.path.insert(0, str(_root))
 MODEL_OUT = _root / "ml" / "models" / "anomaly_model.joblib"
 
 
+def load_raw_features(raw_paths: list[Path], jobs: int = 1, use_cache: bool = True) -> np.ndarray:
+    """Features of every window (25% step, as train.py --synthetic) of the given recordings."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from train import build_from_files
+
+    X, _ = build_from_files(raw_paths, None, jobs=jobs, use_cache=use_cache)
+    return X
+
+
 def generate_normal_data(n_samples: int = 2000, seed: int = 42) -> np.ndarray:
     """
     Generate synthetic 'normal' 30-dim feature vectors that represent
@@ -57,7 +69,7 @@ def generate_normal_data(n_samples: int = 2000, seed: int = 42) -> np.ndarray:
     return X
 
 
-def train():
+def train(raw_paths: list[Path] | None = None, jobs: int = 1, use_cache: bool = True):
     """Train the anomaly detection model."""
     print("=" * 60)
     print("  Anomaly Detector — Training")
@@ -66,7 +78,11 @@ def train():
     from sklearn.ensemble import IsolationForest
     import joblib
 
-    X_normal = generate_normal_data()
+    if raw_paths:
+        X_normal = load_raw_features(raw_paths, jobs, use_cache)
+        print(f"  Raw recordings: {', '.join(p.name for p in raw_paths)}")
+    else:
+        X_normal = generate_normal_data()
     print(f"  Normal samples: {len(X_normal)} | Features: {X_normal.shape[1]}")
 
     model = IsolationForest(
@@ -95,6 +111,7 @@ def train():
         "type": "IsolationForest",
         "feature_dim": 30,
         "contamination": 0.05,
+        "training_data": [p.name for p in raw_paths] if raw_paths else "synthetic",
         "output": "1 = normal, -1 = anomaly",
     }
     meta_path = MODEL_OUT.with_suffix(".meta.json")
@@ -105,4 +122,15 @@ def train():
 
 
 if __name__ == "__main__":
-    train()
+    p = argparse.ArgumentParser(description="Train anomaly detector")
+    p.add_argument("--raw", type=Path, nargs="+", help="Fit on windows of these raw CSVs / stores")
+    p.add_argument("--all-raw", action="store_true", help="Fit on every raw recording in ml/data/raw")
+    p.add_argument("--jobs", type=int, default=1, help="Worker processes for feature extraction (0 = all CPUs)")
+    p.add_argument("--no-cache", action="store_true", help="Recompute features instead of using ml/data/features")
+    args = p.parse_args()
+    raw_paths = args.raw
+    if args.all_raw:
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from raw_store import list_raw
+        raw_paths = list_raw(_root / "ml" / "data" / "raw")
+    train(raw_paths, jobs=args.jobs, use_cache=not args.no_cache)